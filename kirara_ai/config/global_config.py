@@ -1,4 +1,4 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -35,19 +35,30 @@ class DefaultConfig(BaseModel):
 
 
 class MemoryPersistenceConfig(BaseModel):
-    type: str = Field(default="file", description="持久化类型: file/redis")
+    type: str = Field(default="file", description="持久化类型: file/jsonl/redis/redis_list")
     file: Dict[str, Any] = Field(
-        default={"storage_dir": "./data/memory"}, description="文件持久化配置"
+        default={"storage_dir": "./data/memory"}, description="文件持久化配置，file 和 jsonl 类型共用"
     )
     redis: Dict[str, Any] = Field(
         default={"host": "localhost", "port": 6379, "db": 0},
-        description="Redis持久化配置",
+        description="Redis持久化配置，redis 和 redis_list 类型共用，redis_list 类型还支持 ttl、key_prefix、max_connections",
     )
+    flush_interval: float = Field(
+        default=1.0, description="记忆修改后最多等待多久（秒）写入持久化层，同一作用域在此期间的多次修改只写入一次"
+    )
+    batch_size: int = Field(default=64, description="等待写入的作用域达到该数量时立即批量写入")
+    drain_timeout: float = Field(default=10.0, description="关闭时等待剩余记忆写入完成的最长时间（秒）")
 
 
 class MemoryConfig(BaseModel):
     persistence: MemoryPersistenceConfig = MemoryPersistenceConfig()
     max_entries: int = Field(default=100, description="每个作用域最大记忆条目数")
+    max_resident_scopes: int = Field(
+        default=1000, description="最多常驻内存的作用域数量，超出时淘汰最久未使用的作用域，0 表示不限制"
+    )
+    max_resident_bytes: int = Field(
+        default=64 * 1024 * 1024, description="常驻内存的记忆估算占用上限（字节），0 表示不限制"
+    )
     default_scope: str = Field(default="member", description="默认作用域类型")
 
 
@@ -89,6 +100,72 @@ class SystemConfig(BaseModel):
 
     timezone: str = Field(default="Asia/Shanghai", description="时区")
 
+
+class WorkflowConfig(BaseModel):
+    """工作流执行配置"""
+
+    max_parallel_blocks: int = Field(
+        default=8, description="单次工作流运行中最多同时执行的 block 数量，0 表示不限制"
+    )
+    block_workers: int = Field(
+        default=0, description="全局 block 执行线程池的线程数，0 表示根据 CPU 核数自动设置"
+    )
+    block_timeout: float = Field(
+        default=0, description="单个 block 的默认执行超时时间（秒），0 表示不限制"
+    )
+    run_timeout: float = Field(
+        default=0, description="单次工作流运行的超时时间（秒），0 表示不限制"
+    )
+    retain_block_outputs: bool = Field(
+        default=False,
+        description="是否在运行结束前保留所有 block 的输出，用于调试；关闭时中间结果在下游读取后立即释放",
+    )
+    metrics_window: int = Field(
+        default=1024, description="每个 block 类型的耗时统计保留的最近样本数"
+    )
+
+
+class DispatchConfig(BaseModel):
+    """消息调度配置"""
+
+    lane_scope: Optional[str] = Field(
+        default=None,
+        description="划分会话的作用域类型，同一会话内的消息按顺序处理，不同会话之间并发处理；为空时与记忆的默认作用域 memory.default_scope 相同",
+    )
+    lane_queue_size: int = Field(
+        default=16, description="每个会话最多排队等待处理的消息数量，超出时丢弃新消息，0 表示不限制"
+    )
+    coalesce_window: float = Field(
+        default=0,
+        description="合并同一用户连续发送的消息的等待时间（秒），在此时间内收到的消息合并为一条处理，0 表示不合并",
+    )
+    coalesce_max_messages: int = Field(
+        default=5, description="最多合并的消息数量，达到后立即处理"
+    )
+    max_running_workflows: int = Field(
+        default=0, description="全局最多同时运行的工作流数量，0 表示不限制"
+    )
+    workflow_limits: Dict[str, int] = Field(
+        default={}, description="每个工作流最多同时运行的数量，键为工作流 ID"
+    )
+    admission_queue_size: int = Field(
+        default=64, description="等待运行的工作流队列长度，私聊和优先用户的消息优先运行"
+    )
+    priority_users: List[str] = Field(
+        default=[], description="优先处理的用户 ID 列表，例如管理员"
+    )
+    overflow_policy: Literal["drop", "busy", "degrade"] = Field(
+        default="drop",
+        description="等待队列已满时的处理方式：drop 丢弃消息，busy 回复繁忙提示，degrade 使用 degrade_model 直接运行",
+    )
+    busy_reply: str = Field(
+        default="当前请求较多，请稍后再试", description="overflow_policy 为 busy 时回复的内容"
+    )
+    degrade_model: str = Field(
+        default="", description="overflow_policy 为 degrade 时使用的模型 ID"
+    )
+
+
 class GlobalConfig(BaseModel):
     ims: List[IMConfig] = Field(default=[], description="IM配置列表")
     llms: LLMConfig = LLMConfig()
@@ -99,5 +176,7 @@ class GlobalConfig(BaseModel):
     update: UpdateConfig = UpdateConfig()
     frpc: FrpcConfig = FrpcConfig()
     system: SystemConfig = SystemConfig()
+    workflow: WorkflowConfig = WorkflowConfig()
+    dispatch: DispatchConfig = DispatchConfig()
 
     model_config = ConfigDict(extra="allow")
@@ -9,6 +9,7 @@ from kirara_ai.config.config_loader import ConfigLoader
 from kirara_ai.config.global_config import GlobalConfig
 from kirara_ai.events.application import ApplicationStarted, ApplicationStopping
 from kirara_ai.events.event_bus import EventBus
+from kirara_ai.events.workflow import BlockExecutionSpan
 from kirara_ai.im.im_registry import IMRegistry
 from kirara_ai.im.manager import IMManager
 from kirara_ai.internal import shutdown_event
@@ -24,6 +25,9 @@ from kirara_ai.web.api.system.utils import get_installed_version, get_latest_pyp
 from kirara_ai.web.app import WebServer
 from kirara_ai.workflow.core.block import BlockRegistry
 from kirara_ai.workflow.core.dispatch import DispatchRuleRegistry, WorkflowDispatcher
+from kirara_ai.workflow.core.dispatch.admission import AdmissionController
+from kirara_ai.workflow.core.execution.metrics import BlockExecutionMetrics
+from kirara_ai.workflow.core.execution.pool import BlockExecutorPool
 from kirara_ai.workflow.core.workflow import WorkflowRegistry
 from kirara_ai.workflow.implementations.blocks import register_system_blocks
 from kirara_ai.workflow.implementations.workflows import register_system_workflows
@@ -116,6 +120,10 @@ def init_application() -> DependencyContainer:
     container.register(EventBus, EventBus())
     container.register(GlobalConfig, config)
     container.register(BlockRegistry, BlockRegistry())
+    container.register(BlockExecutorPool, BlockExecutorPool(config.workflow.block_workers))
+    block_metrics = BlockExecutionMetrics(config.workflow.metrics_window)
+    container.register(BlockExecutionMetrics, block_metrics)
+    container.resolve(EventBus).register(BlockExecutionSpan, block_metrics.record)
     
     # 注册工作流注册表
     workflow_registry = WorkflowRegistry(container)
@@ -136,6 +144,14 @@ def init_application() -> DependencyContainer:
     plugin_loader = PluginLoader(container, os.path.join(os.path.dirname(__file__), "plugins"))
     container.register(PluginLoader, plugin_loader)
 
+    container.register(
+        AdmissionController,
+        AdmissionController(
+            config.dispatch.max_running_workflows,
+            config.dispatch.workflow_limits,
+            config.dispatch.admission_queue_size,
+        ),
+    )
     workflow_dispatcher = WorkflowDispatcher(container)
     container.register(WorkflowDispatcher, workflow_dispatcher)
     
@@ -225,6 +241,9 @@ def run_application(container: DependencyContainer):
             plugin_loader.stop_plugins()
         except Exception as e:
             logger.error(f"Error stopping adapters: {e}")
+
+        # 关闭 block 执行线程池
+        container.resolve(BlockExecutorPool).shutdown(wait=False, cancel_futures=True)
         
         # 关闭事件循环
         loop.stop()
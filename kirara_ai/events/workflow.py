@@ -20,3 +20,43 @@ class WorkflowExecutionEnd:
         self.results = results
 
 
+class BlockExecutionSpan:
+    """
+    单个 block 的一次执行记录。
+
+    :param workflow_id: 工作流 id，直接构造的工作流使用工作流名称
+    :param block_name: block 名称
+    :param block_type: block 类名
+    :param queue_wait: 从就绪到真正开始执行的等待时间（秒），包括等待线程池的时间
+    :param duration: 执行耗时（秒）
+    :param on_loop: 是否在事件循环中执行，False 表示在线程池中执行
+    :param output_size: 输出的估算大小（字节）
+    :param success: 是否执行成功
+    """
+
+    def __init__(
+        self,
+        workflow_id: str,
+        block_name: str,
+        block_type: str,
+        queue_wait: float,
+        duration: float,
+        on_loop: bool,
+        output_size: int,
+        success: bool = True,
+    ):
+        self.workflow_id = workflow_id
+        self.block_name = block_name
+        self.block_type = block_type
+        self.queue_wait = queue_wait
+        self.duration = duration
+        self.on_loop = on_loop
+        self.output_size = output_size
+        self.success = success
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(workflow_id={self.workflow_id}, block_name={self.block_name}, "
+            f"block_type={self.block_type}, queue_wait={self.queue_wait:.6f}, duration={self.duration:.6f}, "
+            f"on_loop={self.on_loop}, output_size={self.output_size}, success={self.success})"
+        )
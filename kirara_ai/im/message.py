@@ -1,7 +1,7 @@
 import base64
 import tempfile
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Iterable, List, Optional, Set
 
 import aiofiles
 import aiohttp
@@ -308,12 +308,59 @@ class VideoElement(MediaMessage):
         return f"VideoElement(file={self.file})"
 
 
+def _notify_change(name: str):
+    """包装 list 的修改方法，修改后通知所属消息"""
+    method = getattr(list, name)
+
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self._changed()
+        return result
+
+    wrapper.__name__ = name
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+class MessageElementList(list):
+    """
+    消息元素列表，列表被修改时通知所属的消息清除缓存。
+    只能感知列表本身的增删改，直接修改列表中的元素对象不会清除缓存。
+    """
+
+    def __init__(self, elements: Iterable[MessageElement] = (), owner: Optional["IMMessage"] = None):
+        super().__init__(elements)
+        self._owner = owner
+
+    def _changed(self):
+        # 反序列化时会先恢复列表元素，再恢复 _owner
+        owner = getattr(self, "_owner", None)
+        if owner is not None:
+            owner._invalidate_cache()
+
+    append = _notify_change("append")
+    extend = _notify_change("extend")
+    insert = _notify_change("insert")
+    remove = _notify_change("remove")
+    pop = _notify_change("pop")
+    clear = _notify_change("clear")
+    sort = _notify_change("sort")
+    reverse = _notify_change("reverse")
+    __setitem__ = _notify_change("__setitem__")
+    __delitem__ = _notify_change("__delitem__")
+    __iadd__ = _notify_change("__iadd__")
+    __imul__ = _notify_change("__imul__")
+
+
 # 定义消息类
 class IMMessage:
     """
     IM消息类，用于表示一条完整的消息。
     包含发送者信息和消息元素列表。
 
+    content、images、voices 和 mentions 在第一次访问时计算并缓存，
+    message_elements 被重新赋值或增删元素时缓存自动失效。
+
     Attributes:
         sender: 发送者标识
         message_elements: 消息元素列表,可以包含文本、图片、语音等
@@ -321,42 +368,82 @@ class IMMessage:
         content: 消息的纯文本内容
         images: 消息中的图片列表
         voices: 消息中的语音列表
+        mentions: 消息中提及的对象列表
     """
 
     sender: ChatSender
-    message_elements: List[MessageElement]
     raw_message: Optional[dict]
 
     def __repr__(self):
         return f"IMMessage(sender={self.sender}, message_elements={self.message_elements}, raw_message={self.raw_message})"
 
+    @property
+    def message_elements(self) -> List[MessageElement]:
+        return self._message_elements
+
+    @message_elements.setter
+    def message_elements(self, elements: Iterable[MessageElement]):
+        self._message_elements = MessageElementList(elements, owner=self)
+        self._invalidate_cache()
+
+    def _invalidate_cache(self):
+        """清除由消息元素计算出的缓存"""
+        self._content: Optional[str] = None
+        self._images: Optional[List[ImageMessage]] = None
+        self._voices: Optional[List[VoiceMessage]] = None
+        self._mentions: Optional[List[ChatSender]] = None
+        self._mention_set: Optional[Set[ChatSender]] = None
+
     @property
     def content(self) -> str:
         """获取消息的纯文本内容"""
-        content = ""
-        for element in self.message_elements:
-            content += element.to_plain()
-            if isinstance(element, TextMessage):
-                content += "\n"
-        return content.strip()
+        if self._content is None:
+            parts = []
+            for element in self.message_elements:
+                parts.append(element.to_plain())
+                if isinstance(element, TextMessage):
+                    parts.append("\n")
+            self._content = "".join(parts).strip()
+        return self._content
 
     @property
     def images(self) -> List[ImageMessage]:
-        """获取消息中的所有图片"""
-        return [
-            element
-            for element in self.message_elements
-            if isinstance(element, ImageMessage)
-        ]
+        """获取消息中的所有图片，返回的列表为缓存，不应修改"""
+        if self._images is None:
+            self._images = [
+                element
+                for element in self.message_elements
+                if isinstance(element, ImageMessage)
+            ]
+        return self._images
 
     @property
     def voices(self) -> List[VoiceMessage]:
-        """获取消息中的所有语音"""
-        return [
-            element
-            for element in self.message_elements
-            if isinstance(element, VoiceMessage)
-        ]
+        """获取消息中的所有语音，返回的列表为缓存，不应修改"""
+        if self._voices is None:
+            self._voices = [
+                element
+                for element in self.message_elements
+                if isinstance(element, VoiceMessage)
+            ]
+        return self._voices
+
+    @property
+    def mentions(self) -> List[ChatSender]:
+        """获取消息中提及的所有对象，返回的列表为缓存，不应修改"""
+        if self._mentions is None:
+            self._mentions = [
+                element.target
+                for element in self.message_elements
+                if isinstance(element, MentionElement)
+            ]
+        return self._mentions
+
+    def is_mentioned(self, target: ChatSender) -> bool:
+        """判断消息是否提及了指定对象"""
+        if self._mention_set is None:
+            self._mention_set = set(self.mentions)
+        return target in self._mention_set
 
     def __init__(
         self,
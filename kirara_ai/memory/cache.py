@@ -0,0 +1,129 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, MutableMapping
+
+from kirara_ai.memory.entry import MemoryEntry
+
+# 估算单条记忆占用内存时，除内容外的固定开销（对象、发送者、时间戳、元数据等）
+ENTRY_OVERHEAD_BYTES = 512
+
+
+def estimate_entries_size(entries: List[MemoryEntry]) -> int:
+    """粗略估算一组记忆占用的内存字节数"""
+    return sum(sys.getsizeof(entry.content) + ENTRY_OVERHEAD_BYTES for entry in entries)
+
+
+class ResidentMemoryCache(MutableMapping[str, List[MemoryEntry]]):
+    """
+    常驻内存的记忆缓存，按最近使用顺序淘汰。
+
+    限制常驻的作用域数量和估算的内存占用，超出限制时淘汰最久未使用的作用域，之后再次访问时由调用方重新加载。
+    记忆的每次修改都已经交给了持久化层，淘汰时不需要额外写入。
+    刚写入的作用域不会被淘汰，因此单个作用域超过字节预算时仍然可以常驻。
+    记忆相关的 block 在线程池中并发执行，所有操作都在锁内进行；从持久化层加载时不持有锁。
+    """
+
+    def __init__(
+        self,
+        max_scopes: int = 0,
+        max_bytes: int = 0,
+    ):
+        # 0 表示不限制
+        self.max_scopes = max_scopes
+        self.max_bytes = max_bytes
+
+        self._data: "OrderedDict[str, List[MemoryEntry]]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self.total_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.RLock()
+
+    def get_or_load(self, scope_key: str, loader: Callable[[str], List[MemoryEntry]]) -> List[MemoryEntry]:
+        """获取常驻的记忆，不在内存中时通过 loader 加载"""
+        with self._lock:
+            entries = self._data.get(scope_key)
+            if entries is not None:
+                self.hits += 1
+                self._data.move_to_end(scope_key)
+                return entries
+            self.misses += 1
+        loaded = loader(scope_key)
+        with self._lock:
+            # 加载期间其他线程可能已经写入了该作用域，以已有的为准
+            entries = self._data.get(scope_key)
+            if entries is not None:
+                self._data.move_to_end(scope_key)
+                return entries
+            self._set(scope_key, loaded)
+            return loaded
+
+    def __getitem__(self, scope_key: str) -> List[MemoryEntry]:
+        with self._lock:
+            entries = self._data[scope_key]
+            self._data.move_to_end(scope_key)
+            return entries
+
+    def __setitem__(self, scope_key: str, entries: List[MemoryEntry]):
+        with self._lock:
+            self._set(scope_key, entries)
+
+    def _set(self, scope_key: str, entries: List[MemoryEntry]):
+        size = estimate_entries_size(entries)
+        self.total_bytes += size - self._sizes.get(scope_key, 0)
+        self._sizes[scope_key] = size
+        self._data[scope_key] = entries
+        self._data.move_to_end(scope_key)
+        self._evict()
+
+    def __delitem__(self, scope_key: str):
+        with self._lock:
+            del self._data[scope_key]
+            self.total_bytes -= self._sizes.pop(scope_key)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._data))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, scope_key: object) -> bool:
+        return scope_key in self._data
+
+    # 遍历不算作访问，不改变淘汰顺序；返回快照，遍历期间其他线程可以继续修改
+    def items(self):
+        with self._lock:
+            return list(self._data.items())
+
+    def values(self):
+        with self._lock:
+            return list(self._data.values())
+
+    def _over_limit(self) -> bool:
+        if self.max_scopes > 0 and len(self._data) > self.max_scopes:
+            return True
+        return self.max_bytes > 0 and self.total_bytes > self.max_bytes
+
+    def _evict(self):
+        # 保留最近写入的作用域
+        while len(self._data) > 1 and self._over_limit():
+            scope_key, _ = self._data.popitem(last=False)
+            self.total_bytes -= self._sizes.pop(scope_key)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        """获取缓存统计"""
+        with self._lock:
+            return {
+                "scopes": len(self._data),
+                "bytes": self.total_bytes,
+                "max_scopes": self.max_scopes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
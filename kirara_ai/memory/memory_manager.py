@@ -1,9 +1,13 @@
-from typing import Dict, List, Optional, Type
+import threading
+from typing import Dict, List, Mapping, Optional, Type, Union
 
 from kirara_ai.config.global_config import GlobalConfig
 from kirara_ai.ioc.container import DependencyContainer
+from kirara_ai.memory.cache import ResidentMemoryCache
 from kirara_ai.memory.persistences.base import AsyncMemoryPersistence, MemoryPersistence
 from kirara_ai.memory.persistences.file_persistence import FileMemoryPersistence
+from kirara_ai.memory.persistences.jsonl_persistence import JsonlMemoryPersistence
+from kirara_ai.memory.persistences.redis_list_persistence import RedisListMemoryPersistence
 from kirara_ai.memory.persistences.redis_persistence import RedisMemoryPersistence
 
 from .composes import MemoryComposer, MemoryDecomposer
@@ -11,6 +15,9 @@ from .entry import MemoryEntry
 from .registry import ComposerRegistry, DecomposerRegistry, ScopeRegistry
 from .scopes import MemoryScope
 
+# 修改记忆时按作用域分片加锁，锁的数量固定，不随作用域数量增长
+STORE_LOCK_STRIPES = 64
+
 
 class MemoryManager:
     """记忆系统管理器，负责整个记忆系统的生命周期管理"""
@@ -39,8 +46,42 @@ class MemoryManager:
         else:
             self.persistence = persistence
 
-        # 内存缓存
-        self.memories: Dict[str, List[MemoryEntry]] = {}
+        # 内存缓存，按最近使用顺序淘汰
+        self._memories = self._create_cache()
+        self._store_locks = [threading.Lock() for _ in range(STORE_LOCK_STRIPES)]
+
+    def _create_cache(self) -> ResidentMemoryCache:
+        return ResidentMemoryCache(
+            max_scopes=self.config.max_resident_scopes,
+            max_bytes=self.config.max_resident_bytes,
+        )
+
+    @property
+    def memories(self) -> ResidentMemoryCache:
+        return self._memories
+
+    @memories.setter
+    def memories(self, value: Mapping[str, List[MemoryEntry]]):
+        self._memories = self._create_cache()
+        self._memories.update(value)
+
+    def _store_lock(self, scope_key: str) -> threading.Lock:
+        """获取作用域的修改锁，同一作用域的读取、追加、截断和写回需要整体原子执行"""
+        return self._store_locks[hash(scope_key) % STORE_LOCK_STRIPES]
+
+    def _get_entries(self, scope_key: str) -> List[MemoryEntry]:
+        """获取作用域的记忆，已被淘汰或尚未加载时从持久化层加载"""
+        return self._memories.get_or_load(scope_key, self.persistence.load)
+
+    def get_cache_stats(self) -> Dict[str, int]:
+        """获取常驻记忆缓存的命中、未命中和淘汰统计"""
+        return self._memories.stats()
+
+    def get_persistence_stats(self) -> Optional[Dict[str, Union[int, float]]]:
+        """获取异步持久化的写入队列统计，未使用异步持久化时返回 None"""
+        if isinstance(self.persistence, AsyncMemoryPersistence):
+            return self.persistence.stats()
+        return None
 
     def _init_persistence(self):
         """初始化持久化层"""
@@ -49,13 +90,24 @@ class MemoryManager:
         if persistence_type == "file":
             storage_dir = self.config.persistence.file["storage_dir"]
             self.persistence = FileMemoryPersistence(storage_dir)
+        elif persistence_type == "jsonl":
+            storage_dir = self.config.persistence.file["storage_dir"]
+            self.persistence = JsonlMemoryPersistence(storage_dir, max_entries=self.config.max_entries)
         elif persistence_type == "redis":
             redis_config = self.config.persistence.redis
             self.persistence = RedisMemoryPersistence(**redis_config)
+        elif persistence_type == "redis_list":
+            redis_config = {"max_entries": self.config.max_entries, **self.config.persistence.redis}
+            self.persistence = RedisListMemoryPersistence(**redis_config)
         else:
             raise ValueError(f"Unsupported persistence type: {persistence_type}")
 
-        self.persistence = AsyncMemoryPersistence(self.persistence)
+        self.persistence = AsyncMemoryPersistence(
+            self.persistence,
+            flush_interval=self.config.persistence.flush_interval,
+            batch_size=self.config.persistence.batch_size,
+            drain_timeout=self.config.persistence.drain_timeout,
+        )
 
     def register_scope(self, name: str, scope_class: Type[MemoryScope]):
         """注册新的作用域类型"""
@@ -73,29 +125,27 @@ class MemoryManager:
         """存储新的记忆"""
         scope_key = scope.get_scope_key(entry.sender)
 
-        if scope_key not in self.memories:
-            self.memories[scope_key] = self.persistence.load(scope_key)
+        with self._store_lock(scope_key):
+            entries = self._get_entries(scope_key)
+            entries.append(entry)
 
-        self.memories[scope_key].append(entry)
+            if len(entries) > self.config.max_entries:
+                entries = entries[-self.config.max_entries :]
 
-        if len(self.memories[scope_key]) > self.config.max_entries:
-            self.memories[scope_key] = self.memories[scope_key][
-                -self.config.max_entries :
-            ]
-
-        self.persistence.save(scope_key, self.memories[scope_key])
+            # 重新写入以更新占用估算，在锁内保存，保证持久化层按修改顺序收到快照
+            self.memories[scope_key] = entries
+            self.persistence.save(scope_key, entries)
 
     def query(self, scope: MemoryScope, sender: str) -> List[MemoryEntry]:
         """查询历史记忆"""
         relevant_memories = []
-        scope_key = scope.get_scope_key(sender)
-
-        if scope_key not in self.memories:
-            self.memories[scope_key] = self.persistence.load(scope_key)
+        buckets = [self._get_entries(scope_key) for scope_key in scope.get_query_keys(sender)]
 
-        # 遍历所有记忆，找出作用域内的记忆
-        for scope_key, entries in self.memories.items():
+        if scope.scan_all_scopes:
+            # 作用域声明需要遍历所有已加载的记忆
+            buckets = list(self.memories.values())
 
+        for entries in buckets:
             for entry in entries:
                 if scope.is_in_scope(entry.sender, sender):
                     relevant_memories.append(entry)
@@ -121,8 +171,9 @@ class MemoryManager:
         """
         scope_key = scope.get_scope_key(sender)
 
-        # 清空内存中的记录
-        self.memories[scope_key] = []
+        with self._store_lock(scope_key):
+            # 清空内存中的记录
+            self.memories[scope_key] = []
 
-        # 保存空记录到持久化层
-        self.persistence.save(scope_key, [])
+            # 保存空记录到持久化层
+            self.persistence.save(scope_key, [])
@@ -1,11 +1,16 @@
+from . import codecs
 from .base import AsyncMemoryPersistence, MemoryPersistence
 from .file_persistence import FileMemoryPersistence
+from .jsonl_persistence import JsonlMemoryPersistence
+from .redis_list_persistence import RedisListMemoryPersistence
 from .redis_persistence import RedisMemoryPersistence
 
 __all__ = [
     "MemoryPersistence",
     "AsyncMemoryPersistence",
     "FileMemoryPersistence",
+    "JsonlMemoryPersistence",
     "RedisMemoryPersistence",
+    "RedisListMemoryPersistence",
     "codecs",
 ]
@@ -1,7 +1,8 @@
 import threading
+import time
 from abc import ABC, abstractmethod
-from queue import Empty, Queue
-from typing import List
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
 
 from kirara_ai.logger import get_logger
 from kirara_ai.memory.entry import MemoryEntry
@@ -22,37 +23,229 @@ class MemoryPersistence(ABC):
     def flush(self) -> None:
         """确保所有数据都已持久化"""
 
+    def save_batch(self, batch: List[Tuple[str, List[MemoryEntry]]]) -> None:
+        """批量保存多个作用域的记忆，支持批量写入的实现可以覆盖此方法"""
+        for scope_key, entries in batch:
+            self.save(scope_key, entries)
+
+    def close(self) -> None:
+        """释放连接等资源，停止时在写入完所有数据后调用"""
+
+
+class WrittenEntriesTracker:
+    """
+    记录每个作用域最后写入的记忆，用于追加写入的持久化实现找出之后新增的记忆。
+    新增的记忆总是追加在列表末尾，因此只需要按对象查找上次写入的最后一条。
+    """
+
+    def __init__(self):
+        # 作用域 -> (最后写入的记忆, 已写入的记录数)
+        self._written: Dict[str, Tuple[Optional[MemoryEntry], int]] = {}
+
+    def mark(self, scope_key: str, entries: List[MemoryEntry], count: int):
+        """记录作用域已写入到 entries 的最后一条"""
+        self._written[scope_key] = (entries[-1] if entries else None, count)
+
+    def forget(self, scope_key: str):
+        """不再确定作用域已写入的内容，下次保存时重写整个作用域"""
+        self._written.pop(scope_key, None)
+
+    def count(self, scope_key: str) -> int:
+        return self._written.get(scope_key, (None, 0))[1]
+
+    def new_entries(self, scope_key: str, entries: List[MemoryEntry]) -> Optional[List[MemoryEntry]]:
+        """找出上次写入之后新增的记忆，无法判断时返回 None，需要重写整个作用域"""
+        if scope_key not in self._written:
+            return None
+        last, _ = self._written[scope_key]
+        if last is None:
+            return list(entries)
+        for index in range(len(entries) - 1, -1, -1):
+            if entries[index] is last:
+                return entries[index + 1 :]
+        return None
+
 logger = get_logger("MemoryPersistence")
+
+# 写入失败后重试的最长间隔（秒），flush_interval 更大时以 flush_interval 为准
+MAX_RETRY_DELAY = 5.0
+
+
 class AsyncMemoryPersistence:
-    """异步持久化管理器"""
+    """
+    异步持久化管理器。
+
+    保存时只记录作用域的最新快照并标记为脏，后台线程在最早的修改超过 flush_interval 秒、
+    或脏作用域达到 batch_size 个时批量写入。同一作用域在写入前的多次修改只写入最后一次。
+    写入失败时按指数退避重试，从 flush_interval 开始，最长 MAX_RETRY_DELAY 秒。
+    停止时会在 drain_timeout 秒内写入所有剩余的修改。
+    """
 
-    def __init__(self, persistence: MemoryPersistence):
+    def __init__(
+        self,
+        persistence: MemoryPersistence,
+        flush_interval: float = 1.0,
+        batch_size: int = 64,
+        drain_timeout: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
         self.persistence = persistence
-        self.queue = Queue()
+        # 计算写入时机使用的时钟，测试时可以替换
+        self.clock = clock
+        self.flush_interval = flush_interval
+        self.batch_size = max(batch_size, 1)
+        self.drain_timeout = drain_timeout
+
+        # 作用域 -> (快照, 首次标记为脏的时间)，按标记顺序排列
+        self._dirty: "OrderedDict[str, Tuple[List[MemoryEntry], float]]" = OrderedDict()
+        # 正在写入的快照，写入完成前加载时仍然读取它们
+        self._in_flight: Dict[str, List[MemoryEntry]] = {}
+        self._cond = threading.Condition()
+
+        self.saved = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.last_flush_lag = 0.0
+
+        # 写入失败后的退避间隔和下次允许重试的时间
+        self._retry_delay = 0.0
+        self._retry_at = 0.0
+        # 停止后写入失败、已经立即重试过一次的作用域
+        self._final_attempted: Set[str] = set()
+
         self.running = True
         self.worker = threading.Thread(target=self._worker, daemon=True)
         self.worker.start()
 
+    def _is_due(self) -> bool:
+        if not self._dirty:
+            return False
+        if self.clock() < self._retry_at:
+            return False
+        if len(self._dirty) >= self.batch_size:
+            return True
+        _, since = next(iter(self._dirty.values()))
+        return self.clock() - since >= self.flush_interval
+
+    def _wait_time(self) -> Optional[float]:
+        if not self._dirty:
+            return None
+        _, since = next(iter(self._dirty.values()))
+        now = self.clock()
+        return max(self.flush_interval - (now - since), self._retry_at - now, 0)
+
     def _worker(self):
-        while self.running:
-            try:
-                scope_key, entries = self.queue.get(timeout=1)
-                self.persistence.save(scope_key, entries)
-                self.queue.task_done()
-                print(f"Saved {scope_key} with {len(entries)} entries")
-            except Empty:
-                continue
-            except Exception as e:
-                logger.error(f"Error saving memory: {e}")
-                continue
+        while True:
+            with self._cond:
+                while self.running and not self._is_due():
+                    self._cond.wait(self._wait_time())
+                if not self._dirty:
+                    # 已停止且没有剩余的修改
+                    break
+                batch = self._take_batch()
+            self._write_batch(batch)
+
+    def _take_batch(self) -> List[Tuple[str, List[MemoryEntry], float]]:
+        now = self.clock()
+        batch = []
+        while self._dirty and len(batch) < self.batch_size:
+            scope_key, (entries, since) = self._dirty.popitem(last=False)
+            self._in_flight[scope_key] = entries
+            self.last_flush_lag = now - since
+            batch.append((scope_key, entries, since))
+        return batch
+
+    def _write_batch(self, batch: List[Tuple[str, List[MemoryEntry], float]]):
+        try:
+            self.persistence.save_batch([(scope_key, entries) for scope_key, entries, _ in batch])
+            self.saved += len(batch)
+            self._retry_delay = 0.0
+            logger.debug(f"Saved {len(batch)} memory scopes")
+        except Exception as e:
+            with self._cond:
+                self.errors += 1
+                self._retry_delay = min(
+                    max(self._retry_delay * 2, self.flush_interval, 0.1),
+                    max(MAX_RETRY_DELAY, self.flush_interval),
+                )
+                self._retry_at = self.clock() + self._retry_delay
+                # 没有更新的修改时重新标记为脏，排在最前面，退避后再尝试写入；
+                # 停止后不再退避，立即重试一次，仍然失败的作用域被丢弃
+                lost = []
+                for scope_key, entries, since in reversed(batch):
+                    if scope_key in self._dirty:
+                        continue
+                    if not self.running:
+                        if scope_key in self._final_attempted:
+                            lost.append(scope_key)
+                            continue
+                        self._final_attempted.add(scope_key)
+                    self._dirty[scope_key] = (entries, since)
+                    self._dirty.move_to_end(scope_key, last=False)
+            if lost:
+                logger.error(f"Error saving memory while stopping, {len(lost)} scopes lost: {', '.join(reversed(lost))}: {e}")
+            elif self.running:
+                logger.error(f"Error saving memory, retrying in {self._retry_delay:.1f}s: {e}")
+            else:
+                logger.error(f"Error saving memory while stopping, retrying once: {e}")
+        finally:
+            with self._cond:
+                for scope_key, entries, _ in batch:
+                    if self._in_flight.get(scope_key) is entries:
+                        del self._in_flight[scope_key]
 
     def load(self, scope_key: str) -> List[MemoryEntry]:
+        # 尚未写入的修改优先，保证被淘汰的作用域重新加载时不会读到旧数据
+        with self._cond:
+            if scope_key in self._dirty:
+                return list(self._dirty[scope_key][0])
+            if scope_key in self._in_flight:
+                return list(self._in_flight[scope_key])
         return self.persistence.load(scope_key)
 
     def save(self, scope_key: str, entries: List[MemoryEntry]):
-        self.queue.put((scope_key, entries))
+        # 复制一份快照，调用方之后对列表的修改不会影响后台线程
+        snapshot = list(entries)
+        with self._cond:
+            if scope_key in self._dirty:
+                self._dirty[scope_key] = (snapshot, self._dirty[scope_key][1])
+                self.coalesced += 1
+            else:
+                self._dirty[scope_key] = (snapshot, self.clock())
+                if len(self._dirty) == 1 or len(self._dirty) >= self.batch_size:
+                    self._cond.notify()
 
-    def stop(self):
-        self.running = False
-        self.worker.join()
+    def stop(self, timeout: Optional[float] = None):
+        """停止后台线程，在超时时间内写入所有剩余的修改"""
+        with self._cond:
+            self.running = False
+            self._cond.notify()
+        self.worker.join(self.drain_timeout if timeout is None else timeout)
+        if self.worker.is_alive():
+            with self._cond:
+                remaining = list(self._dirty) + list(self._in_flight)
+            logger.warning(
+                f"Timed out draining memory writes, {len(remaining)} scopes not persisted: {', '.join(remaining)}"
+            )
+            # 后台线程可能仍在写入，不关闭持久化层，避免在写入过程中关闭连接
+            return
         self.persistence.flush()
+        self.persistence.close()
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """获取写入队列统计，lag 为最早一个未写入的修改已等待的秒数"""
+        with self._cond:
+            if self._dirty:
+                _, since = next(iter(self._dirty.values()))
+                lag = self.clock() - since
+            else:
+                lag = 0.0
+            return {
+                "dirty_scopes": len(self._dirty),
+                "in_flight": len(self._in_flight),
+                "lag": lag,
+                "last_flush_lag": self.last_flush_lag,
+                "saved": self.saved,
+                "coalesced": self.coalesced,
+                "errors": self.errors,
+            }
@@ -4,6 +4,7 @@ from types import FunctionType
 
 from kirara_ai.im.sender import ChatSender, ChatType
 from kirara_ai.logger import get_logger
+from kirara_ai.memory.entry import MemoryEntry
 
 
 class MemoryJSONEncoder(json.JSONEncoder):
@@ -48,3 +49,34 @@ def memory_json_decoder(obj):
                 raw_metadata=obj["raw_metadata"],
             )
     return obj
+
+
+def encode_entry(entry: MemoryEntry) -> str:
+    """将记忆条目序列化为一行紧凑的 JSON"""
+    return json.dumps(
+        {
+            "sender": entry.sender,
+            "content": entry.content,
+            "timestamp": entry.timestamp,
+            "metadata": entry.metadata,
+        },
+        ensure_ascii=False,
+        separators=(",", ":"),
+        cls=MemoryJSONEncoder,
+    )
+
+
+def decode_entry(data) -> MemoryEntry:
+    """从一行 JSON 反序列化记忆条目"""
+    return entry_from_dict(json.loads(data, object_hook=memory_json_decoder))
+
+
+def entry_from_dict(entry: dict) -> MemoryEntry:
+    """从已经用 memory_json_decoder 解析的字典构造记忆条目"""
+    timestamp = entry["timestamp"]
+    return MemoryEntry(
+        sender=entry["sender"],
+        content=entry["content"],
+        timestamp=datetime.fromisoformat(timestamp) if isinstance(timestamp, str) else timestamp,
+        metadata=entry["metadata"],
+    )
@@ -0,0 +1,116 @@
+import os
+import threading
+from collections import deque
+from typing import List, Tuple
+
+from kirara_ai.logger import get_logger
+from kirara_ai.memory.entry import MemoryEntry
+
+from .base import MemoryPersistence, WrittenEntriesTracker
+from .codecs import decode_entry, encode_entry
+from .file_persistence import FileMemoryPersistence
+
+logger = get_logger("JsonlMemoryPersistence")
+
+
+class JsonlMemoryPersistence(MemoryPersistence):
+    """
+    追加写入的文件持久化实现，每个作用域对应一个 JSONL 文件，每行一条记忆。
+
+    保存时只追加上次保存之后新增的记忆，文件行数超过 compact_ratio 倍的 max_entries 时重写为当前的记忆，
+    因此每条消息的写入量与历史长度无关。加载时逐行读取，只保留最近的 max_entries 条记忆；
+    末尾因进程崩溃而写了一半的行会被截断，不影响之前的记忆。
+    """
+
+    def __init__(self, data_dir: str, max_entries: int = 100, compact_ratio: int = 2):
+        if not os.path.isabs(data_dir):
+            data_dir = os.path.abspath(data_dir)
+
+        self.data_dir = data_dir
+        self.max_entries = max_entries
+        self.compact_ratio = compact_ratio
+        os.makedirs(data_dir, exist_ok=True)
+
+        # 记录每个作用域最后写入的记忆和文件行数
+        self._written = WrittenEntriesTracker()
+        self._lock = threading.Lock()
+        # 兼容旧版 FileMemoryPersistence 保存的 JSON 文件
+        self._legacy = FileMemoryPersistence(data_dir)
+
+    def _get_file_path(self, scope_key: str) -> str:
+        scope_key = scope_key.replace(":", "_")
+        return os.path.join(self.data_dir, f"{scope_key}.jsonl")
+
+    def save(self, scope_key: str, entries: List[MemoryEntry]) -> None:
+        with self._lock:
+            new_entries = self._written.new_entries(scope_key, entries)
+            if new_entries is None:
+                self._rewrite(scope_key, entries)
+                return
+            if not new_entries:
+                return
+
+            line_count = self._written.count(scope_key) + len(new_entries)
+            if line_count > self.compact_ratio * max(self.max_entries, 1):
+                self._rewrite(scope_key, entries)
+                return
+
+            with open(self._get_file_path(scope_key), "a", encoding="utf-8") as f:
+                f.write("".join(encode_entry(entry) + "\n" for entry in new_entries))
+            self._written.mark(scope_key, new_entries, line_count)
+
+    def _rewrite(self, scope_key: str, entries: List[MemoryEntry]):
+        """将文件重写为当前的记忆（压缩），先写入临时文件再替换，避免中途崩溃损坏原文件"""
+        entries = entries[-self.max_entries :] if self.max_entries > 0 else list(entries)
+        file_path = self._get_file_path(scope_key)
+        tmp_path = file_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("".join(encode_entry(entry) + "\n" for entry in entries))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+        self._written.mark(scope_key, entries, len(entries))
+        # 作用域已迁移为 JSONL 格式，删除旧版的 JSON 文件，避免留下过期的副本
+        legacy_path = self._legacy._get_file_path(scope_key)
+        if os.path.exists(legacy_path):
+            os.remove(legacy_path)
+
+    def load(self, scope_key: str) -> List[MemoryEntry]:
+        with self._lock:
+            file_path = self._get_file_path(scope_key)
+            if not os.path.exists(file_path):
+                # 旧版的 JSON 文件在下次保存时重写为 JSONL 格式
+                return self._legacy.load(scope_key)
+
+            entries, line_count = self._read(file_path)
+            self._written.mark(scope_key, entries, line_count)
+            return entries
+
+    def _read(self, file_path: str) -> Tuple[List[MemoryEntry], int]:
+        maxlen = self.max_entries if self.max_entries > 0 else None
+        entries: deque = deque(maxlen=maxlen)
+        line_count = 0
+        valid_size = 0
+        with open(file_path, "rb") as f:
+            for raw_line in f:
+                if not raw_line.endswith(b"\n"):
+                    # 写了一半的最后一行
+                    logger.warning(f"Truncating incomplete record at the end of {file_path}")
+                    break
+                try:
+                    entries.append(decode_entry(raw_line))
+                    line_count += 1
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.warning(f"Skipping corrupted record in {file_path}: {e}")
+                    line_count += 1
+                valid_size += len(raw_line)
+
+        if valid_size != os.path.getsize(file_path):
+            # 截断不完整的行，避免之后追加的记录与其拼接在一起
+            with open(file_path, "r+b") as f:
+                f.truncate(valid_size)
+        return list(entries), line_count
+
+    def flush(self) -> None:
+        # 每次保存都直接写入文件，不需要特别的flush操作
+        pass
@@ -0,0 +1,166 @@
+import asyncio
+import concurrent.futures
+import json
+import threading
+from typing import Any, Coroutine, List, Optional, Tuple
+
+from kirara_ai.logger import get_logger
+from kirara_ai.memory.entry import MemoryEntry
+
+from .base import MemoryPersistence, WrittenEntriesTracker
+from .codecs import decode_entry, encode_entry, entry_from_dict, memory_json_decoder
+
+logger = get_logger("RedisListMemoryPersistence")
+
+
+class RedisListMemoryPersistence(MemoryPersistence):
+    """
+    基于 Redis 列表的持久化实现，每个作用域对应一个列表，每个元素是一条记忆。
+
+    保存时只 RPUSH 上次保存之后新增的记忆并 LTRIM 到 max_entries 条，加载时 LRANGE 读取最近的记忆，
+    因此每条消息的网络传输量与历史长度无关。批量保存的多个作用域通过一次 pipeline 写入。
+    使用 redis.asyncio 的连接池，命令在专用的事件循环线程中执行。
+    同一作用域的保存需要由调用方保证先后顺序（AsyncMemoryPersistence 只有一个写入线程）。
+    """
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        host: str = "localhost",
+        port: int = 6379,
+        db: int = 0,
+        max_entries: int = 100,
+        ttl: int = 0,
+        key_prefix: str = "kirara:memory:",
+        max_connections: int = 10,
+        timeout: float = 10.0,
+        client: Any = None,
+    ):
+        self.max_entries = max_entries
+        # 作用域的过期时间（秒），每次写入时刷新，0 表示不过期
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+        self.timeout = timeout
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True, name="RedisMemoryPersistence")
+        self._thread.start()
+
+        if client is None:
+            import redis.asyncio as redis
+
+            if redis_url:
+                pool = redis.ConnectionPool.from_url(redis_url, max_connections=max_connections)
+            else:
+                pool = redis.ConnectionPool(host=host, port=port, db=db, max_connections=max_connections)
+            client = redis.Redis(connection_pool=pool)
+        self.redis = client
+
+        self._written = WrittenEntriesTracker()
+        # 只保护已写入记录的读写，网络请求不持有锁，不同的加载和写入可以并发使用连接池
+        self._lock = threading.Lock()
+
+    def _run(self, coro: Coroutine):
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            return future.result(self.timeout)
+        except concurrent.futures.TimeoutError:
+            # 超时后不再让命令在后台继续执行
+            future.cancel()
+            raise
+
+    def _get_key(self, scope_key: str) -> str:
+        return f"{self.key_prefix}{scope_key}"
+
+    def save(self, scope_key: str, entries: List[MemoryEntry]) -> None:
+        self.save_batch([(scope_key, entries)])
+
+    def save_batch(self, batch: List[Tuple[str, List[MemoryEntry]]]) -> None:
+        with self._lock:
+            writes = []
+            for scope_key, entries in batch:
+                new_entries = self._written.new_entries(scope_key, entries)
+                # 无法判断新增的记忆时重写整个列表
+                rewrite = new_entries is None
+                if rewrite:
+                    new_entries = entries[-self.max_entries :] if self.max_entries > 0 else list(entries)
+                if rewrite or new_entries:
+                    writes.append((scope_key, entries, new_entries, rewrite))
+            if not writes:
+                return
+            # 先记录为已写入，并发保存同一作用域时只追加之后的记忆
+            for scope_key, entries, _, _ in writes:
+                self._written.mark(scope_key, entries, 0)
+
+        try:
+            self._run(self._write(writes))
+        except Exception:
+            # 超时或连接断开时无法确定事务是否已经提交，重试时重写这些作用域，避免重复追加
+            with self._lock:
+                for scope_key, _, _, _ in writes:
+                    self._written.forget(scope_key)
+            raise
+
+    async def _write(self, writes: List[Tuple[str, List[MemoryEntry], List[MemoryEntry], bool]]):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for scope_key, _, new_entries, rewrite in writes:
+                key = self._get_key(scope_key)
+                if rewrite:
+                    # 同时删除旧版 RedisMemoryPersistence 的键，清空或重写后不会再读到旧数据
+                    pipe.delete(key, scope_key)
+                if new_entries:
+                    pipe.rpush(key, *(encode_entry(entry) for entry in new_entries))
+                    if self.max_entries > 0:
+                        pipe.ltrim(key, -self.max_entries, -1)
+                    if self.ttl > 0:
+                        pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+    def load(self, scope_key: str) -> List[MemoryEntry]:
+        records, legacy_type = self._run(self._read(scope_key))
+        if not records:
+            if legacy_type in (b"string", "string"):
+                # 旧版 RedisMemoryPersistence 保存的记忆在下次保存时重写为列表
+                return self._load_legacy(scope_key)
+            return []
+
+        entries = []
+        for record in records:
+            try:
+                entries.append(decode_entry(record))
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Skipping corrupted record in {scope_key}: {e}")
+        with self._lock:
+            self._written.mark(scope_key, entries, 0)
+        return entries
+
+    async def _read(self, scope_key: str):
+        """在一次往返中读取列表和旧版键的类型，新的作用域不需要额外请求旧版键"""
+        start = -self.max_entries if self.max_entries > 0 else 0
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.lrange(self._get_key(scope_key), start, -1)
+            pipe.type(scope_key)
+            return await pipe.execute()
+
+    def _load_legacy(self, scope_key: str) -> List[MemoryEntry]:
+        data = self._run(self.redis.get(scope_key))
+        if not data:
+            return []
+        try:
+            entries = [entry_from_dict(entry) for entry in json.loads(data, object_hook=memory_json_decoder)]
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Failed to load legacy memory {scope_key}: {e}")
+            return []
+        return entries[-self.max_entries :] if self.max_entries > 0 else entries
+
+    def flush(self) -> None:
+        # 每次保存都已经写入 Redis，服务端的持久化由 Redis 自身的配置负责
+        pass
+
+    def close(self) -> None:
+        """关闭连接池并停止事件循环线程"""
+        try:
+            self._run(self.redis.aclose())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(self.timeout)
@@ -1,10 +1,17 @@
 from abc import ABC, abstractmethod
+from typing import ClassVar, List
 
 from kirara_ai.im.sender import ChatSender
 
 
 class MemoryScope(ABC):
-    """记忆作用域抽象类"""
+    """
+    记忆作用域抽象类。
+    查询时只读取 get_query_keys 返回的键值对应的记忆；
+    如果作用域内的记忆可能分布在任意键值下，将 scan_all_scopes 设为 True，查询时会遍历所有已加载的记忆。
+    """
+
+    scan_all_scopes: ClassVar[bool] = False
 
     @abstractmethod
     def get_scope_key(self, sender: ChatSender) -> str:
@@ -13,3 +20,7 @@ class MemoryScope(ABC):
     @abstractmethod
     def is_in_scope(self, target_sender: ChatSender, query_sender: ChatSender) -> bool:
         """判断是否在作用域内"""
+
+    def get_query_keys(self, query_sender: ChatSender) -> List[str]:
+        """获取查询该发送者的记忆时需要读取的键值，默认只读取发送者自身的作用域"""
+        return [self.get_scope_key(query_sender)]
@@ -1,7 +1,7 @@
 import asyncio
 import re
 import time
-from typing import Any, Dict, List, Optional, Protocol
+from typing import Any, Dict, List, Optional, Protocol, Set
 
 from fastapi import Body, FastAPI, Query, Request
 from fastapi.responses import JSONResponse
@@ -89,6 +89,21 @@ class HttpLegacyAdapter(IMAdapter):
         self.app = FastAPI(title="HTTP Legacy API")
         self.request_dic: Dict[str, V2Request] = {}
         self.logger = get_logger("HTTP-Legacy-Adapter")
+        # 正在运行的消息处理任务，保留引用避免任务在运行中被回收
+        self._dispatch_tasks: Set[asyncio.Task] = set()
+
+    def _start_dispatch(self, message: IMMessage) -> asyncio.Task:
+        """在独立任务中处理消息，请求结束或客户端断开后仍然运行完成"""
+        task = asyncio.create_task(self._dispatch_message(message))
+        self._dispatch_tasks.add(task)
+        task.add_done_callback(self._dispatch_tasks.discard)
+        return task
+
+    async def _dispatch_message(self, message: IMMessage):
+        try:
+            await self.dispatcher.dispatch(self, message)
+        except Exception as e:
+            self.logger.error(f"Workflow execution failed: {e}", exc_info=True)
 
     def convert_to_message(self, raw_message: Any) -> IMMessage:
         data = raw_message
@@ -167,7 +182,8 @@ class HttpLegacyAdapter(IMAdapter):
 
             message.sender.raw_metadata["callback_func"] = handle_response
 
-            await self.dispatcher.dispatch(self, message)
+            # v1 接口需要等待回复后再返回，工作流在独立任务中运行，客户端断开连接时不会中断所在会话的队列
+            await asyncio.shield(self._start_dispatch(message))
             return result.to_dict()
 
         @app.post("/v2/chat")
@@ -194,7 +210,7 @@ class HttpLegacyAdapter(IMAdapter):
                 bot_request.response_event.set()
 
             message.sender.raw_metadata["callback_func"] = handle_response
-            asyncio.create_task(self.dispatcher.dispatch(self, message))
+            self._start_dispatch(message)
             return request_time
 
         @app.get("/v2/chat/response")
@@ -2,7 +2,7 @@ import asyncio
 import base64
 import functools
 import uuid
-from typing import Optional
+from typing import Optional, Set
 
 import ymbotpy as botpy
 import ymbotpy.message
@@ -87,6 +87,8 @@ class QQBotAdapter(botpy.WebHookClient, IMAdapter, BotProfileAdapter):
         self.config = config
         self.is_sandbox = config.sandbox
         self.logger = get_logger("QQBot-Adapter")
+        # 正在运行的消息处理任务，保留引用避免任务在运行中被回收
+        self._dispatch_tasks: Set[asyncio.Task] = set()
         super().__init__(
             timeout=5,
             is_sandbox=self.is_sandbox,
@@ -194,7 +196,7 @@ class QQBotAdapter(botpy.WebHookClient, IMAdapter, BotProfileAdapter):
         """
         self.logger.debug(f"收到 C2C 消息: {message}")
         message = self.convert_to_message(message)
-        await self.dispatcher.dispatch(self, message)
+        self._start_dispatch(message)
 
     async def on_group_at_message_create(self, message: ymbotpy.message.GroupMessage):
         """
@@ -206,7 +208,19 @@ class QQBotAdapter(botpy.WebHookClient, IMAdapter, BotProfileAdapter):
         # 这个逆天的 Webhook 居然不包含 mention 字段，这里要手动补上
         message.message_elements.append(
             MentionElement(target=ChatSender.get_bot_sender()))
-        await self.dispatcher.dispatch(self, message)
+        self._start_dispatch(message)
+
+    def _start_dispatch(self, message: IMMessage):
+        """在后台处理消息，不阻塞其他会话的消息"""
+        task = asyncio.create_task(self._dispatch_message(message))
+        self._dispatch_tasks.add(task)
+        task.add_done_callback(self._dispatch_tasks.discard)
+
+    async def _dispatch_message(self, message: IMMessage):
+        try:
+            await self.dispatcher.dispatch(self, message)
+        except Exception as e:
+            self.logger.error(f"Workflow execution failed: {e}", exc_info=True)
 
     async def get_bot_profile(self) -> Optional[UserProfile]:
         """
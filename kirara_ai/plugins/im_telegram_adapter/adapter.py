@@ -1,7 +1,7 @@
 import asyncio
 import random
 from functools import lru_cache
-from typing import Optional
+from typing import Optional, Set
 
 import telegramify_markdown
 from pydantic import BaseModel, ConfigDict, Field
@@ -57,6 +57,8 @@ class TelegramAdapter(IMAdapter, UserProfileAdapter, EditStateAdapter, BotProfil
             )
         )
         self.logger = get_logger("Telegram-Adapter")
+        # 正在运行的消息处理任务，保留引用避免任务在运行中被回收
+        self._dispatch_tasks: Set[asyncio.Task] = set()
 
     async def command_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """处理 /start 命令"""
@@ -66,9 +68,16 @@ class TelegramAdapter(IMAdapter, UserProfileAdapter, EditStateAdapter, BotProfil
         """处理接收到的消息"""
         # 将 Telegram 消息转换为 Message 对象
         message = self.convert_to_message(update)
+        # 不等待工作流运行结束，避免一个会话的慢工作流阻塞其他会话的消息
+        task = asyncio.create_task(self._dispatch_message(update, message))
+        self._dispatch_tasks.add(task)
+        task.add_done_callback(self._dispatch_tasks.discard)
+
+    async def _dispatch_message(self, update: Update, message: IMMessage):
         try:
             await self.dispatcher.dispatch(self, message)
         except Exception as e:
+            self.logger.error(f"Workflow execution failed: {e}", exc_info=True)
             await update.message.reply_text(
                 f"Workflow execution failed, please try again later: {str(e)}"
             )
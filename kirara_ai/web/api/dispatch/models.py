@@ -1,17 +1,31 @@
-from typing import List
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel
 
 from kirara_ai.workflow.core.dispatch import CombinedDispatchRule
 
 
+class DispatchRuleStats(BaseModel):
+    """调度规则匹配统计，耗时单位为秒"""
+
+    evaluations: int = 0
+    matches: int = 0
+    match_ratio: float = 0.0
+    total_time: float = 0.0
+    mean_time: float = 0.0
+    max_time: float = 0.0
+
+
 class DispatchRuleList(BaseModel):
     """调度规则列表"""
 
     rules: List[CombinedDispatchRule]
+    # 按规则 ID 索引的匹配统计
+    stats: Dict[str, DispatchRuleStats] = {}
 
 
 class DispatchRuleResponse(BaseModel):
     """调度规则响应"""
 
     rule: CombinedDispatchRule
+    stats: Optional[DispatchRuleStats] = None
@@ -16,8 +16,11 @@ async def list_rules():
     registry: DispatchRuleRegistry = g.container.resolve(DispatchRuleRegistry)
     rules = registry.get_all_rules()
     rules.sort(key=lambda x: x.priority, reverse=True)
-    rules = [rule.model_dump() for rule in rules]
-    return DispatchRuleList(rules=rules).model_dump()
+    stats = registry.metrics.snapshot()
+    return DispatchRuleList(
+        rules=[rule.model_dump() for rule in rules],
+        stats={rule.rule_id: stats.get(rule.rule_id, {}) for rule in rules},
+    ).model_dump()
 
 
 @dispatch_bp.route("/rules/<rule_id>", methods=["GET"])
@@ -30,7 +33,7 @@ async def get_rule(rule_id: str):
     if not rule:
         return jsonify({"error": "Rule not found"}), 404
 
-    return DispatchRuleResponse(rule=rule).model_dump()
+    return DispatchRuleResponse(rule=rule, stats=registry.metrics.get(rule_id) or {}).model_dump()
 
 
 @dispatch_bp.route("/rules", methods=["POST"])
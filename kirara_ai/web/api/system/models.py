@@ -1,4 +1,4 @@
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional, Union
 
 from pydantic import BaseModel
 
@@ -14,6 +14,7 @@ class SystemStatus(BaseModel):
     workflow_count: int
     memory_usage: Dict[str, float]
     cpu_usage: float
+    block_pool: Optional[Dict[str, int]] = None
 
 
 class SystemStatusResponse(BaseModel):
@@ -22,6 +23,42 @@ class SystemStatusResponse(BaseModel):
     status: SystemStatus
 
 
+class HistogramSnapshot(BaseModel):
+    """滚动直方图快照"""
+
+    count: int
+    mean: float
+    p50: float
+    p90: float
+    p99: float
+    max: float
+
+
+class BlockMetrics(BaseModel):
+    """同一工作流中同一类型 block 的执行统计"""
+
+    workflow_id: str
+    block_type: str
+    total: int
+    errors: int
+    on_loop: int
+    in_thread: int
+    queue_wait: HistogramSnapshot
+    duration: HistogramSnapshot
+    output_size: HistogramSnapshot
+
+
+class SystemMetricsResponse(BaseModel):
+    """工作流执行指标响应"""
+
+    blocks: List[BlockMetrics]
+    block_pool: Optional[Dict[str, int]] = None
+    lanes: Optional[Dict[str, int]] = None
+    admission: Optional[Dict[str, Any]] = None
+    memory_cache: Optional[Dict[str, int]] = None
+    memory_persistence: Optional[Dict[str, Union[int, float]]] = None
+
+
 class UpdateStatus(BaseModel):
     status: str
     message: str
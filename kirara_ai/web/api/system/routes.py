@@ -18,14 +18,19 @@ from kirara_ai.im.manager import IMManager
 from kirara_ai.internal import set_restart_flag, shutdown_event
 from kirara_ai.llm.llm_manager import LLMManager
 from kirara_ai.logger import WebSocketLogHandler, get_logger
+from kirara_ai.memory.memory_manager import MemoryManager
 from kirara_ai.plugin_manager.plugin_loader import PluginLoader
 from kirara_ai.web.api.system.utils import (download_file, get_installed_version, get_latest_npm_version,
                                             get_latest_pypi_version)
 from kirara_ai.web.auth.services import AuthService
+from kirara_ai.workflow.core.dispatch import WorkflowDispatcher
+from kirara_ai.workflow.core.dispatch.admission import AdmissionController
+from kirara_ai.workflow.core.execution.metrics import BlockExecutionMetrics
+from kirara_ai.workflow.core.execution.pool import BlockExecutorPool
 from kirara_ai.workflow.core.workflow import WorkflowRegistry
 
 from ...auth.middleware import require_auth
-from .models import SystemStatus, SystemStatusResponse, UpdateCheckResponse
+from .models import SystemMetricsResponse, SystemStatus, SystemStatusResponse, UpdateCheckResponse
 
 system_bp = Blueprint("system", __name__)
 
@@ -203,6 +208,12 @@ async def get_system_status():
     }
     cpu_usage = process.cpu_percent()
 
+    # 获取 block 执行线程池状态
+    try:
+        block_pool = g.container.resolve(BlockExecutorPool).get_stats()
+    except KeyError:
+        block_pool = None
+
     status = SystemStatus(
         uptime=uptime,
         active_adapters=active_adapters,
@@ -212,11 +223,54 @@ async def get_system_status():
         memory_usage=memory_usage,
         cpu_usage=cpu_usage,
         version=get_installed_version(),
+        block_pool=block_pool,
     )
 
     return SystemStatusResponse(status=status).model_dump()
 
 
+@system_bp.route("/metrics", methods=["GET"])
+@require_auth
+async def get_system_metrics():
+    """获取工作流 block 执行指标、会话队列和工作流准入控制指标，以及记忆缓存、持久化指标"""
+    try:
+        blocks = g.container.resolve(BlockExecutionMetrics).snapshot()
+    except KeyError:
+        blocks = []
+
+    try:
+        block_pool = g.container.resolve(BlockExecutorPool).get_stats()
+    except KeyError:
+        block_pool = None
+
+    try:
+        lanes = g.container.resolve(WorkflowDispatcher).lanes.stats()
+    except KeyError:
+        lanes = None
+
+    try:
+        admission = g.container.resolve(AdmissionController).stats()
+    except KeyError:
+        admission = None
+
+    try:
+        memory_manager = g.container.resolve(MemoryManager)
+        memory_cache = memory_manager.get_cache_stats()
+        memory_persistence = memory_manager.get_persistence_stats()
+    except KeyError:
+        memory_cache = None
+        memory_persistence = None
+
+    return SystemMetricsResponse(
+        blocks=blocks,
+        block_pool=block_pool,
+        lanes=lanes,
+        admission=admission,
+        memory_cache=memory_cache,
+        memory_persistence=memory_persistence,
+    ).model_dump()
+
+
 @system_bp.route("/check-update", methods=["GET"])
 @require_auth
 async def check_update():
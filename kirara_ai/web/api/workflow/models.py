@@ -19,6 +19,7 @@ class BlockInstance(BaseModel):
     name: str
     config: Dict[str, Any]
     position: Dict[str, int]  # x, y 坐标
+    timeout: Optional[float] = None  # 执行超时时间（秒），为空时使用 block 默认值
 
 
 class WorkflowDefinition(BaseModel):
@@ -58,6 +58,7 @@ async def get_workflow(group_id: str, workflow_id: str):
                 "name": block.name,
                 "config": builder.nodes_by_name[block.name].spec.kwargs,
                 "position": position if position else {"x": 0, "y": 0},
+                "timeout": builder.nodes_by_name[block.name].spec.timeout,
             }
         )
 
@@ -116,6 +117,8 @@ async def create_workflow(group_id: str, workflow_id: str):
                 builder.use(block_class, name=block_def.name, **block_def.config)
             else:
                 builder.chain(block_class, name=block_def.name, **block_def.config)
+            if block_def.timeout is not None:
+                builder.timeout(block_def.timeout)
 
             builder.update_position(block_def.name, block_def.position)
 
@@ -132,6 +135,9 @@ async def create_workflow(group_id: str, workflow_id: str):
                 source_block, target_block, wire.source_output, wire.target_input
             )
 
+        # 保存前检查连线类型，类型不兼容时直接返回错误
+        builder.validate(block_registry)
+
         # 保存工作流
         file_path = registry.get_workflow_path(group_id, workflow_id)
         builder.save_to_yaml(file_path, g.container)
@@ -175,6 +181,8 @@ async def update_workflow(group_id: str, workflow_id: str):
                 builder.use(block_class, name=block_def.name, **block_def.config)
             else:
                 builder.chain(block_class, name=block_def.name, **block_def.config)
+            if block_def.timeout is not None:
+                builder.timeout(block_def.timeout)
 
             builder.update_position(block_def.name, block_def.position)
         # 添加连接
@@ -190,6 +198,9 @@ async def update_workflow(group_id: str, workflow_id: str):
                 source_block, target_block, wire.source_output, wire.target_input
             )
 
+        # 保存前检查连线类型，类型不兼容时直接返回错误
+        builder.validate(block_registry)
+
         # 保存工作流
         file_path = registry.get_workflow_path(group_id, workflow_id)
         if os.path.exists(file_path):
@@ -221,7 +232,7 @@ async def delete_workflow(group_id: str, workflow_id: str):
 
     try:
         # 从注册表中移除
-        registry._workflows.pop(full_id, None)
+        registry.unregister(group_id, workflow_id)
 
         # 删除文件
         file_path = registry.get_workflow_path(group_id, workflow_id)
@@ -1,3 +1,4 @@
+import copy
 from typing import Any, Callable, Dict, Optional
 
 from kirara_ai.workflow.core.block.input_output import Input, Output
@@ -14,6 +15,13 @@ class Block:
     inputs: Dict[str, Input] = {}
     # block 的输出
     outputs: Dict[str, Output] = {}
+    # 同步 execute 是否可能阻塞事件循环，为 True 时放到 block 线程池中执行，
+    # 为 False 时直接在事件循环中调用。async def execute 的 block 总是直接在事件循环中 await。
+    blocking: bool = True
+    # 执行超时时间（秒），None 表示使用全局配置 workflow.block_timeout，0 表示不限制
+    timeout: Optional[float] = None
+    # 执行超时或工作流被取消后置为 True，在线程池中长时间运行的 block 可以据此提前退出
+    cancelled: bool = False
 
     def __init__(
         self,
@@ -33,11 +41,23 @@ class Block:
         # Placeholder for block logic
         return {output: f"Processed {kwargs}" for output in self.outputs}
 
+    def on_timeout(self, **kwargs) -> Optional[Dict[str, Any]]:
+        """
+        执行超时时调用，参数与 execute 相同。
+        返回的字典会作为该 block 的输出继续执行后续节点，返回 None 表示工作流以超时失败。
+        """
+        return None
+
+    def clone(self) -> "Block":
+        """复制出一个用于单次运行的 block，子类需要重置运行期间会修改的状态"""
+        return copy.copy(self)
+
 
 class ConditionBlock(Block):
     """条件判断块"""
 
     name: str = "condition"
+    blocking = False
     outputs: Dict[str, Output] = {
         "condition_result": Output("condition_result", "条件结果", bool, "条件结果")
     }
@@ -60,6 +80,7 @@ class LoopBlock(Block):
     """循环控制块"""
 
     name: str = "loop"
+    blocking = False
     outputs: Dict[str, Output] = {
         "should_continue": Output("should_continue", "是否继续", bool, "是否继续"),
         "iteration": Output("iteration", "当前迭代数据", dict, "当前迭代数据"),
@@ -77,6 +98,11 @@ class LoopBlock(Block):
         self.iteration_var = iteration_var
         self.iteration_count = 0
 
+    def clone(self) -> "LoopBlock":
+        block = super().clone()
+        block.iteration_count = 0
+        return block
+
     def execute(self, **kwargs) -> Dict[str, Any]:
         should_continue = self.condition_func(kwargs)
         self.iteration_count += 1
@@ -90,6 +116,7 @@ class LoopEndBlock(Block):
     """循环结束块，收集循环结果"""
 
     name: str = "loop_end"
+    blocking = False
     outputs: Dict[str, Output] = {
         "loop_results": Output("loop_results", "收集的循环结果", list, "收集的循环结果")
     }
@@ -99,6 +126,11 @@ class LoopEndBlock(Block):
         self.inputs = inputs
         self.results = []
 
+    def clone(self) -> "LoopEndBlock":
+        block = super().clone()
+        block.results = []
+        return block
+
     def execute(self, **kwargs) -> Dict[str, Any]:
         self.results.append(kwargs)
         return {"loop_results": self.results}
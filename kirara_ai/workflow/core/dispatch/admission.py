@@ -0,0 +1,141 @@
+import asyncio
+import heapq
+import itertools
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass
+class AdmissionTicket:
+    """
+    一次工作流运行的准入结果，运行期间注册在容器中。
+    admitted 为 True 表示占用了运行名额，运行结束后需要归还；
+    degraded_model 不为空时，工作流应当使用该模型代替原本配置的模型。
+    """
+
+    workflow_id: str
+    priority: int = 1
+    admitted: bool = False
+    degraded_model: Optional[str] = None
+
+
+class AdmissionController:
+    """
+    工作流运行的准入控制。
+
+    限制全局和每个工作流同时运行的数量，超出限制的运行进入有界等待队列，按优先级（数值越小越优先）和到达顺序依次放行。
+    等待队列已满时拒绝准入，由调用方根据配置的策略处理溢出的请求。
+    """
+
+    def __init__(
+        self,
+        max_running: int = 0,
+        workflow_limits: Optional[Dict[str, int]] = None,
+        queue_size: int = 64,
+    ):
+        # 全局最多同时运行的工作流数量，0 表示不限制
+        self.max_running = max_running
+        # 每个工作流最多同时运行的数量，未配置的工作流不限制
+        self.workflow_limits = dict(workflow_limits or {})
+        self.queue_size = queue_size
+
+        self.running = 0
+        self.running_by_workflow: Dict[str, int] = {}
+        # (优先级, 序号, 工作流 ID, 等待者)
+        self._queue: List[Tuple[int, int, str, asyncio.Future]] = []
+        self._counter = itertools.count()
+
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.degraded = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_running > 0 or bool(self.workflow_limits)
+
+    def _has_capacity(self, workflow_id: str) -> bool:
+        if self.max_running > 0 and self.running >= self.max_running:
+            return False
+        limit = self.workflow_limits.get(workflow_id, 0)
+        return limit <= 0 or self.running_by_workflow.get(workflow_id, 0) < limit
+
+    def _take(self, workflow_id: str):
+        self.running += 1
+        self.running_by_workflow[workflow_id] = self.running_by_workflow.get(workflow_id, 0) + 1
+        self.admitted += 1
+
+    async def acquire(self, workflow_id: str, priority: int = 1) -> bool:
+        """
+        申请运行指定的工作流，没有空闲名额时排队等待。
+        返回 False 表示等待队列已满，请求被拒绝；返回 True 后必须调用 release 归还名额。
+        """
+        if not self._queue and self._has_capacity(workflow_id):
+            self._take(workflow_id)
+            return True
+        if len(self._queue) >= self.queue_size:
+            self.rejected += 1
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._counter), workflow_id, future)
+        heapq.heappush(self._queue, entry)
+        # 排在前面的请求可能只是受限于各自工作流的限制，该请求可以直接运行
+        self._wake()
+        if future.done():
+            return True
+        self.queued += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 已经分配了名额，但等待方被取消
+                self.release(workflow_id)
+            elif entry in self._queue:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+            raise
+        return True
+
+    def release(self, workflow_id: str):
+        """归还名额，并按优先级放行等待中的请求"""
+        self.running -= 1
+        count = self.running_by_workflow.get(workflow_id, 0) - 1
+        if count > 0:
+            self.running_by_workflow[workflow_id] = count
+        else:
+            self.running_by_workflow.pop(workflow_id, None)
+        self._wake()
+
+    def _wake(self):
+        # 按优先级顺序查找可以运行的请求，达到单个工作流限制的请求不阻塞其他工作流
+        for entry in sorted(self._queue):
+            if self.max_running > 0 and self.running >= self.max_running:
+                break
+            _, _, workflow_id, future = entry
+            if future.done():
+                self._queue.remove(entry)
+                continue
+            if self._has_capacity(workflow_id):
+                self._queue.remove(entry)
+                self._take(workflow_id)
+                future.set_result(True)
+        heapq.heapify(self._queue)
+
+    def record_degraded(self):
+        """记录一次降级运行"""
+        self.degraded += 1
+
+    def stats(self) -> Dict:
+        """获取准入控制统计"""
+        return {
+            "running": self.running,
+            "queue_depth": len(self._queue),
+            "max_running": self.max_running,
+            "queue_size": self.queue_size,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "degraded": self.degraded,
+            "running_by_workflow": dict(self.running_by_workflow),
+        }
@@ -0,0 +1,251 @@
+"""
+调度规则匹配性能测试。
+
+生成指定数量和类型比例的调度规则，以及一组模拟消息，只进行规则匹配而不执行工作流，
+统计吞吐量和单条消息的匹配耗时。用于验证规则引擎的改动，以及评估单个实例能够承载的自定义命令数量。
+
+用法：
+    python -m kirara_ai.workflow.core.dispatch.benchmark --rules 500 --messages 10000
+"""
+
+import argparse
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from kirara_ai.im.message import IMMessage, MentionElement, MessageElement, TextMessage
+from kirara_ai.im.sender import ChatSender
+from kirara_ai.ioc.container import DependencyContainer
+from kirara_ai.workflow.core.dispatch.dispatcher import WorkflowDispatcher
+from kirara_ai.workflow.core.dispatch.models.dispatch_rules import CombinedDispatchRule, RuleGroup, SimpleDispatchRule
+from kirara_ai.workflow.core.dispatch.registry import DispatchRuleRegistry
+from kirara_ai.workflow.core.execution.metrics import RollingHistogram
+from kirara_ai.workflow.core.workflow.registry import WorkflowRegistry
+
+# 默认的规则类型比例
+DEFAULT_RULE_MIX: Dict[str, float] = {
+    "prefix": 0.4,
+    "keyword": 0.2,
+    "regex": 0.15,
+    "bot_mention": 0.05,
+    "chat_type": 0.05,
+    "combined": 0.15,
+}
+
+WORDS = [
+    "hello", "world", "今天", "天气", "怎么样", "帮我", "看看", "这个", "图片", "一下",
+    "what", "is", "the", "time", "吃饭", "了吗", "晚安", "早上好", "thanks", "ok",
+]
+
+
+@dataclass
+class BenchmarkConfig:
+    """性能测试配置"""
+
+    rules: int = 200
+    messages: int = 5000
+    seed: int = 0
+    rule_mix: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_RULE_MIX))
+    # 群聊消息的比例
+    group_ratio: float = 0.5
+    # @机器人的消息比例
+    mention_ratio: float = 0.1
+    # 以命令前缀开头的消息比例
+    command_ratio: float = 0.3
+    # 包含关键词的消息比例
+    keyword_ratio: float = 0.2
+    # 预热轮数，预热期间的匹配不计入统计
+    warmup: int = 1
+    # 是否在规则末尾添加一条兜底规则
+    fallback: bool = True
+
+
+def _simple(rule_type: str, **config: Any) -> SimpleDispatchRule:
+    return SimpleDispatchRule(type=rule_type, config=config)
+
+
+def _make_groups(kind: str, i: int) -> List[RuleGroup]:
+    """生成第 i 条规则的规则组"""
+    if kind == "prefix":
+        return [RuleGroup(operator="or", rules=[_simple("prefix", prefix=f"/cmd{i}")])]
+    if kind == "keyword":
+        return [RuleGroup(operator="or", rules=[_simple("keyword", keywords=[f"kw{i}", f"关键词{i}"])])]
+    if kind == "regex":
+        return [RuleGroup(operator="or", rules=[_simple("regex", pattern=rf"^(re{i}|正则{i})\s+\S+")])]
+    if kind == "bot_mention":
+        return [RuleGroup(operator="or", rules=[_simple("bot_mention")])]
+    if kind == "chat_type":
+        return [RuleGroup(operator="or", rules=[_simple("chat_type", chat_type="群聊")])]
+    if kind == "combined":
+        # 常见的“群聊 且 @机器人 且 正则”规则
+        return [
+            RuleGroup(
+                operator="and",
+                rules=[
+                    _simple("chat_type", chat_type="群聊"),
+                    _simple("bot_mention"),
+                    _simple("regex", pattern=rf"(ask{i}|问{i})\s*(.+)"),
+                ],
+            ),
+            RuleGroup(operator="or", rules=[_simple("prefix", prefix=f"/ask{i}"), _simple("keyword", keywords=[f"问{i}"])]),
+        ]
+    raise ValueError(f"Unknown rule kind: {kind}")
+
+
+def generate_rules(config: BenchmarkConfig, rng: random.Random) -> List[CombinedDispatchRule]:
+    """按照配置的比例生成调度规则"""
+    kinds = list(config.rule_mix.keys())
+    weights = list(config.rule_mix.values())
+    rules = []
+    for i in range(config.rules):
+        kind = rng.choices(kinds, weights)[0]
+        rules.append(
+            CombinedDispatchRule(
+                rule_id=f"bench_{kind}_{i}",
+                name=f"{kind} {i}",
+                workflow_id=f"bench:{kind}_{i}",
+                priority=rng.randint(1, 9),
+                rule_groups=_make_groups(kind, i),
+            )
+        )
+    if config.fallback:
+        rules.append(
+            CombinedDispatchRule(
+                rule_id="bench_fallback",
+                name="fallback",
+                workflow_id="bench:fallback",
+                priority=0,
+                rule_groups=[RuleGroup(operator="or", rules=[_simple("fallback")])],
+            )
+        )
+    return rules
+
+
+def generate_messages(config: BenchmarkConfig, rng: random.Random) -> List[IMMessage]:
+    """生成模拟消息，包含命令、关键词和普通聊天内容"""
+    bot = ChatSender.get_bot_sender()
+    rule_range = max(config.rules, 1) * 2
+    messages = []
+    for i in range(config.messages):
+        if rng.random() < config.group_ratio:
+            sender = ChatSender.from_group_chat(f"user{i % 97}", f"group{i % 13}", f"User {i % 97}")
+        else:
+            sender = ChatSender.from_c2c_chat(f"user{i % 97}", f"User {i % 97}")
+
+        words = rng.choices(WORDS, k=rng.randint(3, 20))
+        roll = rng.random()
+        if roll < config.command_ratio:
+            # 命令编号取两倍规则数量的范围，一部分命令没有对应的规则
+            words.insert(0, rng.choice(["/cmd", "/ask", "re", "ask"]) + str(rng.randrange(rule_range)))
+        elif roll < config.command_ratio + config.keyword_ratio:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(["kw", "关键词", "问"]) + str(rng.randrange(rule_range)))
+
+        elements: List[MessageElement] = []
+        if rng.random() < config.mention_ratio:
+            elements.append(MentionElement(bot))
+        elements.append(TextMessage(" ".join(words)))
+        messages.append(IMMessage(sender=sender, message_elements=elements))
+    return messages
+
+
+def create_dispatcher(rules: List[CombinedDispatchRule]) -> WorkflowDispatcher:
+    """创建只用于规则匹配的调度器"""
+    container = DependencyContainer()
+    container.register(DependencyContainer, container)
+    container.register(WorkflowRegistry, WorkflowRegistry(container))
+    dispatch_registry = DispatchRuleRegistry(container)
+    container.register(DispatchRuleRegistry, dispatch_registry)
+    for rule in rules:
+        dispatch_registry.register(rule)
+    return WorkflowDispatcher(container)
+
+
+def run_benchmark(config: Optional[BenchmarkConfig] = None) -> Dict[str, Any]:
+    """
+    执行性能测试，返回统计结果。
+    耗时单位为毫秒，吞吐量单位为条/秒。
+    """
+    config = config or BenchmarkConfig()
+    rng = random.Random(config.seed)
+    rules = generate_rules(config, rng)
+    messages = generate_messages(config, rng)
+    dispatcher = create_dispatcher(rules)
+
+    for _ in range(config.warmup):
+        for message in messages:
+            dispatcher.match_rule(message)
+
+    latency = RollingHistogram(window=max(len(messages), 1))
+    matched: Dict[str, int] = {}
+    start = time.perf_counter()
+    for message in messages:
+        begin = time.perf_counter()
+        rule = dispatcher.match_rule(message)
+        latency.record((time.perf_counter() - begin) * 1000)
+        rule_id = rule.rule_id if rule else ""
+        matched[rule_id] = matched.get(rule_id, 0) + 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "rules": len(rules),
+        "messages": len(messages),
+        "matched": len(messages) - matched.get("", 0) - matched.get("bench_fallback", 0),
+        "fallback": matched.get("bench_fallback", 0),
+        "elapsed": elapsed,
+        "throughput": len(messages) / elapsed if elapsed > 0 else 0.0,
+        "latency": latency.snapshot(),
+    }
+
+
+def format_result(result: Dict[str, Any]) -> str:
+    """格式化测试结果"""
+    latency = result["latency"]
+    return (
+        f"rules: {result['rules']}, messages: {result['messages']}, "
+        f"matched: {result['matched']}, fallback: {result['fallback']}\n"
+        f"elapsed: {result['elapsed']:.3f}s, throughput: {result['throughput']:.0f} msg/s\n"
+        f"latency (ms): mean {latency['mean']:.4f}, p50 {latency['p50']:.4f}, "
+        f"p99 {latency['p99']:.4f}, max {latency['max']:.4f}"
+    )
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """解析规则类型比例，格式为 prefix=0.5,regex=0.5"""
+    mix = {}
+    for item in value.split(","):
+        kind, _, weight = item.partition("=")
+        mix[kind.strip()] = float(weight)
+    return mix
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="调度规则匹配性能测试")
+    parser.add_argument("--rules", type=int, default=200, help="生成的规则数量")
+    parser.add_argument("--messages", type=int, default=5000, help="生成的消息数量")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--mix", type=parse_mix, default=None, help="规则类型比例，例如 prefix=0.5,regex=0.5")
+    parser.add_argument("--warmup", type=int, default=1, help="预热轮数")
+    parser.add_argument("--no-fallback", action="store_true", help="不添加兜底规则")
+    parser.add_argument("--verbose", action="store_true", help="输出规则注册等日志")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        logger.disable("kirara_ai")
+
+    config = BenchmarkConfig(
+        rules=args.rules,
+        messages=args.messages,
+        seed=args.seed,
+        warmup=args.warmup,
+        fallback=not args.no_fallback,
+    )
+    if args.mix:
+        config.rule_mix = args.mix
+    print(format_result(run_benchmark(config)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from kirara_ai.im.adapter import IMAdapter
+from kirara_ai.im.message import IMMessage
+
+Handler = Callable[[IMAdapter, IMMessage], Awaitable[Any]]
+
+
+def merge_messages(messages: List[IMMessage]) -> IMMessage:
+    """
+    将同一发送者的多条消息合并为一条。
+    消息元素按顺序拼接，发送者和原始消息数据取最后一条消息的，回复时针对最新的消息。
+    """
+    if len(messages) == 1:
+        return messages[0]
+    elements = []
+    for message in messages:
+        elements.extend(message.message_elements)
+    last = messages[-1]
+    return IMMessage(sender=last.sender, message_elements=elements, raw_message=last.raw_message)
+
+
+class Burst:
+    """等待合并的一组消息"""
+
+    def __init__(self, source: IMAdapter, future: asyncio.Future):
+        self.source = source
+        self.messages: List[IMMessage] = []
+        self.future = future
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class MessageCoalescer:
+    """
+    消息合并器。
+    同一发送者在 window 秒内连续发送的消息会被合并为一条后再处理，每收到一条新消息重新计时，
+    攒够 max_messages 条消息时立即处理。同一批次的所有调用方得到相同的处理结果。
+    """
+
+    def __init__(self, window: float, handler: Handler, max_messages: int = 5):
+        self.window = window
+        self.max_messages = max(1, max_messages)
+        self.handler = handler
+        self._bursts: Dict[Hashable, Burst] = {}
+
+    def __len__(self) -> int:
+        return len(self._bursts)
+
+    async def submit(self, key: Hashable, source: IMAdapter, message: IMMessage) -> Any:
+        """提交一条消息，等待其所在批次处理完成并返回处理结果"""
+        loop = asyncio.get_running_loop()
+        burst = self._bursts.get(key)
+        if burst is None:
+            burst = self._bursts[key] = Burst(source, loop.create_future())
+        burst.messages.append(message)
+
+        if burst.timer is not None:
+            burst.timer.cancel()
+        if len(burst.messages) >= self.max_messages:
+            self._flush(key, burst)
+        else:
+            burst.timer = loop.call_later(self.window, self._flush, key, burst)
+        # 多个调用方等待同一个结果，某个调用方取消等待不影响其他调用方
+        return await asyncio.shield(burst.future)
+
+    def _flush(self, key: Hashable, burst: Burst):
+        if self._bursts.get(key) is burst:
+            del self._bursts[key]
+        message = merge_messages(burst.messages)
+        task = asyncio.ensure_future(self.handler(burst.source, message))
+        task.add_done_callback(lambda t: self._resolve(burst.future, t))
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, task: asyncio.Future):
+        if future.done():
+            return
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
@@ -1,7 +1,20 @@
+import asyncio
+import time
+from typing import Iterator, Optional
+
+from kirara_ai.config.global_config import DispatchConfig, GlobalConfig
 from kirara_ai.im.adapter import IMAdapter
-from kirara_ai.im.message import IMMessage
+from kirara_ai.im.message import IMMessage, TextMessage
+from kirara_ai.im.sender import ChatSender, ChatType
 from kirara_ai.ioc.container import DependencyContainer
 from kirara_ai.logger import get_logger
+from kirara_ai.memory.registry import ScopeRegistry
+from kirara_ai.memory.scopes import MemoryScope
+from kirara_ai.memory.scopes.builtin_scopes import MemberScope
+from kirara_ai.workflow.core.dispatch.admission import AdmissionController, AdmissionTicket
+from kirara_ai.workflow.core.dispatch.coalesce import MessageCoalescer
+from kirara_ai.workflow.core.dispatch.lanes import ConversationLanes
+from kirara_ai.workflow.core.dispatch.models.dispatch_rules import CombinedDispatchRule
 from kirara_ai.workflow.core.dispatch.registry import DispatchRuleRegistry
 from kirara_ai.workflow.core.dispatch.rules.base import DispatchRule
 from kirara_ai.workflow.core.execution.executor import WorkflowExecutor
@@ -20,36 +33,148 @@ class WorkflowDispatcher:
         self.workflow_registry = container.resolve(WorkflowRegistry)
         self.dispatch_registry = container.resolve(DispatchRuleRegistry)
 
+        try:
+            self.config = container.resolve(GlobalConfig).dispatch
+        except KeyError:
+            self.config = DispatchConfig()
+        # 按会话划分的执行队列，同一会话内的消息按顺序处理
+        self.lanes = ConversationLanes(self.config.lane_queue_size)
+        self._lane_scope: Optional[MemoryScope] = None
+        # 工作流运行的准入控制
+        try:
+            self.admission = container.resolve(AdmissionController)
+        except KeyError:
+            self.admission = AdmissionController(
+                self.config.max_running_workflows, self.config.workflow_limits, self.config.admission_queue_size
+            )
+        # 合并同一用户短时间内连续发送的消息
+        self.coalescer: Optional[MessageCoalescer] = None
+        if self.config.coalesce_window > 0:
+            self.coalescer = MessageCoalescer(
+                self.config.coalesce_window, self._dispatch_in_lane, self.config.coalesce_max_messages
+            )
+
     def register_rule(self, rule: DispatchRule):
         """注册一个调度规则"""
         self.dispatch_registry.register(rule)
         self.logger.info(f"Registered dispatch rule: {rule}")
 
+    def match_rules(self, message: IMMessage) -> Iterator[CombinedDispatchRule]:
+        """按优先级依次返回匹配该消息的规则，只进行规则匹配，不执行工作流"""
+        metrics = self.dispatch_registry.metrics
+        # 获取可能匹配的已启用规则，按优先级排序
+        for rule in self.dispatch_registry.get_candidate_rules(message):
+            start = time.perf_counter()
+            matched = rule.match(message, self.workflow_registry)
+            metrics.record(rule.rule_id, time.perf_counter() - start, matched)
+            if matched:
+                yield rule
+
+    def match_rule(self, message: IMMessage) -> Optional[CombinedDispatchRule]:
+        """获取第一个匹配该消息的规则"""
+        return next(self.match_rules(message), None)
+
+    def get_lane_key(self, message: IMMessage) -> str:
+        """获取消息所属会话的键值"""
+        if self._lane_scope is None:
+            # 默认与记忆的作用域一致，保证同一份记忆的读写按顺序进行，同时不同成员之间可以并发处理
+            scope_name = self.config.lane_scope
+            if not scope_name:
+                try:
+                    scope_name = self.container.resolve(GlobalConfig).memory.default_scope
+                except KeyError:
+                    scope_name = "member"
+            try:
+                self._lane_scope = self.container.resolve(ScopeRegistry).get_scope(scope_name)
+            except KeyError:
+                # 记忆模块尚未初始化时使用群成员作用域
+                self._lane_scope = MemberScope()
+            except ValueError:
+                self.logger.warning(f"Unknown lane scope {scope_name}, using member scope")
+                self._lane_scope = MemberScope()
+        return self._lane_scope.get_scope_key(message.sender)
+
     async def dispatch(self, source: IMAdapter, message: IMMessage):
         """
-        根据消息内容选择第一个匹配的规则进行处理
+        根据消息内容选择第一个匹配的规则进行处理。
+        同一会话内的消息按到达顺序依次处理，不同会话的消息并发处理。
+        开启消息合并时，同一用户短时间内连续发送的消息会合并为一条后处理，这些调用得到相同的结果。
         """
-        # 获取所有已启用的规则，按优先级排序
-        active_rules = self.dispatch_registry.get_active_rules()
+        if self.coalescer is not None:
+            return await self.coalescer.submit((id(source), str(message.sender)), source, message)
+        return await self._dispatch_in_lane(source, message)
 
-        for rule in active_rules:
-            if rule.match(message, self.workflow_registry):
-                try:
-                    self.logger.debug(f"Matched rule {rule}, executing workflow")
-                    with self.container.scoped() as scoped_container:
-                        scoped_container.register(IMAdapter, source)
-                        scoped_container.register(IMMessage, message)
-                        workflow = rule.get_workflow(scoped_container)
-                        scoped_container.register(Workflow, workflow)
-                        executor = WorkflowExecutor(scoped_container)
-                        scoped_container.register(WorkflowExecutor, executor)
-                        if workflow is None:
-                            self.logger.error(f"Workflow {rule} not found")
-                            continue
+    async def _dispatch_in_lane(self, source: IMAdapter, message: IMMessage):
+        key = self.get_lane_key(message)
+        try:
+            return await self.lanes.submit(key, lambda: self._dispatch(source, message))
+        except asyncio.QueueFull:
+            self.logger.warning(
+                f"Too many pending messages in conversation {key}, dropping message ({self.lanes.dropped} dropped in total)"
+            )
+            return None
+
+    def get_priority(self, message: IMMessage) -> int:
+        """获取消息的运行优先级，数值越小越优先：私聊和优先用户为 0，其他为 1"""
+        sender = message.sender
+        if sender.chat_type == ChatType.C2C or sender.user_id in self.config.priority_users:
+            return 0
+        return 1
+
+    async def _admit(self, source: IMAdapter, message: IMMessage, workflow_id: str) -> Optional[AdmissionTicket]:
+        """申请运行工作流，等待队列已满时按配置的策略处理，返回 None 表示不运行"""
+        ticket = AdmissionTicket(workflow_id, self.get_priority(message))
+        if not self.admission.enabled:
+            return ticket
+        if await self.admission.acquire(workflow_id, ticket.priority):
+            ticket.admitted = True
+            return ticket
+
+        policy = self.config.overflow_policy
+        if policy == "degrade" and self.config.degrade_model:
+            self.admission.record_degraded()
+            ticket.degraded_model = self.config.degrade_model
+            self.logger.warning(f"Too many running workflows, running {workflow_id} with {ticket.degraded_model}")
+            return ticket
+
+        self.logger.warning(f"Too many running workflows, rejected {workflow_id} (policy: {policy})")
+        if policy == "busy":
+            try:
+                reply = IMMessage(
+                    sender=ChatSender.get_bot_sender(),
+                    message_elements=[TextMessage(self.config.busy_reply)],
+                )
+                await source.send_message(reply, message.sender)
+            except Exception as e:
+                self.logger.error(f"Failed to send busy reply: {e}")
+        return None
+
+    async def _dispatch(self, source: IMAdapter, message: IMMessage):
+        for rule in self.match_rules(message):
+            try:
+                self.logger.debug(f"Matched rule {rule}, executing workflow")
+                with self.container.scoped() as scoped_container:
+                    scoped_container.register(IMAdapter, source)
+                    scoped_container.register(IMMessage, message)
+                    workflow = rule.get_workflow(scoped_container)
+                    scoped_container.register(Workflow, workflow)
+                    executor = WorkflowExecutor(scoped_container)
+                    scoped_container.register(WorkflowExecutor, executor)
+                    if workflow is None:
+                        self.logger.error(f"Workflow {rule} not found")
+                        continue
+                    ticket = await self._admit(source, message, rule.workflow_id)
+                    if ticket is None:
+                        return None
+                    scoped_container.register(AdmissionTicket, ticket)
+                    try:
                         return await executor.run()
-                except Exception as e:
-                    self.logger.exception(e)
-                    self.logger.error(f"Workflow execution failed: {e}")
-                    raise e
+                    finally:
+                        if ticket.admitted:
+                            self.admission.release(rule.workflow_id)
+            except Exception as e:
+                self.logger.exception(e)
+                self.logger.error(f"Workflow execution failed: {e}")
+                raise e
         self.logger.debug("No matching rule found for message")
         return None
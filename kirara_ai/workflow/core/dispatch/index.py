@@ -0,0 +1,159 @@
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .models.dispatch_rules import CombinedDispatchRule
+from .rules.message_rules import KeywordMatchRule, PrefixMatchRule
+
+
+class KeywordAutomaton:
+    """
+    Aho–Corasick 自动机，扫描一遍文本即可找出所有出现过的关键词。
+    每个关键词关联若干个值（规则 ID），扫描结果为所有命中关键词关联值的并集。
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Set[str]] = [set()]
+        self._built = False
+
+    def add(self, keyword: str, value: str):
+        """添加一个关键词，添加完成后需要调用 build"""
+        node = 0
+        for ch in keyword:
+            next_node = self._goto[node].get(ch)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][ch] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+            node = next_node
+        self._output[node].add(value)
+        self._built = False
+
+    def build(self):
+        """按广度优先顺序计算失败指针，并将失败指针上的输出合并到当前节点"""
+        queue = deque(self._goto[0].values())
+        for node in queue:
+            self._fail[node] = 0
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                self._output[child] |= self._output[self._fail[child]]
+                queue.append(child)
+        self._built = True
+
+    def search(self, text: str) -> Set[str]:
+        """返回文本中出现过的所有关键词关联的值"""
+        if not self._built:
+            self.build()
+        goto, fail, output = self._goto, self._fail, self._output
+        result: Set[str] = set(output[0])
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if output[node]:
+                result |= output[node]
+        return result
+
+
+class PrefixTrie:
+    """前缀树，沿着文本开头走一遍即可找出所有匹配的前缀"""
+
+    def __init__(self):
+        self._children: List[Dict[str, int]] = [{}]
+        self._values: List[Set[str]] = [set()]
+
+    def add(self, prefix: str, value: str):
+        node = 0
+        for ch in prefix:
+            next_node = self._children[node].get(ch)
+            if next_node is None:
+                next_node = len(self._children)
+                self._children[node][ch] = next_node
+                self._children.append({})
+                self._values.append(set())
+            node = next_node
+        self._values[node].add(value)
+
+    def search(self, text: str) -> Set[str]:
+        """返回所有是文本前缀的前缀关联的值"""
+        result: Set[str] = set(self._values[0])
+        node = 0
+        for ch in text:
+            node = self._children[node].get(ch, -1)
+            if node < 0:
+                break
+            if self._values[node]:
+                result |= self._values[node]
+        return result
+
+
+class DispatchIndex:
+    """
+    关键词和前缀规则的联合索引。
+
+    如果组合规则中存在一个只包含关键词和前缀规则的规则组，那么消息至少要命中该组中的一个关键词或前缀，
+    该规则才可能匹配。索引扫描一遍消息内容即可得到候选规则，只有候选规则才需要完整匹配。
+    无法建立索引的规则总是候选规则。
+    """
+
+    def __init__(self, rules: Iterable[CombinedDispatchRule]):
+        self.keywords = KeywordAutomaton()
+        self.prefixes = PrefixTrie()
+        # 建立索引时使用的规则实例，规则重新编译后索引对该规则失效
+        self._indexed: Dict[str, Tuple[CombinedDispatchRule, list]] = {}
+        for rule in rules:
+            self._add_rule(rule)
+        self.keywords.build()
+
+    @staticmethod
+    def _find_gate(rule: CombinedDispatchRule) -> Optional[list]:
+        """找到一个可以用来过滤消息的规则组，返回组内的规则实例"""
+        if rule.compiled_groups is None:
+            return None
+        for group in rule.compiled_groups:
+            # 空规则组会使整个规则直接匹配成功，之后的规则组不再参与判断
+            if not group.group.rules:
+                return None
+            if all(isinstance(m, (KeywordMatchRule, PrefixMatchRule)) for m in group.matchers):
+                return group.matchers
+        return None
+
+    def _add_rule(self, rule: CombinedDispatchRule):
+        matchers = self._find_gate(rule)
+        if matchers is None:
+            return
+        for matcher in matchers:
+            if isinstance(matcher, KeywordMatchRule):
+                for keyword in matcher.keywords:
+                    self.keywords.add(keyword, rule.rule_id)
+            else:
+                self.prefixes.add(matcher.prefix, rule.rule_id)
+        self._indexed[rule.rule_id] = (rule, rule.compiled_groups)
+
+    def is_candidate(self, rule: CombinedDispatchRule, hits: Set[str]) -> bool:
+        """判断规则是否需要完整匹配"""
+        indexed = self._indexed.get(rule.rule_id)
+        if indexed is None or rule.rule_id in hits:
+            return True
+        # 规则在建立索引后被替换或重新编译，索引对该规则失效
+        return indexed[0] is not rule or indexed[1] is not rule.compiled_groups
+
+    def search(self, content: str) -> Set[str]:
+        """扫描消息内容，返回命中关键词或前缀的规则 ID"""
+        return self.keywords.search(content) | self.prefixes.search(content)
+
+    def filter(self, rules: Iterable[CombinedDispatchRule], content: str) -> Iterator[CombinedDispatchRule]:
+        """保持原有顺序，依次返回可能匹配该消息的规则"""
+        hits = self.search(content) if self._indexed else set()
+        for rule in rules:
+            if self.is_candidate(rule, hits):
+                yield rule
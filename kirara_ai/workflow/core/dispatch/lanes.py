@@ -0,0 +1,99 @@
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+Job = Tuple[Callable[[], Awaitable[Any]], asyncio.Future]
+
+
+class Lane:
+    """单个会话的执行队列"""
+
+    def __init__(self):
+        self.jobs: Deque[Job] = deque()
+        self.worker: Optional[asyncio.Task] = None
+        # 正在执行的任务数量，只可能是 0 或 1
+        self.running = 0
+
+    @property
+    def pending(self) -> int:
+        """排队等待执行的任务数量"""
+        return len(self.jobs)
+
+
+class ConversationLanes:
+    """
+    按会话划分的执行队列。
+    同一会话内的任务按提交顺序依次执行，不同会话的任务并发执行。
+    每个会话在有任务时才会创建队列和执行协程，队列清空后自动回收。
+    """
+
+    def __init__(self, max_queue_size: int = 0):
+        # 每个会话最多排队的任务数量，不包括正在执行的任务，0 表示不限制
+        self.max_queue_size = max_queue_size
+        self._lanes: Dict[str, Lane] = {}
+        # 因会话队列已满而被拒绝的任务数量
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._lanes)
+
+    def get_lane(self, key: str) -> Optional[Lane]:
+        return self._lanes.get(key)
+
+    async def submit(self, key: str, job: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        在指定会话的队列中执行任务，等待任务完成并返回其结果。
+        取消等待不会影响已经开始执行的任务，尚未开始的任务会被跳过。
+
+        :raises asyncio.QueueFull: 会话队列已满
+        """
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = Lane()
+        if self.max_queue_size > 0 and lane.pending >= self.max_queue_size:
+            self.dropped += 1
+            raise asyncio.QueueFull(f"Lane {key} is full ({lane.pending} pending)")
+
+        future = asyncio.get_running_loop().create_future()
+        lane.jobs.append((job, future))
+        if lane.worker is None:
+            lane.worker = asyncio.create_task(self._run_lane(key, lane))
+        return await future
+
+    async def _run_lane(self, key: str, lane: Lane):
+        try:
+            while lane.jobs:
+                job, future = lane.jobs.popleft()
+                if future.done():
+                    # 等待方已经取消
+                    continue
+                lane.running = 1
+                try:
+                    result = await job()
+                except asyncio.CancelledError:
+                    future.cancel()
+                    raise
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+                finally:
+                    lane.running = 0
+        finally:
+            lane.worker = None
+            # 执行协程被取消时，取消剩余的任务
+            while lane.jobs:
+                lane.jobs.popleft()[1].cancel()
+            if self._lanes.get(key) is lane:
+                del self._lanes[key]
+
+    def stats(self) -> Dict[str, int]:
+        """获取当前的队列统计"""
+        return {
+            "lanes": len(self._lanes),
+            "running": sum(lane.running for lane in self._lanes.values()),
+            "pending": sum(lane.pending for lane in self._lanes.values()),
+            "dropped": self.dropped,
+        }
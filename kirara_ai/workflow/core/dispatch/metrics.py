@@ -0,0 +1,71 @@
+import threading
+from typing import Dict, Optional
+
+
+class RuleMatchStats:
+    """单条调度规则的匹配统计"""
+
+    def __init__(self):
+        self.evaluations = 0
+        self.matches = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def record(self, elapsed: float, matched: bool):
+        self.evaluations += 1
+        if matched:
+            self.matches += 1
+        self.total_time += elapsed
+        if elapsed > self.max_time:
+            self.max_time = elapsed
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "evaluations": self.evaluations,
+            "matches": self.matches,
+            "match_ratio": self.matches / self.evaluations if self.evaluations else 0.0,
+            "total_time": self.total_time,
+            "mean_time": self.total_time / self.evaluations if self.evaluations else 0.0,
+            "max_time": self.max_time,
+        }
+
+
+class DispatchRuleMetrics:
+    """
+    按规则 ID 统计调度规则的匹配次数、命中次数和匹配耗时，耗时单位为秒。
+    用于找出耗时过高的正则规则，以及从未命中却在每条消息上执行的规则。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, RuleMatchStats] = {}
+
+    def record(self, rule_id: str, elapsed: float, matched: bool):
+        """记录一次规则匹配"""
+        # 每条消息的每条候选规则都会调用，只在创建统计对象时加锁，计数本身允许读取时略有偏差
+        stats = self._stats.get(rule_id)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(rule_id, RuleMatchStats())
+        stats.record(elapsed, matched)
+
+    def get(self, rule_id: str) -> Optional[Dict[str, float]]:
+        """获取指定规则的统计数据，没有记录时返回 None"""
+        stats = self._stats.get(rule_id)
+        return stats.snapshot() if stats else None
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """获取所有规则的统计数据"""
+        with self._lock:
+            items = list(self._stats.items())
+        return {rule_id: stats.snapshot() for rule_id, stats in items}
+
+    def remove(self, rule_id: str):
+        """删除指定规则的统计数据"""
+        with self._lock:
+            self._stats.pop(rule_id, None)
+
+    def clear(self):
+        """清空统计数据"""
+        with self._lock:
+            self._stats.clear()
@@ -1,6 +1,6 @@
-from typing import Any, Dict, List, Literal
+from typing import TYPE_CHECKING, Any, Dict, List, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 from kirara_ai.im.message import IMMessage
 from kirara_ai.ioc.container import DependencyContainer
@@ -8,6 +8,9 @@ from kirara_ai.logger import get_logger
 from kirara_ai.workflow.core.workflow import Workflow
 from kirara_ai.workflow.core.workflow.registry import WorkflowRegistry
 
+if TYPE_CHECKING:
+    from ..rules.base import DispatchRule
+
 logger = get_logger("DispatchRule")
 
 class SimpleDispatchRule(BaseModel):
@@ -20,6 +23,72 @@ class RuleGroup(BaseModel):
     operator: Literal["and", "or"] = "or"
     rules: List[SimpleDispatchRule]
 
+class CompiledRuleGroup:
+    """
+    规则组的编译结果，保存组内的规则实例和运行时的匹配统计。
+    匹配时按照预估代价和实际命中率决定执行顺序，一旦能确定规则组的结果就不再执行剩余规则。
+    """
+
+    # 每匹配多少次根据统计数据重新排序一次
+    REORDER_INTERVAL = 64
+
+    def __init__(self, group: RuleGroup, matchers: List[Optional["DispatchRule"]]):
+        self.group = group
+        # 与 group.rules 一一对应，创建失败的规则为 None
+        self.matchers = matchers
+        self.evaluations = [0] * len(matchers)
+        self.hits = [0] * len(matchers)
+        self.calls = 0
+        # 实际执行的规则下标，初始按照预估代价排序
+        self.order = sorted(
+            (i for i, matcher in enumerate(matchers) if matcher is not None),
+            key=lambda i: matchers[i].cost,
+        )
+
+    def _rank(self, i: int) -> float:
+        """
+        计算规则的执行优先级，数值越小越先执行。
+        AND 组优先执行代价低且容易不匹配的规则，OR 组优先执行代价低且容易匹配的规则。
+        """
+        hit_rate = (self.hits[i] + 1) / (self.evaluations[i] + 2)
+        decisive_rate = (1 - hit_rate) if self.group.operator == "and" else hit_rate
+        return (self.matchers[i].cost + 1) / decisive_rate
+
+    def reorder(self):
+        """根据统计数据重新排序组内规则"""
+        self.order = sorted(self.order, key=self._rank)
+
+    def match(self, message: IMMessage) -> bool:
+        """
+        判断消息是否匹配该规则组。
+        匹配出错的规则视为无效规则，组内没有有效规则时视为不匹配。
+        """
+        self.calls += 1
+        if self.calls % self.REORDER_INTERVAL == 0:
+            self.reorder()
+
+        is_and = self.group.operator == "and"
+        evaluated = False
+        for i in self.order:
+            try:
+                result = bool(self.matchers[i].match(message))
+            except Exception as e:
+                # 如果规则匹配过程出错，视为无效规则
+                rule = self.group.rules[i]
+                logger.error(f"Rule {rule.type} from config {rule.config} matching failed: {e}")
+                continue
+            evaluated = True
+            self.evaluations[i] += 1
+            if result:
+                self.hits[i] += 1
+            if is_and and not result:  # AND 关系：任意规则不匹配即可确定结果
+                return False
+            if not is_and and result:  # OR 关系：任意规则匹配即可确定结果
+                return True
+        # AND 关系：所有有效规则都匹配；OR 关系：没有规则匹配
+        return is_and and evaluated
+
+
 class CombinedDispatchRule(BaseModel):
     """组合调度规则，支持复杂的规则组合"""
     rule_id: str
@@ -31,6 +100,48 @@ class CombinedDispatchRule(BaseModel):
     rule_groups: List[RuleGroup]  # 规则组之间是 AND 关系
     metadata: Dict[str, Any] = {}
 
+    # 预先编译好的规则组，与 rule_groups 一一对应
+    _matchers: Optional[List[CompiledRuleGroup]] = PrivateAttr(default=None)
+
+    def __setattr__(self, name: str, value: Any):
+        super().__setattr__(name, value)
+        # 规则内容发生变化时需要重新创建规则实例
+        if name in ("rule_groups", "workflow_id"):
+            self._matchers = None
+
+    @property
+    def compiled_groups(self) -> Optional[List[CompiledRuleGroup]]:
+        """已编译的规则组，未编译时为 None"""
+        # 直接读取私有属性字典，pydantic 的私有属性访问路径在每条消息都会经过的热路径上开销较大
+        return self.__pydantic_private__["_matchers"]
+
+    def compile(self, workflow_registry: WorkflowRegistry):
+        """
+        根据规则配置创建所有规则实例，之后的匹配直接复用这些实例。
+        直接修改 rule_groups 内部的规则后需要重新调用。
+        """
+        from ..rules.base import DispatchRule
+
+        matchers = []
+        for group in self.rule_groups:
+            group_matchers = []
+            for rule in group.rules:
+                try:
+                    rule_class = DispatchRule.get_rule_type(rule.type)
+                    group_matchers.append(
+                        rule_class.from_config(
+                            rule_class.config_class(**rule.config),
+                            workflow_registry,
+                            self.workflow_id,
+                        )
+                    )
+                except Exception as e:
+                    # 规则创建失败时视为无效规则，匹配时跳过
+                    logger.error(f"Rule {rule.type} from config {rule.config} creation failed: {e}")
+                    group_matchers.append(None)
+            matchers.append(CompiledRuleGroup(group, group_matchers))
+        self._matchers = matchers
+
     def match(self, message: IMMessage, workflow_registry: WorkflowRegistry) -> bool:
         """
         判断消息是否匹配该规则。
@@ -40,43 +151,20 @@ class CombinedDispatchRule(BaseModel):
         if not self.enabled:
             return False
 
+        groups = self.compiled_groups
+        if groups is None:
+            self.compile(workflow_registry)
+            groups = self.compiled_groups
+
         # 所有规则组都必须匹配（AND 关系）
-        for group in self.rule_groups:
-            
+        for group in groups:
             # 如果组内没有规则，视为匹配
-            if len(group.rules) == 0:
+            if len(group.group.rules) == 0:
                 return True
 
-            # 获取组内所有规则的匹配结果
-            rule_results = []
-            for rule in group.rules:
-                try:
-                    from ..rules.base import DispatchRule
-
-                    # 创建具体的规则实例
-                    rule_class = DispatchRule.get_rule_type(rule.type)
-                    rule_instance = rule_class.from_config(
-                        rule_class.config_class(**rule.config),
-                        workflow_registry,
-                        self.workflow_id,
-                    )
-                    rule_results.append(rule_instance.match(message))
-                except Exception as e:
-                    # 如果规则创建或匹配过程出错，视为不匹配
-                    logger.error(f"Rule {rule.type} from config {rule.config} creation or matching failed: {e}")
-                    continue
-
-            # 根据操作符确定组的匹配结果
-            if not rule_results:  # 如果组内没有有效规则，视为不匹配
+            if not group.match(message):
                 return False
 
-            if group.operator == "and":
-                if not all(rule_results):  # AND 关系：所有规则都必须匹配
-                    return False
-            else:  # operator == "or"
-                if not any(rule_results):  # OR 关系：至少一个规则匹配
-                    return False
-
         # 所有规则组都匹配成功
         return True
 
@@ -1,12 +1,15 @@
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 from ruamel.yaml import YAML
 
+from kirara_ai.im.message import IMMessage
 from kirara_ai.ioc.container import DependencyContainer
 from kirara_ai.logger import get_logger
 from kirara_ai.workflow.core.workflow.registry import WorkflowRegistry
 
+from .index import DispatchIndex
+from .metrics import DispatchRuleMetrics
 from .models.dispatch_rules import CombinedDispatchRule, RuleGroup, SimpleDispatchRule
 from .rules.base import DispatchRule
 from .rules.message_rules import BotMentionMatchRule, KeywordMatchRule, PrefixMatchRule, RegexMatchRule
@@ -21,6 +24,15 @@ class DispatchRuleRegistry:
         self.container = container
         self.workflow_registry = container.resolve(WorkflowRegistry)
         self.rules: Dict[str, CombinedDispatchRule] = {}
+        # 规则集合的版本号，规则注册、更新、启用、禁用或删除时递增，其他缓存可以据此判断是否失效
+        self.version = 0
+        # 按优先级降序排序的已启用规则快照
+        self._active_rules: Optional[List[CombinedDispatchRule]] = None
+        # 关键词和前缀规则的联合索引，及其构建时的版本号
+        self._index: Optional[DispatchIndex] = None
+        self._index_version = -1
+        # 每条规则的匹配统计
+        self.metrics = DispatchRuleMetrics()
         self.logger = get_logger("DispatchRuleRegistry")
         self.rules_dir = "data/dispatch_rules"
 
@@ -28,9 +40,17 @@ class DispatchRuleRegistry:
         """注册一个调度规则"""
         if not rule.rule_id:
             raise ValueError("Rule must have an ID")
+        # 注册时预先创建规则实例，避免每条消息都重新创建
+        rule.compile(self.workflow_registry)
         self.rules[rule.rule_id] = rule
+        self._invalidate()
         self.logger.info(f"Registered dispatch rule: {rule}")
 
+    def _invalidate(self):
+        """规则集合发生变化，递增版本号并清空缓存"""
+        self.version += 1
+        self._active_rules = None
+
     def get_rule(self, rule_id: str) -> Optional[CombinedDispatchRule]:
         """获取指定ID的规则"""
         return self.rules.get(rule_id)
@@ -40,9 +60,24 @@ class DispatchRuleRegistry:
         return list(self.rules.values())
 
     def get_active_rules(self) -> List[CombinedDispatchRule]:
-        """获取所有已启用的规则，按优先级降序排序"""
-        active_rules = [rule for rule in self.rules.values() if rule.enabled]
-        return sorted(active_rules, key=lambda x: x.priority, reverse=True)
+        """
+        获取所有已启用的规则，按优先级降序排序。
+        返回的是缓存的快照，只在规则发生变化时重新计算，调用方不应修改返回的列表。
+        """
+        if self._active_rules is None:
+            active_rules = [rule for rule in self.rules.values() if rule.enabled]
+            self._active_rules = sorted(active_rules, key=lambda x: x.priority, reverse=True)
+        return self._active_rules
+
+    def get_candidate_rules(self, message: IMMessage) -> Iterator[CombinedDispatchRule]:
+        """
+        按优先级降序依次返回可能匹配该消息的已启用规则。
+        关键词和前缀规则通过索引一次性筛选，其余规则总是包含在结果中，结果仍需逐个调用 match 确认。
+        """
+        if self._index is None or self._index_version != self.version:
+            self._index = DispatchIndex(self.rules.values())
+            self._index_version = self.version
+        return self._index.filter(self.get_active_rules(), message.content)
 
     def create_rule(self, rule: CombinedDispatchRule) -> CombinedDispatchRule:
         """创建并注册一个新规则"""
@@ -62,7 +97,8 @@ class DispatchRuleRegistry:
         if rule_id not in self.rules:
             raise ValueError(f"Rule {rule_id} not found")
 
-        # 更新规则
+        # 更新规则，规则内容已变化，之前的统计数据不再有意义
+        self.metrics.remove(rule_id)
         self.register(rule)
         return rule
 
@@ -71,6 +107,8 @@ class DispatchRuleRegistry:
         if rule_id not in self.rules:
             raise ValueError(f"Rule {rule_id} not found")
         del self.rules[rule_id]
+        self.metrics.remove(rule_id)
+        self._invalidate()
 
     def enable_rule(self, rule_id: str):
         """启用规则"""
@@ -78,6 +116,7 @@ class DispatchRuleRegistry:
         if not rule:
             raise ValueError(f"Rule {rule_id} not found")
         rule.enabled = True
+        self._invalidate()
 
     def disable_rule(self, rule_id: str):
         """禁用规则"""
@@ -85,6 +124,7 @@ class DispatchRuleRegistry:
         if not rule:
             raise ValueError(f"Rule {rule_id} not found")
         rule.enabled = False
+        self._invalidate()
 
     def _convert_old_rule(self, rule_data: Dict[str, Any]) -> CombinedDispatchRule:
         """将旧版本规则数据转换为新版本格式"""
@@ -21,6 +21,8 @@ class DispatchRule(ABC):
     rule_types: ClassVar[Dict[str, Type["DispatchRule"]]] = {}
     config_class: ClassVar[Type[RuleConfig]]
     type_name: ClassVar[str]
+    # 预估的匹配代价，规则组内代价低的规则优先执行
+    cost: ClassVar[int] = 1
 
     def __init__(self, workflow_registry: WorkflowRegistry, workflow_id: str):
         """初始化调度规则。"""
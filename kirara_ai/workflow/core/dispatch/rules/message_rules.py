@@ -3,7 +3,7 @@ from typing import List
 
 from pydantic import Field
 
-from kirara_ai.im.message import IMMessage, MentionElement
+from kirara_ai.im.message import IMMessage
 from kirara_ai.im.sender import ChatSender
 from kirara_ai.workflow.core.workflow.registry import WorkflowRegistry
 
@@ -18,6 +18,7 @@ class RegexMatchRule(DispatchRule):
     """根据正则表达式匹配的规则"""
     config_class = RegexRuleConfig
     type_name = "regex"
+    cost = 3
 
     def __init__(self, pattern: str, workflow_registry: WorkflowRegistry, workflow_id: str):
         super().__init__(workflow_registry, workflow_id)
@@ -41,6 +42,7 @@ class PrefixMatchRule(DispatchRule):
     """根据消息前缀匹配的规则"""
     config_class = PrefixRuleConfig
     type_name = "prefix"
+    cost = 1
 
     def __init__(self, prefix: str, workflow_registry: WorkflowRegistry, workflow_id: str):
         super().__init__(workflow_registry, workflow_id)
@@ -65,6 +67,7 @@ class KeywordMatchRule(DispatchRule):
     """根据关键词匹配的规则"""
     config_class = KeywordRuleConfig
     type_name = "keyword"
+    cost = 1
 
     def __init__(self, keywords: list[str], workflow_registry: WorkflowRegistry, workflow_id: str):
         super().__init__(workflow_registry, workflow_id)
@@ -84,13 +87,13 @@ class BotMentionMatchRule(DispatchRule):
     """根据机器人被提及匹配的规则"""
     config_class = RuleConfig
     type_name = "bot_mention"
+    cost = 1
 
     def __init__(self, workflow_registry: WorkflowRegistry, workflow_id: str):
         super().__init__(workflow_registry, workflow_id)
 
     def match(self, message: IMMessage) -> bool:
-        bot_sender = ChatSender.get_bot_sender()
-        return any(isinstance(element, MentionElement) and element.target == bot_sender for element in message.message_elements)
+        return message.is_mentioned(ChatSender.get_bot_sender())
 
     def get_config(self) -> RuleConfig: 
         return RuleConfig()
@@ -20,6 +20,7 @@ class ChatSenderMatchRule(DispatchRule):
     """根据聊天发送者匹配的规则"""
     config_class = ChatSenderMatchRuleConfig
     type_name = "sender"
+    cost = 0
 
     def __init__(
         self,
@@ -57,6 +58,7 @@ class ChatSenderMismatchRule(DispatchRule):
     """根据聊天发送者不匹配的规则"""
     config_class = ChatSenderMatchRuleConfig
     type_name = "sender_mismatch"
+    cost = 0
 
     def __init__(
         self,
@@ -99,6 +101,7 @@ class ChatTypeMatchRule(DispatchRule):
     """根据聊天类型匹配的规则"""
     config_class = ChatTypeMatchRuleConfig
     type_name = "chat_type"
+    cost = 0
 
     def __init__(self, chat_type: ChatType, workflow_registry: WorkflowRegistry, workflow_id: str):
         super().__init__(workflow_registry, workflow_id)
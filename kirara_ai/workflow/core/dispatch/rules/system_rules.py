@@ -18,14 +18,13 @@ class RandomChanceMatchRule(DispatchRule):
     """根据随机概率匹配的规则"""
     config_class = RandomChanceRuleConfig
     type_name = "random"
+    cost = 0
 
     def __init__(self, chance: float, workflow_registry: WorkflowRegistry, workflow_id: str):
         super().__init__(workflow_registry, workflow_id)
         self.chance = chance
 
     def match(self, message: IMMessage) -> bool:
-        print(f"Random chance: {self.chance}")
-        print(f"Random number: {random.random()}")
         return random.random() * 100 < self.chance
 
     def get_config(self) -> RandomChanceRuleConfig:
@@ -41,6 +40,7 @@ class FallbackMatchRule(DispatchRule):
     """默认的兜底规则，总是匹配"""
     config_class = RuleConfig
     type_name = "fallback"
+    cost = 0
 
     def __init__(self, workflow_registry: WorkflowRegistry, workflow_id: str):
         super().__init__(workflow_registry, workflow_id)
@@ -1,15 +1,18 @@
 import asyncio
-import functools
-from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor
-from typing import Any, Dict, List
+import inspect
+import sys
+import time
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Dict, List, Optional, Set
 
+from kirara_ai.config.global_config import GlobalConfig, WorkflowConfig
 from kirara_ai.events.event_bus import EventBus
 from kirara_ai.ioc.container import DependencyContainer
 from kirara_ai.ioc.inject import Inject
 from kirara_ai.logger import get_logger
 from kirara_ai.workflow.core.block import Block, ConditionBlock, LoopBlock
 from kirara_ai.workflow.core.block.registry import BlockRegistry
+from kirara_ai.workflow.core.execution.pool import BlockExecutorPool
 from kirara_ai.workflow.core.workflow import Workflow
 
 
@@ -29,98 +32,233 @@ class WorkflowExecutor:
         self.registry = registry
         self.event_bus = event_bus
         self.results = defaultdict(dict)
+        # 已执行完成的 block 名称，中间结果被释放后仍然可以据此判断执行状态
+        self.completed: Set[str] = set()
         self.variables = {}  # 存储工作流变量
+        # 超时或被取消时仍在线程池中运行、结果将被丢弃的 block 名称
+        self.abandoned_blocks: List[str] = []
+        # 节点进入就绪队列的时间，用于统计排队等待时间
+        self._ready_at: Dict[Block, float] = {}
+        self.config = self._resolve_config()
+        # 单次运行中最多同时执行的 block 数量，0 表示不限制
+        self.max_parallelism = self.config.max_parallel_blocks
+        # 是否保留所有 block 的输出，关闭时中间结果在所有下游 block 读取后释放
+        self.retain_outputs = self.config.retain_block_outputs
+        self.block_pool = self._resolve_block_pool()
         self.logger.info(
             f"Initializing WorkflowExecutor for workflow '{workflow.name}'"
         )
         # self.logger.debug(f"Workflow has {len(workflow.blocks)} blocks and {len(workflow.wires)} wires")
-        self._build_execution_graph()
-
-    def _build_execution_graph(self):
-        """构建执行图，包含并行和条件逻辑"""
-        self.execution_graph = defaultdict(list)
-        # self.logger.debug("Building execution graph...")
-
-        for wire in self.workflow.wires:
-            # self.logger.debug(f"Processing wire: {wire.source_block.name}.{wire.source_output} -> "
-            #                  f"{wire.target_block.name}.{wire.target_input}")
-
-            # 验证连线的数据类型是否匹配
-            source_output = wire.source_block.outputs[wire.source_output]
-            target_input = wire.target_block.inputs[wire.target_input]
-            
-            # 使用 BlockRegistry 的类型系统进行类型兼容性检查
-            source_type = self.registry._type_system.get_type_name(source_output.data_type)
-            target_type = self.registry._type_system.get_type_name(target_input.data_type)
-            
-            if not self.registry.is_type_compatible(source_type, target_type):
-                error_msg = (
-                    f"Type mismatch in wire: {wire.source_block.name}.{wire.source_output} "
-                    f"({source_type}) -> {wire.target_block.name}.{wire.target_input} "
-                    f"({target_type})"
-                )
-                self.logger.error(error_msg)
-                raise TypeError(error_msg)
-                
-            # 将目标块添加到源块的执行图中
-            self.execution_graph[wire.source_block].append(wire.target_block)
-            # self.logger.debug(f"Added edge: {wire.source_block.name} -> {wire.target_block.name}")
+        self._validate_workflow()
+
+    def _resolve_config(self) -> WorkflowConfig:
+        """获取工作流执行配置，容器中没有全局配置时使用默认值"""
+        try:
+            return self.container.resolve(GlobalConfig).workflow
+        except KeyError:
+            return WorkflowConfig()
+
+    def _resolve_block_pool(self) -> BlockExecutorPool:
+        """获取共享的 block 执行线程池"""
+        try:
+            return self.container.resolve(BlockExecutorPool)
+        except KeyError:
+            return BlockExecutorPool.get_default()
+
+    def _validate_workflow(self):
+        """加载时未检查过连线类型的工作流（例如直接构造的 Workflow），在这里补充检查"""
+        if not self.workflow.validated:
+            self.workflow.validate(self.registry)
 
     async def run(self) -> Dict[str, Any]:
         """
         执行工作流，返回每个块的执行结果。
 
-        :return: 包含每个块执行结果的字典，键为块名，值为块的输出
+        :return: 包含每个块执行结果的字典，键为块名，值为块的输出。
+            未开启 retain_outputs 时，已被所有下游块读取的中间结果不会出现在其中。
         """
         from kirara_ai.events import WorkflowExecutionBegin, WorkflowExecutionEnd
         self.event_bus.post(WorkflowExecutionBegin(self.workflow, self))
         self.logger.info("Starting workflow execution")
         loop = asyncio.get_event_loop()
-        with ThreadPoolExecutor() as executor:
-            # 从入口节点开始执行
-            entry_blocks = [block for block in self.workflow.blocks if not block.inputs]
-            # self.logger.debug(f"Identified entry blocks: {[b.name for b in entry_blocks]}")
-            await self._execute_nodes(entry_blocks, executor, loop)
+        self._init_schedule_state()
+        # 从入口节点开始执行
+        entry_blocks = [block for block in self.workflow.blocks if not block.inputs]
+        # self.logger.debug(f"Identified entry blocks: {[b.name for b in entry_blocks]}")
+        await self._run_with_deadline(
+            self._execute_nodes(entry_blocks, self.block_pool, loop)
+        )
 
         self.logger.info("Workflow execution completed")
         self.event_bus.post(WorkflowExecutionEnd(self.workflow, self, self.results))
         return self.results
 
+    async def _run_with_deadline(self, coro: Awaitable):
+        """在 workflow.run_timeout 限制内执行，超时后取消所有正在执行的 block"""
+        run_timeout = self.config.run_timeout
+        if run_timeout <= 0:
+            await coro
+            return
+
+        task = asyncio.ensure_future(coro)
+        try:
+            done, _ = await asyncio.wait({task}, timeout=run_timeout)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        if not done:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            self.logger.error(
+                f"Workflow {self.workflow.name} execution timed out after {run_timeout}s"
+            )
+            raise TimeoutError(
+                f"Workflow {self.workflow.name} execution timed out after {run_timeout}s"
+            )
+        task.result()
+
+    def _init_schedule_state(self):
+        """计算每个节点的入度，供就绪队列调度使用"""
+        predecessors = self.workflow.index.predecessors
+        self._pending_predecessors = {
+            block: len(predecessors.get(block.name, ())) for block in self.workflow.blocks
+        }
+        self._scheduled = set()
+        self._ready_at = {}
+        self._init_consumer_counts()
+
+    def _init_consumer_counts(self):
+        """统计每个 block 的输出还有多少个下游 block 没有读取"""
+        self._pending_consumers: Dict[str, int] = {}
+        if self.retain_outputs:
+            return
+        pinned = set()
+        input_sources = self.workflow.index.input_sources
+        for block in self.workflow.blocks:
+            sources = {source for source, _ in input_sources.get(block.name, {}).values()}
+            for source in sources:
+                if isinstance(block, LoopBlock):
+                    # 循环块每次迭代都会重新读取输入，其上游输出需要一直保留
+                    pinned.add(source)
+                else:
+                    self._pending_consumers[source] = self._pending_consumers.get(source, 0) + 1
+        for source in pinned:
+            self._pending_consumers.pop(source, None)
+
+    def _store_result(self, block: Block, result: Dict[str, Any]):
+        """保存 block 的输出并标记为已执行"""
+        self.results[block.name] = result
+        self.completed.add(block.name)
+
+    def _release_inputs(self, block: Block):
+        """block 已读取完输入，释放不再被任何下游 block 需要的上游输出"""
+        input_sources = self.workflow.index.input_sources.get(block.name)
+        if not input_sources or isinstance(block, LoopBlock):
+            return
+        for source in {source for source, _ in input_sources.values()}:
+            remaining = self._pending_consumers.get(source)
+            if remaining is None:
+                continue
+            if remaining > 1:
+                self._pending_consumers[source] = remaining - 1
+            else:
+                del self._pending_consumers[source]
+                self.results.pop(source, None)
+
+    def _on_predecessor_done(self, block: Block) -> bool:
+        """某个前置节点执行完毕，返回该节点是否已经就绪"""
+        if block in self._scheduled:
+            return False
+        # 控制流节点与原有语义保持一致：只要被前置节点触发即可执行
+        if isinstance(block, (ConditionBlock, LoopBlock)):
+            return True
+        self._pending_predecessors[block] = self._pending_predecessors.get(block, 1) - 1
+        if self._pending_predecessors[block] > 0:
+            return False
+        return self._can_execute(block)
+
     async def _execute_nodes(self, blocks: List[Block], executor, loop):
-        """执行一组节点"""
+        """
+        使用就绪队列调度执行一组节点及其所有后继节点。
+        所有输入已满足的节点会作为并发任务同时执行，并发数受 max_parallelism 限制。
+        """
         # self.logger.debug(f"Executing node group: {[b.name for b in blocks]}")
-
+        ready = deque(blocks)
+        running: Dict[asyncio.Future, Block] = {}
+        now = time.perf_counter()
         for block in blocks:
-            # self.logger.debug(f"Processing block: {block.name} ({type(block).__name__})")
-            if isinstance(block, ConditionBlock):
-                await self._execute_conditional_branch(block, executor, loop)
-            elif isinstance(block, LoopBlock):
-                await self._execute_loop(block, executor, loop)
-            else:
-                await self._execute_normal_block(block, executor, loop)
+            self._ready_at.setdefault(block, now)
+
+        try:
+            while ready or running:
+                while ready and (
+                    self.max_parallelism <= 0 or len(running) < self.max_parallelism
+                ):
+                    block = ready.popleft()
+                    if block in self._scheduled:
+                        continue
+                    self._scheduled.add(block)
+                    task = asyncio.ensure_future(
+                        self._execute_block(block, executor, loop)
+                    )
+                    running[task] = block
 
-    async def _execute_conditional_branch(self, block: ConditionBlock, executor, loop):
-        """执行条件分支"""
+                if not running:
+                    break
+
+                done, _ = await asyncio.wait(
+                    running.keys(), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    running.pop(task)
+                    # 任务失败时直接抛出异常，由外层取消其余任务
+                    next_blocks = task.result()
+                    for next_block in dict.fromkeys(next_blocks):
+                        if self._on_predecessor_done(next_block):
+                            self._ready_at.setdefault(next_block, time.perf_counter())
+                            ready.append(next_block)
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running.keys(), return_exceptions=True)
+
+    async def _execute_block(self, block: Block, executor, loop) -> List[Block]:
+        """执行单个节点，返回需要继续触发的后继节点"""
+        # self.logger.debug(f"Processing block: {block.name} ({type(block).__name__})")
+        if isinstance(block, ConditionBlock):
+            return await self._execute_conditional_branch(block, executor, loop)
+        elif isinstance(block, LoopBlock):
+            await self._execute_loop(block, executor, loop)
+            return []
+        else:
+            return await self._execute_normal_block(block, executor, loop)
+
+    async def _execute_conditional_branch(
+        self, block: ConditionBlock, executor, loop
+    ) -> List[Block]:
+        """执行条件分支，返回被选中的分支节点"""
         self.logger.info(f"Executing ConditionBlock: {block.name}")
         inputs = self._gather_inputs(block)
         # self.logger.debug(f"ConditionBlock inputs: {list(inputs.keys())}")
 
-        result = await loop.run_in_executor(executor, block.execute, **inputs)
-        self.results[block.name] = result
+        result = await self._invoke_block(block, inputs, executor, loop)
+        self._store_result(block, result)
         self.logger.info(
             f"ConditionBlock {block.name} evaluation result: {result['condition_result']}"
         )
 
-        next_blocks = self.execution_graph[block]
+        next_blocks = self.workflow.get_successors(block)
+        if not next_blocks:
+            return []
         if result["condition_result"]:
             # self.logger.debug(f"Taking THEN branch: {next_blocks[0].name}")
-            await self._execute_nodes([next_blocks[0]], executor, loop)
+            return [next_blocks[0]]
         elif len(next_blocks) > 1:
             # self.logger.debug(f"Taking ELSE branch: {next_blocks[1].name}")
-            await self._execute_nodes([next_blocks[1]], executor, loop)
-        else:
-            # self.logger.debug("No ELSE branch available")
-            pass
+            return [next_blocks[1]]
+        # self.logger.debug("No ELSE branch available")
+        return []
 
     async def _execute_loop(self, block: LoopBlock, executor, loop):
         """执行循环"""
@@ -133,8 +271,8 @@ class WorkflowExecutor:
             inputs = self._gather_inputs(block)
             # self.logger.debug(f"LoopBlock inputs: {list(inputs.keys())}")
 
-            result = await loop.run_in_executor(executor, block.execute, **inputs)
-            self.results[block.name] = result
+            result = await self._invoke_block(block, inputs, executor, loop)
+            self._store_result(block, result)
             self.logger.info(
                 f"LoopBlock {block.name} continuation check: {result['should_continue']}"
             )
@@ -145,85 +283,189 @@ class WorkflowExecutor:
                 )
                 break
 
-            # self.logger.debug(f"Executing loop body: {self.execution_graph[block][0].name}")
-            loop_body = self.execution_graph[block][0]
+            loop_body = self.workflow.get_successors(block)[0]
+            # self.logger.debug(f"Executing loop body: {loop_body.name}")
             await self._execute_nodes([loop_body], executor, loop)
 
-    async def _execute_normal_block(self, block: Block, executor, loop):
-        """执行普通块"""
+    async def _execute_normal_block(self, block: Block, executor, loop) -> List[Block]:
+        """执行普通块，返回其后继节点"""
         # self.logger.debug(f"Evaluating Block: {block.name}")
-        futures = []
+        if not self._can_execute(block):
+            # self.logger.debug(f"Block {block.name} dependencies not met, skipping execution")
+            return []
 
-        if self._can_execute(block):
-            inputs = self._gather_inputs(block)
-            self.logger.info(f"Executing Block: {block.name}")
-            # self.logger.debug(f"Input parameters: {list(inputs.keys())}")
+        inputs = self._gather_inputs(block)
+        self.logger.info(f"Executing Block: {block.name}")
+        # self.logger.debug(f"Input parameters: {list(inputs.keys())}")
+        try:
+            result = await self._invoke_block(block, inputs, executor, loop)
+        except Exception as e:
+            self.logger.error(
+                f"Block {block.name} execution failed: {str(e)}", exc_info=True
+            )
+            raise RuntimeError(f"Block {block.name} execution failed: {e}")
+
+        self._store_result(block, result)
+        self.logger.info(f"Block [{block.name}] executed successfully")
+        return self.workflow.get_successors(block)
+
+    async def invoke_block(self, block: Block, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        按照工作流的执行规则调用不在工作流图中的 block，例如 MapBlock 为每个元素创建的 block。
+        与图中的 block 共用线程池、超时和取消处理，执行耗时同样会被记录。
+        """
+        return await self._invoke_block(block, inputs, self.block_pool, asyncio.get_running_loop())
 
-            future = loop.run_in_executor(
-                executor, functools.partial(block.execute, **inputs)
+    async def _invoke_block(self, block: Block, inputs: Dict[str, Any], executor, loop) -> Dict[str, Any]:
+        """
+        调用 block 的 execute 方法，并记录本次执行的耗时。
+        协程实现直接在事件循环中等待；声明为非阻塞的同步实现直接在事件循环中调用；
+        其余同步实现提交到线程池执行。
+        """
+        invoked_at = time.perf_counter()
+        ready_at = self._ready_at.pop(block, invoked_at)
+        timeout = self._get_block_timeout(block)
+        if block.cancelled:
+            block.cancelled = False
+        on_loop = True
+        thread_started_at: List[float] = []
+        result = None
+        success = False
+        try:
+            if inspect.iscoroutinefunction(block.execute):
+                result = await self._wait_block(block, block.execute(**inputs), inputs, timeout)
+            elif not block.blocking:
+                result = block.execute(**inputs)
+            else:
+                on_loop = False
+
+                def run():
+                    thread_started_at.append(time.perf_counter())
+                    return block.execute(**inputs)
+
+                future = loop.run_in_executor(executor, run)
+                try:
+                    result = await self._wait_block(block, future, inputs, timeout)
+                finally:
+                    # 超时或被取消时线程已经开始执行，无法强制中断
+                    if future.cancelled() and thread_started_at:
+                        self._abandon(block)
+            # 兼容返回 awaitable 的同步实现
+            if inspect.isawaitable(result):
+                result = await result
+            success = True
+            return result
+        except asyncio.CancelledError:
+            # 工作流被取消（例如整体超时），通知仍在线程中运行的 block 尽快退出
+            block.cancelled = True
+            raise
+        finally:
+            finished_at = time.perf_counter()
+            if on_loop:
+                started_at = invoked_at
+            else:
+                # 任务还没有被线程池执行就被取消时，全部计入等待时间
+                started_at = thread_started_at[0] if thread_started_at else finished_at
+            self._record_span(
+                block,
+                queue_wait=started_at - ready_at,
+                duration=finished_at - started_at,
+                on_loop=on_loop,
+                output_size=self._estimate_output_size(result),
+                success=success,
             )
-            futures.append((future, block))
-        else:
-            # self.logger.debug(f"Block {block.name} dependencies not met, skipping execution")
-            return
 
-        # 等待所有并行任务完成
-        for future, block in futures:
-            try:
-                result = await future
-                self.results[block.name] = result
-                self.logger.info(f"Block [{block.name}] executed successfully")
-                if result:
-                    # self.logger.debug(f"Execution result keys: {list(result.keys())}")
-                    pass
-                next_blocks = self.execution_graph[block]
-                if next_blocks:
-                    # self.logger.debug(f"Propagating to next blocks: {[b.name for b in next_blocks]}")
-                    await self._execute_nodes(next_blocks, executor, loop)
-                else:
-                    # self.logger.debug(f"Block {block.name} is terminal node")
-                    pass
-            except Exception as e:
-                self.logger.error(
-                    f"Block {block.name} execution failed: {str(e)}", exc_info=True
-                )
-                raise RuntimeError(f"Block {block.name} execution failed: {e}")
+    def _get_block_timeout(self, block: Block) -> Optional[float]:
+        """获取 block 的超时时间，优先使用 block 自身的设置"""
+        timeout = block.timeout if block.timeout is not None else self.config.block_timeout
+        return timeout if timeout and timeout > 0 else None
+
+    async def _wait_block(
+        self, block: Block, awaitable: Awaitable, inputs: Dict[str, Any], timeout: Optional[float]
+    ) -> Dict[str, Any]:
+        """等待 block 执行完成，超时后取消执行并尝试使用 on_timeout 的输出"""
+        if timeout is None:
+            return await awaitable
+        try:
+            return await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError:
+            block.cancelled = True
+            fallback = block.on_timeout(**inputs)
+            if fallback is None:
+                raise TimeoutError(f"Block {block.name} timed out after {timeout}s")
+            self.logger.warning(
+                f"Block {block.name} timed out after {timeout}s, using fallback output"
+            )
+            return fallback
+
+    def _abandon(self, block: Block):
+        """线程中的 block 无法被强制中断，记录下来并丢弃其结果"""
+        self.abandoned_blocks.append(block.name)
+        self.logger.warning(
+            f"Block {block.name} is still running in a worker thread, its result will be discarded"
+        )
+
+    def _record_span(
+        self,
+        block: Block,
+        queue_wait: float,
+        duration: float,
+        on_loop: bool,
+        output_size: int,
+        success: bool,
+    ):
+        """将 block 执行记录发布到事件总线"""
+        from kirara_ai.events import BlockExecutionSpan
+
+        self.event_bus.post(
+            BlockExecutionSpan(
+                workflow_id=self.workflow.id or self.workflow.name,
+                block_name=block.name,
+                block_type=type(block).__name__,
+                queue_wait=queue_wait,
+                duration=duration,
+                on_loop=on_loop,
+                output_size=output_size,
+                success=success,
+            )
+        )
+
+    @staticmethod
+    def _estimate_output_size(result: Any) -> int:
+        """估算 block 输出的大小，只计算第一层的值，避免深度遍历带来的开销"""
+        if not isinstance(result, dict):
+            return 0
+        size = 0
+        for value in result.values():
+            if isinstance(value, (str, bytes, bytearray)):
+                size += len(value)
+            else:
+                size += sys.getsizeof(value)
+        return size
 
     def _can_execute(self, block: Block) -> bool:
         """检查节点是否可以执行"""
         # self.logger.debug(f"Checking execution readiness for Block: {block.name}")
 
         # 如果块已经执行过，直接返回False
-        if block.name in self.results:
+        if block.name in self.completed:
             # self.logger.debug(f"Block {block.name} has already been executed")
             return False
 
-        # 获取所有直接前置blocks
-        predecessor_blocks = set()
-        for wire in self.workflow.wires:
-            if wire.target_block == block:
-                predecessor_blocks.add(wire.source_block)
-
         # 确保所有前置blocks都已执行完成
-        for pred_block in predecessor_blocks:
-            if pred_block.name not in self.results:
-                # self.logger.debug(f"Predecessor block {pred_block.name} not yet executed")
+        for pred_name in self.workflow.index.predecessors.get(block.name, ()):
+            if pred_name not in self.completed:
+                # self.logger.debug(f"Predecessor block {pred_name} not yet executed")
                 return False
 
         # 验证所有输入是否都能从正确的前置block获取
-        for input_name in block.inputs:
-            input_satisfied = False
-            for wire in self.workflow.wires:
-                if (
-                    wire.target_block == block
-                    and wire.target_input == input_name
-                    and wire.source_block.name in self.results
-                ):
-                    input_satisfied = True
-                    break
+        input_sources = self.workflow.index.input_sources.get(block.name, {})
+        for input_name, block_input in block.inputs.items():
+            source = input_sources.get(input_name)
+            input_satisfied = source is not None and source[0] in self.completed
 
             # 如果输入没有被满足，并且输入不是可空的，则返回False
-            if not input_satisfied and not block.inputs[input_name].nullable:
+            if not input_satisfied and not block_input.nullable:
                 self.logger.info(f"Input [{block.name}.{input_name}] not satisfied")
                 return False
 
@@ -234,31 +476,29 @@ class WorkflowExecutor:
         """收集节点的输入数据"""
         # self.logger.debug(f"Gathering inputs for Block: {block.name}")
         inputs = {}
-
-        # 创建输入名称到wire的映射
-        input_wire_map = {}
-        for wire in self.workflow.wires:
-            if wire.target_block == block:
-                input_wire_map[wire.target_input] = wire
+        input_sources = self.workflow.index.input_sources.get(block.name, {})
 
         # 根据wire的连接关系收集输入
-        for input_name in block.inputs:
-            if input_name in input_wire_map:
-                wire = input_wire_map[input_name]
-                if wire.source_block.name in self.results:
-                    inputs[input_name] = self.results[wire.source_block.name][
-                        wire.source_output
-                    ]
-                    # self.logger.debug(f"Resolved input {input_name} from {wire.source_block.name}.{wire.source_output}")
+        for input_name, block_input in block.inputs.items():
+            if input_name in input_sources:
+                source_name, source_output = input_sources[input_name]
+                if source_name in self.results:
+                    inputs[input_name] = self.results[source_name][source_output]
+                    # self.logger.debug(f"Resolved input {input_name} from {source_name}.{source_output}")
+                elif source_name in self.completed:
+                    raise RuntimeError(
+                        f"Output of source block {source_name} was released before input {input_name} was read"
+                    )
                 else:
                     raise RuntimeError(
-                        f"Source block {wire.source_block.name} not executed for input {input_name}"
+                        f"Source block {source_name} not executed for input {input_name}"
                     )
-            elif not block.inputs[input_name].nullable:
+            elif not block_input.nullable:
                 raise RuntimeError(
                     f"Missing wire connection for required input {input_name} in block {block.name}"
                 )
 
+        self._release_inputs(block)
         return inputs
 
     def set_variable(self, name: str, value: Any) -> None:
@@ -0,0 +1,105 @@
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+from kirara_ai.events.workflow import BlockExecutionSpan
+
+
+class RollingHistogram:
+    """
+    滚动直方图，只保留最近 window 个样本。
+    记录一次样本的开销是 O(1)，只有在生成快照时才会排序计算分位数。
+    """
+
+    def __init__(self, window: int = 1024):
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, value: float):
+        self.samples.append(value)
+
+    def snapshot(self) -> Dict[str, float]:
+        """获取统计快照，包括样本数、平均值、最大值和常用分位数"""
+        samples = sorted(self.samples)
+        if not samples:
+            return {"count": 0, "mean": 0.0, "p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+
+        def percentile(p: float) -> float:
+            return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+        return {
+            "count": len(samples),
+            "mean": sum(samples) / len(samples),
+            "p50": percentile(0.5),
+            "p90": percentile(0.9),
+            "p99": percentile(0.99),
+            "max": samples[-1],
+        }
+
+
+class BlockStats:
+    """同一工作流中同一类型 block 的执行统计"""
+
+    def __init__(self, window: int):
+        self.total = 0
+        self.errors = 0
+        self.on_loop = 0
+        self.in_thread = 0
+        self.queue_wait = RollingHistogram(window)
+        self.duration = RollingHistogram(window)
+        self.output_size = RollingHistogram(window)
+
+    def record(self, span: BlockExecutionSpan):
+        self.total += 1
+        if not span.success:
+            self.errors += 1
+        if span.on_loop:
+            self.on_loop += 1
+        else:
+            self.in_thread += 1
+        self.queue_wait.record(span.queue_wait)
+        self.duration.record(span.duration)
+        self.output_size.record(span.output_size)
+
+
+class BlockExecutionMetrics:
+    """
+    汇总 BlockExecutionSpan 事件，按工作流 id 和 block 类型统计执行耗时。
+    通过 EventBus 订阅 BlockExecutionSpan 事件后即可使用。
+    """
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], BlockStats] = {}
+
+    def record(self, span: BlockExecutionSpan):
+        """记录一次 block 执行"""
+        key = (span.workflow_id, span.block_type)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = BlockStats(self.window)
+            stats.record(span)
+
+    def snapshot(self) -> List[Dict]:
+        """获取所有统计数据，耗时单位为秒，输出大小单位为字节"""
+        with self._lock:
+            return [
+                {
+                    "workflow_id": workflow_id,
+                    "block_type": block_type,
+                    "total": stats.total,
+                    "errors": stats.errors,
+                    "on_loop": stats.on_loop,
+                    "in_thread": stats.in_thread,
+                    "queue_wait": stats.queue_wait.snapshot(),
+                    "duration": stats.duration.snapshot(),
+                    "output_size": stats.output_size.snapshot(),
+                }
+                for (workflow_id, block_type), stats in self._stats.items()
+            ]
+
+    def clear(self):
+        """清空统计数据"""
+        with self._lock:
+            self._stats.clear()
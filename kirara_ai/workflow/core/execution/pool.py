@@ -0,0 +1,87 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+
+from kirara_ai.logger import get_logger
+
+
+class BlockExecutorPool(ThreadPoolExecutor):
+    """
+    进程级的 block 执行线程池，所有工作流运行共享同一组工作线程。
+    在 ThreadPoolExecutor 的基础上统计排队任务数和正在执行的任务数。
+    """
+
+    _default: Optional["BlockExecutorPool"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, max_workers: int = 0):
+        if max_workers <= 0:
+            max_workers = min(32, (os.cpu_count() or 1) + 4)
+        super().__init__(max_workers=max_workers, thread_name_prefix="block-worker")
+        self.logger = get_logger("BlockExecutorPool")
+        self._stats_lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self.logger.info(f"Block executor pool started with {max_workers} workers")
+
+    @classmethod
+    def get_default(cls) -> "BlockExecutorPool":
+        """获取默认线程池，用于容器中没有注册线程池的场景"""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    @property
+    def queue_depth(self) -> int:
+        """等待工作线程的任务数"""
+        return self._queued
+
+    @property
+    def active_workers(self) -> int:
+        """正在执行任务的工作线程数"""
+        return self._active
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取线程池状态"""
+        return {
+            "max_workers": self.max_workers,
+            "active_workers": self.active_workers,
+            "queue_depth": self.queue_depth,
+        }
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        started = threading.Event()
+
+        def run():
+            with self._stats_lock:
+                self._queued -= 1
+                self._active += 1
+            started.set()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._stats_lock:
+                    self._active -= 1
+
+        def on_done(future: Future):
+            # 任务在开始执行前被取消时，需要从排队计数中移除
+            if not started.is_set():
+                with self._stats_lock:
+                    self._queued -= 1
+
+        with self._stats_lock:
+            self._queued += 1
+        try:
+            future = super().submit(run)
+        except Exception:
+            with self._stats_lock:
+                self._queued -= 1
+            raise
+        future.add_done_callback(on_done)
+        return future
@@ -1,5 +1,14 @@
-from .base import Wire, Workflow
+from .base import Wire, Workflow, WorkflowIndex
 from .builder import WorkflowBuilder
+from .plan import BlockTemplate, WorkflowPlan
 from .registry import WorkflowRegistry
 
-__all__ = ["Workflow", "WorkflowBuilder", "WorkflowRegistry", "Wire"]
+__all__ = [
+    "Workflow",
+    "WorkflowBuilder",
+    "WorkflowRegistry",
+    "Wire",
+    "WorkflowIndex",
+    "WorkflowPlan",
+    "BlockTemplate",
+]
@@ -1,13 +1,46 @@
-from typing import List
+from typing import Dict, List, Optional, Set, Tuple
 
+from kirara_ai.logger import get_logger
 from kirara_ai.workflow.core.block import Block
+from kirara_ai.workflow.core.block.registry import BlockRegistry
 
 
 class Workflow:
-    def __init__(self, name: str, blocks: List["Block"], wires: List["Wire"]):
+    def __init__(
+        self,
+        name: str,
+        blocks: List["Block"],
+        wires: List["Wire"],
+        index: Optional["WorkflowIndex"] = None,
+        validated: bool = False,
+        id: Optional[str] = None,
+    ):
         self.name = name
+        # 工作流在注册表中的 id（group_id:workflow_id），直接构造时为空
+        self.id = id
         self.blocks = blocks
         self.wires = wires
+        # 连线类型是否已经在加载时检查过，执行器据此跳过重复检查
+        self.validated = validated
+        # 连线索引只依赖 block 名称，可以在多个 Workflow 实例之间共享
+        self.index = index or WorkflowIndex(wires)
+        self.blocks_by_name: Dict[str, Block] = {block.name: block for block in blocks}
+
+    def get_block(self, name: str) -> Optional[Block]:
+        """根据名称获取 block"""
+        return self.blocks_by_name.get(name)
+
+    def get_successors(self, block: Block) -> List[Block]:
+        """获取 block 的后继节点，按连线顺序排列"""
+        return [
+            self.blocks_by_name[name]
+            for name in self.index.successors.get(block.name, [])
+        ]
+
+    def validate(self, registry: BlockRegistry):
+        """检查连线的数据类型，通过后标记为已检查"""
+        validate_wire_types(self.wires, registry)
+        self.validated = True
 
 
 class Wire:
@@ -25,3 +58,61 @@ class Wire:
 
     def __repr__(self):
         return f"Wire(source_block={self.source_block.name}, source_output={self.source_output}, target_block={self.target_block.name}, target_input={self.target_input})"
+
+
+class WorkflowIndex:
+    """
+    工作流连线索引，在加载时根据连线预先计算一次，供所有执行器复用。
+    索引以 block 名称为键，判断节点是否就绪和收集输入的开销只与该节点的入度相关。
+    """
+
+    def __init__(self, wires: List[Wire]):
+        # 目标 block -> 所有直接前置 block
+        self.predecessors: Dict[str, Set[str]] = {}
+        # 源 block -> 后继 block（每条连线一项，保持连线顺序）
+        self.successors: Dict[str, List[str]] = {}
+        # 目标 block -> {输入名称: (源 block, 源输出名称)}
+        self.input_sources: Dict[str, Dict[str, Tuple[str, str]]] = {}
+
+        for wire in wires:
+            source_name = wire.source_block.name
+            target_name = wire.target_block.name
+            self.predecessors.setdefault(target_name, set()).add(source_name)
+            self.successors.setdefault(source_name, []).append(target_name)
+            self.input_sources.setdefault(target_name, {})[wire.target_input] = (
+                source_name,
+                wire.source_output,
+            )
+
+
+def validate_wire_types(wires: List[Wire], registry: BlockRegistry):
+    """
+    检查每条连线两端的数据类型是否兼容。
+
+    :raises TypeError: 存在类型不兼容的连线
+    :raises ValueError: 连线引用了不存在的输入或输出
+    """
+    for wire in wires:
+        source_output = wire.source_block.outputs.get(wire.source_output)
+        if source_output is None:
+            raise ValueError(
+                f"Block {wire.source_block.name} has no output named {wire.source_output}"
+            )
+        target_input = wire.target_block.inputs.get(wire.target_input)
+        if target_input is None:
+            raise ValueError(
+                f"Block {wire.target_block.name} has no input named {wire.target_input}"
+            )
+
+        # 使用 BlockRegistry 的类型系统进行类型兼容性检查
+        source_type = registry._type_system.get_type_name(source_output.data_type)
+        target_type = registry._type_system.get_type_name(target_input.data_type)
+
+        if not registry.is_type_compatible(source_type, target_type):
+            error_msg = (
+                f"Type mismatch in wire: {wire.source_block.name}.{wire.source_output} "
+                f"({source_type}) -> {wire.target_block.name}.{wire.target_input} "
+                f"({target_type})"
+            )
+            get_logger("Workflow").error(error_msg)
+            raise TypeError(error_msg)
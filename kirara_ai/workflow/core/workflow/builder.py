@@ -11,7 +11,7 @@ from kirara_ai.ioc.container import DependencyContainer
 from kirara_ai.workflow.core.block import Block, ConditionBlock, LoopBlock, LoopEndBlock
 from kirara_ai.workflow.core.block.registry import BlockRegistry
 
-from .base import Wire, Workflow
+from .base import Wire, Workflow, WorkflowIndex, validate_wire_types
 
 
 @dataclass
@@ -22,6 +22,8 @@ class BlockSpec:
     name: Optional[str] = None
     kwargs: Dict[str, Any] = None
     wire_from: Optional[Union[str, List[str]]] = None
+    # 执行超时时间（秒），None 表示使用 block 类上的设置
+    timeout: Optional[float] = None
 
     def __post_init__(self):
         self.kwargs = self.kwargs or {}
@@ -146,9 +148,36 @@ class WorkflowBuilder:
         self.head: Node = None
         self.current: Node = None
         self.blocks: List[Block] = []
-        self.wires: List[Wire] = []
+        self._wires: List[Wire] = []
+        self._index: Optional[WorkflowIndex] = None
+        # 每次修改 block 或连线时递增，用于判断编译结果是否过期
+        self._version = 0
         self.nodes_by_name: Dict[str, Node] = {}
 
+    @property
+    def wires(self) -> List[Wire]:
+        return self._wires
+
+    @wires.setter
+    def wires(self, wires: List[Wire]):
+        self._wires = wires
+        self._mark_changed()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def _mark_changed(self):
+        """block 或连线发生变化，使缓存的连线索引和编译结果失效"""
+        self._index = None
+        self._version += 1
+
+    def get_index(self) -> WorkflowIndex:
+        """获取连线索引，连线发生变化前只计算一次"""
+        if self._index is None:
+            self._index = WorkflowIndex(self._wires)
+        return self._index
+
     def _generate_unique_name(self, base_name: str) -> str:
         """生成唯一的块名称"""
         while True:
@@ -190,6 +219,9 @@ class WorkflowBuilder:
         except Exception as e:
             raise ValueError(f"Failed to create block {spec.block_class.__name__}: {e}")
 
+        if spec.timeout is not None:
+            block.timeout = spec.timeout
+
         # 设置 block 名称
         if spec.name:
             block.name = spec.name
@@ -198,6 +230,7 @@ class WorkflowBuilder:
 
         node = Node(block=block, name=block.name, is_parallel=is_parallel, spec=spec)
         self.blocks.append(block)
+        self._mark_changed()
         self.nodes_by_name[node.name] = node
 
         # 处理连接
@@ -252,6 +285,16 @@ class WorkflowBuilder:
         self.current.parallel_nodes = parallel_nodes
         return self
 
+    def timeout(self, seconds: Optional[float]) -> "WorkflowBuilder":
+        """设置当前节点的执行超时时间（秒），None 表示使用 block 类上的设置"""
+        node = self.current
+        if node.spec is None:
+            raise ValueError("timeout can only be set on a regular block")
+        node.spec.timeout = seconds
+        node.block.timeout = seconds if seconds is not None else type(node.block).timeout
+        self._mark_changed()
+        return self
+
     def condition(self, condition_func: Callable) -> "WorkflowBuilder":
         """添加条件判断"""
         self.current.condition = condition_func
@@ -263,6 +306,7 @@ class WorkflowBuilder:
         condition_block = ConditionBlock(condition, self.current.block.outputs.copy())
         node = Node(block=condition_block, name=name, is_conditional=True)
         self.blocks.append(condition_block)
+        self._mark_changed()
         self.nodes_by_name[node.name] = node
 
         self._connect_blocks(self.current.block, condition_block)
@@ -297,6 +341,7 @@ class WorkflowBuilder:
         )
         node = Node(block=loop_block, name=name, is_loop=True)
         self.blocks.append(loop_block)
+        self._mark_changed()
         self.nodes_by_name[node.name] = node
 
         self._connect_blocks(self.current.block, loop_block)
@@ -313,6 +358,7 @@ class WorkflowBuilder:
         loop_end = LoopEndBlock(self.current.block.outputs.copy())
         node = Node(block=loop_end)
         self.blocks.append(loop_end)
+        self._mark_changed()
         self.nodes_by_name[node.name] = node
 
         self._connect_blocks(self.current.block, loop_end)
@@ -340,6 +386,7 @@ class WorkflowBuilder:
                     ):
                         is_connected = True
                         self.wires.append(wire)
+                        self._mark_changed()
                         break
             # 如果连接成功，则跳出循环
             if is_connected:
@@ -355,6 +402,7 @@ class WorkflowBuilder:
         """强制连接两个块"""
         wire = Wire(source_block, source_output, target_block, target_input)
         self.wires.append(wire)
+        self._mark_changed()
 
     def _find_parallel_nodes(self, start_node: Node) -> List[Node]:
         """查找所有并行节点"""
@@ -378,7 +426,11 @@ class WorkflowBuilder:
                 block.name = self._generate_unique_name(block.__class__.__name__)
             block.container = container
 
-        return Workflow(self.name, self.blocks, self.wires)
+        return Workflow(self.name, self.blocks, self.wires, self.get_index())
+
+    def validate(self, registry: BlockRegistry):
+        """检查所有连线的数据类型是否兼容，不兼容时抛出 TypeError"""
+        validate_wire_types(self.wires, registry)
 
     def update_position(self, name: str, position: Tuple[int, int]):
         """更新节点的位置"""
@@ -408,6 +460,9 @@ class WorkflowBuilder:
             if node.is_parallel:
                 block_data["parallel"] = True
 
+            if node.spec and node.spec.timeout is not None:
+                block_data["timeout"] = node.spec.timeout
+
             # 添加连接信息
             connected_to = []
             for wire in self.wires:
@@ -497,6 +552,8 @@ class WorkflowBuilder:
                     builder.use(block_class, name=block_data["name"], **params)
                 else:
                     builder.chain(block_class, name=block_data["name"], **params)
+            if block_data.get("timeout") is not None:
+                builder.timeout(block_data["timeout"])
             builder.update_position(block_data["name"], block_data["position"])
         # 第二遍：建立连接
         builder.wires = []
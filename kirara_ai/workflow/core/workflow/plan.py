@@ -0,0 +1,126 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from kirara_ai.ioc.container import DependencyContainer
+from kirara_ai.workflow.core.block import Block
+from kirara_ai.workflow.core.block.registry import BlockRegistry
+
+from .base import Wire, Workflow, WorkflowIndex
+
+if TYPE_CHECKING:
+    from .builder import BlockSpec, WorkflowBuilder
+
+
+@dataclass(frozen=True)
+class BlockTemplate:
+    """单个 block 的编译结果，用于在每次运行时创建独立的 block 实例"""
+
+    name: str
+    prototype: Block
+    spec: Optional["BlockSpec"] = None
+
+    def instantiate(self) -> Block:
+        """创建一个新的 block 实例，不与其他运行共享状态"""
+        if self.spec is not None:
+            block = self.spec.block_class(**self.spec.kwargs)
+            if self.spec.timeout is not None:
+                block.timeout = self.spec.timeout
+        else:
+            # 条件、循环等控制流 block 没有构造规格，从原型复制
+            block = self.prototype.clone()
+        block.name = self.name
+        return block
+
+
+class WorkflowPlan:
+    """
+    工作流的编译产物，编译后不再改变。
+    包含 block 规格、以 block 下标表示的连线和连线索引，每次运行时据此创建独立的 block 实例，
+    不同会话并发执行同一个工作流时互不影响。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        templates: List[BlockTemplate],
+        wires: List[Tuple[int, str, int, str]],
+        index: WorkflowIndex,
+        version: int = 0,
+        validated: bool = False,
+        workflow_id: Optional[str] = None,
+    ):
+        self.name = name
+        self.workflow_id = workflow_id
+        self.templates: Tuple[BlockTemplate, ...] = tuple(templates)
+        # (源 block 下标, 源输出, 目标 block 下标, 目标输入)
+        self.wires: Tuple[Tuple[int, str, int, str], ...] = tuple(wires)
+        self.index = index
+        self.version = version
+        self.validated = validated
+
+    @classmethod
+    def compile(
+        cls,
+        builder: "WorkflowBuilder",
+        registry: Optional[BlockRegistry] = None,
+        workflow_id: Optional[str] = None,
+    ) -> "WorkflowPlan":
+        """
+        将工作流构建器编译为执行计划。
+        传入 registry 时同时检查连线类型，生成的工作流实例在运行时不再重复检查。
+
+        :raises TypeError: 存在类型不兼容的连线
+        """
+        if registry is not None:
+            builder.validate(registry)
+        specs = {
+            id(node.block): node.spec
+            for node in builder.nodes_by_name.values()
+            if node.spec is not None
+        }
+        templates = []
+        for block in builder.blocks:
+            if not block.name:
+                block.name = builder._generate_unique_name(block.__class__.__name__)
+            templates.append(BlockTemplate(block.name, block, specs.get(id(block))))
+
+        positions = {id(block): i for i, block in enumerate(builder.blocks)}
+        wires = [
+            (
+                positions[id(wire.source_block)],
+                wire.source_output,
+                positions[id(wire.target_block)],
+                wire.target_input,
+            )
+            for wire in builder.wires
+        ]
+        return cls(
+            builder.name,
+            templates,
+            wires,
+            builder.get_index(),
+            builder.version,
+            validated=registry is not None,
+            workflow_id=workflow_id,
+        )
+
+    def instantiate(self, container: DependencyContainer) -> Workflow:
+        """为单次运行创建工作流实例，block 实例和容器只属于本次运行"""
+        blocks = []
+        for template in self.templates:
+            block = template.instantiate()
+            block.container = container
+            blocks.append(block)
+
+        wires = [
+            Wire(blocks[source], source_output, blocks[target], target_input)
+            for source, source_output, target, target_input in self.wires
+        ]
+        return Workflow(
+            self.name,
+            blocks,
+            wires,
+            self.index,
+            validated=self.validated,
+            id=self.workflow_id,
+        )
@@ -1,10 +1,13 @@
 import os
 import re
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
 
 from kirara_ai.ioc.container import DependencyContainer
 from kirara_ai.logger import get_logger
+from kirara_ai.workflow.core.block.registry import BlockRegistry
+from kirara_ai.workflow.core.workflow.base import Workflow
 from kirara_ai.workflow.core.workflow.builder import WorkflowBuilder
+from kirara_ai.workflow.core.workflow.plan import WorkflowPlan
 
 
 class WorkflowRegistry:
@@ -14,6 +17,8 @@ class WorkflowRegistry:
 
     def __init__(self, container: DependencyContainer):
         self._workflows: Dict[str, WorkflowBuilder] = {}
+        # 已编译的执行计划，按工作流名称缓存
+        self._plans: Dict[str, WorkflowPlan] = {}
         self.logger = get_logger("WorkflowRegistry")
         self.container = container
 
@@ -48,6 +53,7 @@ class WorkflowRegistry:
         full_name = f"{group_id}:{workflow_id}"
         if full_name in self._workflows:
             del self._workflows[full_name]
+            self._plans.pop(full_name, None)
             self.logger.info(f"Unregistered workflow: {full_name}")
 
     def register(
@@ -55,9 +61,12 @@ class WorkflowRegistry:
     ):
         """注册一个工作流"""
         full_name = f"{group_id}:{workflow_id}"
+        # 在注册时完成编译和连线类型检查，类型错误不会拖到第一次运行时才暴露
+        plan = self._compile(full_name, workflow_builder)
         if full_name in self._workflows:
             self.logger.warning(f"Workflow {full_name} already registered, overwriting")
         self._workflows[full_name] = workflow_builder
+        self._plans[full_name] = plan
         self.logger.info(f"Registered workflow: {full_name}")
 
     def register_preset_workflow(
@@ -70,18 +79,42 @@ class WorkflowRegistry:
                 f"Preset workflow {full_name} already registered, skipping"
             )
             return
+        plan = self._compile(full_name, workflow_builder)
         self._workflows[full_name] = workflow_builder
+        self._plans[full_name] = plan
         self.logger.info(f"Registered preset workflow: {full_name}")
 
     def get(
         self, name: str, container: DependencyContainer = None
-    ) -> Optional[WorkflowBuilder]:
-        """获取工作流构建器或实例"""
+    ) -> Optional[Union[WorkflowBuilder, Workflow]]:
+        """
+        获取工作流构建器或实例。
+        传入 container 时返回本次运行专用的工作流实例，block 实例不会在多次运行之间共享。
+        """
         builder = self._workflows.get(name)
         if builder and container:
-            return builder.build(container)
+            return self.get_plan(name).instantiate(container)
         return builder
 
+    def get_plan(self, name: str) -> Optional[WorkflowPlan]:
+        """获取工作流的执行计划，构建器发生变化后重新编译"""
+        builder = self._workflows.get(name)
+        if builder is None:
+            return None
+        plan = self._plans.get(name)
+        if plan is None or plan.version != builder.version:
+            plan = self._compile(name, builder)
+            self._plans[name] = plan
+        return plan
+
+    def _compile(self, name: str, builder: WorkflowBuilder) -> WorkflowPlan:
+        """编译工作流，容器中有 BlockRegistry 时同时检查连线类型"""
+        try:
+            block_registry = self.container.resolve(BlockRegistry)
+        except KeyError:
+            block_registry = None
+        return WorkflowPlan.compile(builder, block_registry, workflow_id=name)
+
     def load_workflows(self, workflows_dir: str = None):
         """从指定目录加载所有工作流定义"""
         workflows_dir = workflows_dir or self.WORKFLOWS_DIR
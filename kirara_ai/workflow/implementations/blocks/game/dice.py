@@ -11,6 +11,7 @@ class DiceRoll(Block):
     """骰子掷点 block"""
 
     name = "dice_roll"
+    blocking = False
     inputs = {
         "message": Input("message", "输入消息", IMMessage, "输入消息包含骰子命令")
     }
@@ -10,6 +10,7 @@ class GachaSimulator(Block):
     """抽卡模拟器 block"""
 
     name = "gacha_simulator"
+    blocking = False
     inputs = {
         "message": Input("message", "输入消息", IMMessage, "输入消息包含抽卡命令")
     }
@@ -11,6 +11,7 @@ class ExtractChatSender(Block):
     """提取消息发送者"""
 
     name = "extract_chat_sender"
+    blocking = False
     container: DependencyContainer
     inputs = {"msg": Input("msg", "IM 消息", IMMessage, "IM 消息")}
     outputs = {"sender": Output("sender", "消息发送者", ChatSender, "消息发送者")}
@@ -1,4 +1,3 @@
-import asyncio
 from typing import Annotated, Any, Dict, List, Optional
 
 from kirara_ai.im.adapter import IMAdapter
@@ -16,6 +15,7 @@ class GetIMMessage(Block):
     """获取 IM 消息"""
 
     name = "msg_input"
+    blocking = False
     container: DependencyContainer
     outputs = {
         "msg": Output("msg", "IM 消息", IMMessage, "获取 IM 发送的最新一条的消息"),
@@ -49,7 +49,7 @@ class SendIMMessage(Block):
     ):
         self.im_name = im_name
 
-    def execute(
+    async def execute(
         self, msg: IMMessage, target: Optional[ChatSender] = None
     ) -> Dict[str, Any]:
         src_msg = self.container.resolve(IMMessage)
@@ -58,11 +58,8 @@ class SendIMMessage(Block):
         else:
             adapter = self.container.resolve(
                 IMManager).get_adapter(self.im_name)
-        loop: asyncio.AbstractEventLoop = self.container.resolve(
-            asyncio.AbstractEventLoop
-        )
-        loop.create_task(adapter.send_message(msg, target or src_msg.sender))
-        # return {"ok": True}
+        await adapter.send_message(msg, target or src_msg.sender)
+        return {}
 
 # IMMessage 转纯文本
 
@@ -71,6 +68,7 @@ class IMMessageToText(Block):
     """IMMessage 转纯文本"""
 
     name = "im_message_to_text"
+    blocking = False
     container: DependencyContainer
     inputs = {"msg": Input("msg", "IM 消息", IMMessage, "IM 消息")}
     outputs = {"text": Output("text", "纯文本", str, "纯文本")}
@@ -84,6 +82,7 @@ class TextToIMMessage(Block):
     """纯文本转 IMMessage"""
 
     name = "text_to_im_message"
+    blocking = False
     container: DependencyContainer
     inputs = {"text": Input("text", "纯文本", str, "纯文本")}
     outputs = {"msg": Output("msg", "IM 消息", IMMessage, "IM 消息")}
@@ -102,6 +101,7 @@ class AppendIMMessage(Block):
     """补充 IMMessage 消息"""
 
     name = "concat_im_message"
+    blocking = False
     container: DependencyContainer
     inputs = {
         "base_msg": Input("base_msg", "IM 消息", IMMessage, "IM 消息"),
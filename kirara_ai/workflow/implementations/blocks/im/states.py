@@ -1,4 +1,3 @@
-import asyncio
 from typing import Annotated, Any, Dict
 
 from kirara_ai.im.adapter import EditStateAdapter, IMAdapter
@@ -24,11 +23,8 @@ class ToggleEditState(Block):
     ):
         self.is_editing = is_editing
 
-    def execute(self, sender: ChatSender) -> Dict[str, Any]:
+    async def execute(self, sender: ChatSender) -> Dict[str, Any]:
         im_adapter = self.container.resolve(IMAdapter)
         if isinstance(im_adapter, EditStateAdapter):
-            loop: asyncio.AbstractEventLoop = self.container.resolve(
-                asyncio.AbstractEventLoop
-            )
-            loop.create_task(im_adapter.set_chat_editing_state(sender, self.is_editing))
+            await im_adapter.set_chat_editing_state(sender, self.is_editing)
         return {}
@@ -15,14 +15,14 @@ class QueryUserProfileBlock(Block):
                 "chat_sender", "聊天对象", ChatSender, "要查询聊天对象的 profile"
             ),
             "im_adapter": Input(
-                "im_adapter", "IM 平台", IMAdapter, "IM 平台适配器", optional=True
+                "im_adapter", "IM 平台", IMAdapter, "IM 平台适配器", nullable=True
             ),
         }
         outputs = {"profile": Output("profile", "用户资料", UserProfile, "用户资料")}
         super().__init__("query_user_profile", inputs, outputs)
         self.container = container
 
-    def execute(
+    async def execute(
         self, chat_sender: ChatSender, im_adapter: Optional[IMAdapter] = None
     ) -> Dict[str, Any]:
         # 如果没有提供 im_adapter，则从容器中获取默认的
@@ -35,7 +35,6 @@ class QueryUserProfileBlock(Block):
                 f"IM Adapter {type(im_adapter)} does not support user profile querying"
             )
 
-        # 同步调用异步方法（在工作流执行器中会被正确处理）
-        profile = im_adapter.query_user_profile(chat_sender)
+        profile = await im_adapter.query_user_profile(chat_sender)
 
         return {"profile": profile}
@@ -12,6 +12,7 @@ class LLMResponseToText(Block):
     """LLM 响应转纯文本"""
 
     name = "llm_response_to_text"
+    blocking = False
     container: DependencyContainer
     inputs = {"response": Input("response", "LLM 响应", LLMChatResponse, "LLM 响应")}
     outputs = {"text": Output("text", "纯文本", str, "纯文本")}
@@ -11,6 +11,7 @@ from kirara_ai.llm.llm_manager import LLMManager
 from kirara_ai.llm.llm_registry import LLMAbility
 from kirara_ai.logger import get_logger
 from kirara_ai.workflow.core.block import Block, Input, Output, ParamMeta
+from kirara_ai.workflow.core.dispatch.admission import AdmissionTicket
 from kirara_ai.workflow.core.execution.executor import WorkflowExecutor
 
 
@@ -20,6 +21,7 @@ def model_name_options_provider(container: DependencyContainer, block: Block) ->
 
 class ChatMessageConstructor(Block):
     name = "chat_message_constructor"
+    blocking = False
     inputs = {
         "user_msg": Input("user_msg", "本轮消息", IMMessage, "用户消息"),
         "user_prompt_format": Input(
@@ -138,6 +140,14 @@ class ChatCompletion(Block):
     def execute(self, prompt: List[LLMChatMessage]) -> Dict[str, Any]:
         llm_manager = self.container.resolve(LLMManager)
         model_id = self.model_name
+        try:
+            ticket = self.container.resolve(AdmissionTicket)
+        except KeyError:
+            ticket = None
+        if ticket and ticket.degraded_model:
+            # 系统繁忙，使用降级模型
+            self.logger.info(f"System busy, using degraded model: {ticket.degraded_model}")
+            model_id = ticket.degraded_model
         if not model_id:
             model_id = llm_manager.get_llm_id_by_ability(LLMAbility.TextChat)
             if not model_id:
@@ -158,6 +168,7 @@ class ChatCompletion(Block):
 
 class ChatResponseConverter(Block):
     name = "chat_response_converter"
+    blocking = False
     inputs = {"resp": Input("resp", "LLM 响应", LLMChatResponse, "LLM 响应")}
     outputs = {"msg": Output("msg", "IM 消息", IMMessage, "IM 消息")}
     container: DependencyContainer
@@ -8,6 +8,7 @@ from kirara_ai.workflow.core.block.input_output import Input
 
 class TextBlock(Block):
     name = "text_block"
+    blocking = False
     outputs = {"text": Output("text", "文本", str, "文本")}
 
     def __init__(
@@ -22,6 +23,7 @@ class TextBlock(Block):
 # 拼接文本
 class TextConcatBlock(Block):
     name = "text_concat_block"
+    blocking = False
     inputs = {
         "text1": Input("text1", "文本1", str, "文本1"),
         "text2": Input("text2", "文本2", str, "文本2"),
@@ -35,6 +37,7 @@ class TextConcatBlock(Block):
 # 替换输入文本中的某一块文字为变量
 class TextReplaceBlock(Block):
     name = "text_replace_block"
+    blocking = False
     inputs = {
         "text": Input("text", "原始文本", str, "原始文本"),
         "new_text": Input("new_text", "新文本", Any, "新文本"),
@@ -55,6 +58,7 @@ class TextReplaceBlock(Block):
 # 正则表达式提取
 class TextExtractByRegexBlock(Block):
     name = "text_extract_by_regex_block"
+    blocking = False
     inputs = {"text": Input("text", "原始文本", str, "原始文本")}
     outputs = {"text": Output("text", "提取后的文本", str, "提取后的文本")}
     def __init__(
@@ -76,6 +80,7 @@ class TextExtractByRegexBlock(Block):
 # 获取当前时间
 class CurrentTimeBlock(Block):
     name = "current_time_block"
+    blocking = False
     outputs = {"time": Output("time", "当前时间", str, "当前时间")}
 
     def execute(self) -> Dict[str, Any]:
@@ -42,6 +42,7 @@ class GenerateHelp(Block):
     """生成帮助信息 block"""
 
     name = "generate_help"
+    blocking = False
     inputs = {}  # 不需要输入
     outputs = {"response": Output("response", "帮助信息", IMMessage, "帮助信息")}
     container: DependencyContainer
@@ -0,0 +1,102 @@
+import asyncio
+import inspect
+from typing import Annotated, Any, Dict, List, Optional, Tuple
+
+from kirara_ai.ioc.container import DependencyContainer
+from kirara_ai.workflow.core.block import Block, Input, Output, ParamMeta
+from kirara_ai.workflow.core.block.registry import BlockRegistry
+from kirara_ai.workflow.core.execution.executor import WorkflowExecutor
+
+
+class MapBlock(Block):
+    """
+    对列表中的每个元素执行同一种 block，元素之间并发执行。
+    输出列表与输入列表一一对应，执行失败的元素输出 None，并在 errors 中记录错误。
+    每个元素按照所在工作流的执行规则调用，遵循内部 block 的超时设置；本 block 超时或被取消时，
+    等待中的元素不再启动，线程中正在执行的元素会收到取消标记。
+    """
+
+    name = "map_block"
+    inputs = {"items": Input("items", "输入列表", list, "需要逐个处理的元素列表")}
+    outputs = {
+        "results": Output("results", "结果列表", list, "按输入顺序排列的处理结果，失败的元素为 None"),
+        "errors": Output("errors", "错误列表", list, "处理失败的元素，每项包含 index 和 error"),
+    }
+    container: DependencyContainer
+
+    def __init__(
+        self,
+        block_type: Annotated[
+            str, ParamMeta(label="Block 类型", description="对每个元素执行的 block 类型，例如 internal:chat_completion")
+        ],
+        item_input: Annotated[
+            Optional[str], ParamMeta(label="元素输入名", description="元素传入的输入名称，为空时使用唯一的输入")
+        ] = None,
+        result_output: Annotated[
+            Optional[str], ParamMeta(label="结果输出名", description="收集的输出名称，为空时使用唯一的输出")
+        ] = None,
+        params: Annotated[
+            Optional[Dict[str, Any]], ParamMeta(label="Block 参数", description="创建 block 时使用的参数")
+        ] = None,
+        max_concurrency: Annotated[
+            int, ParamMeta(label="最大并发数", description="同时处理的元素数量上限")
+        ] = 4,
+    ):
+        self.block_type = block_type
+        self.item_input = item_input
+        self.result_output = result_output
+        self.params = params or {}
+        self.max_concurrency = max(1, max_concurrency)
+
+    def _resolve_ports(self, block_class: type) -> Tuple[str, str]:
+        """确定元素传入的输入名称和收集的输出名称"""
+        item_input = self.item_input
+        if item_input is None:
+            if len(block_class.inputs) != 1:
+                raise ValueError(
+                    f"Block {self.block_type} has {len(block_class.inputs)} inputs, item_input must be specified"
+                )
+            item_input = next(iter(block_class.inputs))
+        result_output = self.result_output
+        if result_output is None:
+            if len(block_class.outputs) != 1:
+                raise ValueError(
+                    f"Block {self.block_type} has {len(block_class.outputs)} outputs, result_output must be specified"
+                )
+            result_output = next(iter(block_class.outputs))
+        return item_input, result_output
+
+    def _create_block(self, block_class: type, index: int) -> Block:
+        """为每个元素创建独立的 block 实例，避免元素之间共享状态"""
+        params = dict(self.params)
+        if "container" in inspect.signature(block_class.__init__).parameters:
+            params.setdefault("container", self.container)
+        block = block_class(**params)
+        block.name = f"{self.name}[{index}]"
+        block.container = self.container
+        return block
+
+    async def execute(self, items: list) -> Dict[str, Any]:
+        registry = self.container.resolve(BlockRegistry)
+        block_class = registry.get(self.block_type)
+        if block_class is None:
+            raise ValueError(f"Block type {self.block_type} not found in registry")
+        item_input, result_output = self._resolve_ports(block_class)
+        executor = self.container.resolve(WorkflowExecutor)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results: List[Any] = [None] * len(items)
+        errors: List[Dict[str, Any]] = []
+
+        async def process(index: int, item: Any):
+            async with semaphore:
+                try:
+                    block = self._create_block(block_class, index)
+                    output = await executor.invoke_block(block, {item_input: item})
+                    results[index] = output[result_output]
+                except Exception as e:
+                    errors.append({"index": index, "error": str(e)})
+
+        await asyncio.gather(*(process(index, item) for index, item in enumerate(items)))
+        errors.sort(key=lambda error: error["index"])
+        return {"results": results, "errors": errors}
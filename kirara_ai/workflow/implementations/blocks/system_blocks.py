@@ -13,6 +13,7 @@ from .im.states import ToggleEditState
 from .llm.chat import ChatCompletion, ChatMessageConstructor, ChatResponseConverter
 from .memory.chat_memory import ChatMemoryQuery, ChatMemoryStore
 from .system.help import GenerateHelp
+from .system.map import MapBlock
 
 
 def register_system_blocks(registry: BlockRegistry):
@@ -23,6 +24,7 @@ def register_system_blocks(registry: BlockRegistry):
     registry.register("text_replace_block", "internal", TextReplaceBlock, "基础：替换文本")
     registry.register("text_extract_by_regex_block", "internal", TextExtractByRegexBlock, "基础：正则表达式提取文本")
     registry.register("current_time_block", "internal", CurrentTimeBlock, "基础：当前时间")
+    registry.register("map_block", "internal", MapBlock, "基础：逐项处理列表")
 
     # IM 相关 blocks
     registry.register("get_message", "internal", GetIMMessage, "IM: 获取最新消息")
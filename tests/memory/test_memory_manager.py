@@ -1,3 +1,6 @@
+import sys
+import threading
+import time
 from datetime import datetime
 from typing import Dict, List
 from unittest.mock import MagicMock
@@ -6,6 +9,7 @@ import pytest
 
 from kirara_ai.config.global_config import GlobalConfig
 from kirara_ai.ioc.container import DependencyContainer
+from kirara_ai.memory.cache import ResidentMemoryCache, estimate_entries_size
 from kirara_ai.memory.composes import MemoryComposer, MemoryDecomposer
 from kirara_ai.memory.entry import MemoryEntry
 from kirara_ai.memory.memory_manager import MemoryManager
@@ -69,6 +73,8 @@ def mock_scope():
     """创建模拟的作用域"""
     mock_scope = MagicMock(spec=MemoryScope)
     mock_scope.get_scope_key.return_value = "test_scope"
+    mock_scope.get_query_keys.return_value = ["test_scope"]
+    mock_scope.scan_all_scopes = False
     mock_scope.is_in_scope.return_value = True  # 默认返回 True
     return mock_scope
 
@@ -116,6 +122,20 @@ class TestMemoryManager:
         assert len(results) == 1
         assert results[0] == test_entry
 
+    def test_query_reads_only_scope_buckets(self, memory_manager, mock_scope):
+        """测试查询只读取作用域对应的记忆，不遍历其他已加载的记忆"""
+        entry = MemoryEntry(sender="user1", content="test", timestamp=datetime.now(), metadata={})
+        memory_manager.store(mock_scope, entry)
+        other = MemoryEntry(sender="user1", content="other", timestamp=datetime.now(), metadata={})
+        memory_manager.memories["other_scope"] = [other]
+
+        assert memory_manager.query(mock_scope, "user1") == [entry]
+        assert mock_scope.is_in_scope.call_count == 1
+
+        # 声明需要遍历所有记忆的作用域
+        mock_scope.scan_all_scopes = True
+        assert memory_manager.query(mock_scope, "user1") == [entry, other]
+
     def test_max_entries_limit(self, memory_manager, mock_scope, container):
         """测试最大条目数限制"""
         # 设置最大条目数
@@ -135,6 +155,128 @@ class TestMemoryManager:
         assert len(memory_manager.memories["test_scope"]) == 2
         assert memory_manager.memories["test_scope"][-1].content == "message 2"
 
+    def test_resident_scopes_evicted_and_reloaded(self, memory_manager, container):
+        """测试超出常驻作用域数量时淘汰最久未使用的作用域，再次访问时重新加载"""
+        memory_manager.config.max_resident_scopes = 2
+        memory_manager.memories = {}
+
+        scopes = []
+        for i in range(3):
+            scope = MagicMock(spec=MemoryScope)
+            scope.get_scope_key.return_value = f"scope{i}"
+            scope.get_query_keys.return_value = [f"scope{i}"]
+            scope.scan_all_scopes = False
+            scope.is_in_scope.return_value = True
+            scopes.append(scope)
+
+        entry = MemoryEntry(sender="user1", content="test", timestamp=datetime.now(), metadata={})
+        memory_manager.store(scopes[0], entry)
+        memory_manager.store(scopes[1], entry)
+        # 访问 scope0，scope1 成为最久未使用的作用域
+        memory_manager.query(scopes[0], "user1")
+        memory_manager.store(scopes[2], entry)
+
+        assert list(memory_manager.memories) == ["scope0", "scope2"]
+        # 被淘汰的作用域从持久化层重新加载
+        assert memory_manager.query(scopes[1], "user1") == [entry]
+        assert "scope1" in memory_manager.memories
+
+        stats = memory_manager.get_cache_stats()
+        assert stats["scopes"] == 2
+        assert stats["hits"] == 1
+        assert stats["misses"] == 4
+        assert stats["evictions"] == 2
+
+    def test_resident_bytes_budget(self, memory_manager, mock_scope):
+        """测试超出内存预算时淘汰，但保留刚写入的作用域"""
+        memory_manager.config.max_resident_bytes = 1
+        memory_manager.memories = {"old_scope": []}
+        entry = MemoryEntry(sender="user1", content="test", timestamp=datetime.now(), metadata={})
+        memory_manager.store(mock_scope, entry)
+
+        assert list(memory_manager.memories) == ["test_scope"]
+        assert memory_manager.get_cache_stats()["bytes"] > 1
+
+    def test_resident_cache_is_thread_safe(self):
+        """测试多个线程并发读写、淘汰时缓存的统计保持一致"""
+        cache = ResidentMemoryCache(max_scopes=8)
+        entry = MemoryEntry(sender="user1", content="test", timestamp=datetime.now(), metadata={})
+        errors = []
+
+        def worker(offset: int):
+            try:
+                for i in range(2000):
+                    scope_key = f"scope{(i + offset) % 32}"
+                    entries = cache.get_or_load(scope_key, lambda _: [entry])
+                    cache[scope_key] = entries[-1:] + [entry]
+                    list(cache.values())
+            except Exception as e:
+                errors.append(e)
+
+        # 缩短线程切换间隔，让竞争更容易出现
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+        assert errors == []
+        assert len(cache) <= 8
+        assert cache.total_bytes == sum(estimate_entries_size(entries) for entries in cache.values())
+
+    def test_concurrent_store_at_max_entries(self, memory_manager, mock_scope):
+        """测试多个线程在 max_entries 边界并发写入同一作用域时不丢失记忆"""
+        memory_manager.config.max_entries = 4
+        snapshots = []
+        memory_manager.persistence.save = lambda scope_key, entries: snapshots.append(list(entries))
+        get_entries = memory_manager._get_entries
+
+        def slow_get_entries(scope_key):
+            # 读取后让出线程，放大读取和写回之间的竞争窗口
+            entries = get_entries(scope_key)
+            time.sleep(0.0001)
+            return entries
+
+        memory_manager._get_entries = slow_get_entries
+
+        def worker(offset: int):
+            for i in range(200):
+                entry = MemoryEntry(sender="user1", content=f"{offset}-{i}", timestamp=datetime.now(), metadata={})
+                memory_manager.store(mock_scope, entry)
+
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+        assert len(snapshots) == 1600
+        # 每次保存的快照都是上一次的快照追加一条新记忆后截断
+        for previous, current in zip(snapshots, snapshots[1:]):
+            assert current == (previous + current[-1:])[-4:]
+        assert memory_manager.memories["test_scope"] == snapshots[-1]
+
+    def test_redis_list_persistence_config(self, container):
+        """测试 Redis 配置中的 max_entries 优先于记忆配置"""
+        config = container.resolve.return_value.memory
+        config.persistence.type = "redis_list"
+        config.persistence.redis = {"host": "localhost", "port": 6379, "db": 0, "max_entries": 20}
+        manager = MemoryManager(container)
+        try:
+            assert manager.persistence.persistence.max_entries == 20
+        finally:
+            manager.shutdown()
+
     def test_shutdown(self, memory_manager, test_entry):
         """测试关闭"""
         # 添加一些测试数据
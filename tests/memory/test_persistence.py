@@ -1,6 +1,10 @@
+import asyncio
+import concurrent.futures
 import os
 import shutil
 import tempfile
+import threading
+import time
 from datetime import datetime
 from unittest.mock import MagicMock, patch
 
@@ -8,7 +12,9 @@ import pytest
 
 from kirara_ai.im.sender import ChatSender, ChatType
 from kirara_ai.memory.entry import MemoryEntry
-from kirara_ai.memory.persistences import FileMemoryPersistence, RedisMemoryPersistence
+from kirara_ai.memory.persistences import (FileMemoryPersistence, JsonlMemoryPersistence, RedisListMemoryPersistence,
+                                          RedisMemoryPersistence)
+from kirara_ai.memory.persistences.base import AsyncMemoryPersistence, MemoryPersistence
 
 # ==================== 常量区 ====================
 TEST_USER_1 = "user1"
@@ -148,3 +154,422 @@ class TestRedisMemoryPersistence:
     def test_load_no_data(self, redis_persistence, redis_mock):
         redis_mock.get.return_value = None
         assert redis_persistence.load(TEST_SCOPE) == []
+
+
+class TestJsonlMemoryPersistence:
+    def make_entry(self, chat_senders, i: int) -> MemoryEntry:
+        return MemoryEntry(sender=chat_senders[0], content=f"message {i}", timestamp=TEST_TIMESTAMP_1, metadata={})
+
+    def test_appends_only_new_entries(self, test_dir, chat_senders):
+        persistence = JsonlMemoryPersistence(test_dir, max_entries=3)
+        file_path = os.path.join(test_dir, f"{TEST_SCOPE}.jsonl")
+        entries = persistence.load(TEST_SCOPE)
+
+        for i in range(7):
+            entries.append(self.make_entry(chat_senders, i))
+            entries = entries[-3:]
+            persistence.save(TEST_SCOPE, entries)
+            with open(file_path, encoding="utf-8") as f:
+                lines = f.readlines()
+            # 超过 2 倍 max_entries 之前只追加，之后压缩为当前的记忆
+            assert len(lines) == (i + 1 if i < 6 else 3)
+
+        loaded = JsonlMemoryPersistence(test_dir, max_entries=3).load(TEST_SCOPE)
+        assert [entry.content for entry in loaded] == ["message 4", "message 5", "message 6"]
+        assert loaded[0].sender == chat_senders[0]
+        assert loaded[0].timestamp == TEST_TIMESTAMP_1
+
+        # 清空记忆时重写文件
+        persistence.save(TEST_SCOPE, [])
+        assert persistence.load(TEST_SCOPE) == []
+
+    def test_load_truncates_incomplete_tail(self, test_dir, chat_senders):
+        persistence = JsonlMemoryPersistence(test_dir)
+        entries = [self.make_entry(chat_senders, 0), self.make_entry(chat_senders, 1)]
+        persistence.save(TEST_SCOPE, entries)
+        file_path = os.path.join(test_dir, f"{TEST_SCOPE}.jsonl")
+        with open(file_path, "a", encoding="utf-8") as f:
+            f.write('{"sender":')
+
+        persistence = JsonlMemoryPersistence(test_dir)
+        entries = persistence.load(TEST_SCOPE)
+        assert [entry.content for entry in entries] == ["message 0", "message 1"]
+
+        entries.append(self.make_entry(chat_senders, 2))
+        persistence.save(TEST_SCOPE, entries)
+        assert len(JsonlMemoryPersistence(test_dir).load(TEST_SCOPE)) == 3
+
+    def test_load_skips_non_object_records(self, test_dir, chat_senders):
+        persistence = JsonlMemoryPersistence(test_dir)
+        persistence.save(TEST_SCOPE, [self.make_entry(chat_senders, 0)])
+        with open(os.path.join(test_dir, f"{TEST_SCOPE}.jsonl"), "a", encoding="utf-8") as f:
+            f.write('[]\n1\n"x"\n')
+
+        entries = JsonlMemoryPersistence(test_dir).load(TEST_SCOPE)
+        assert [entry.content for entry in entries] == ["message 0"]
+
+    def test_load_legacy_json(self, test_dir, test_entries):
+        FileMemoryPersistence(test_dir).save(TEST_SCOPE, test_entries)
+        persistence = JsonlMemoryPersistence(test_dir)
+        entries = persistence.load(TEST_SCOPE)
+        assert [entry.content for entry in entries] == [TEST_CONTENT_1, TEST_CONTENT_2]
+
+        persistence.save(TEST_SCOPE, entries)
+        assert os.path.exists(os.path.join(test_dir, f"{TEST_SCOPE}.jsonl"))
+        # 迁移后删除旧版的 JSON 文件
+        assert not os.path.exists(os.path.join(test_dir, f"{TEST_SCOPE}.json"))
+        assert [entry.content for entry in JsonlMemoryPersistence(test_dir).load(TEST_SCOPE)] == [
+            TEST_CONTENT_1,
+            TEST_CONTENT_2,
+        ]
+
+
+@pytest.fixture
+def redis_list_persistence():
+    fakeredis = pytest.importorskip("fakeredis")
+    persistence = RedisListMemoryPersistence(client=fakeredis.FakeAsyncRedis(), max_entries=3, ttl=60)
+    yield persistence
+    persistence.close()
+
+
+class TestRedisListMemoryPersistence:
+    def make_entry(self, chat_senders, i: int) -> MemoryEntry:
+        return MemoryEntry(sender=chat_senders[0], content=f"message {i}", timestamp=TEST_TIMESTAMP_1, metadata={})
+
+    def list_length(self, persistence, scope_key: str) -> int:
+        return persistence._run(persistence.redis.llen(persistence._get_key(scope_key)))
+
+    def test_push_and_trim(self, redis_list_persistence, chat_senders):
+        persistence = redis_list_persistence
+        entries = persistence.load(TEST_SCOPE)
+        assert entries == []
+
+        for i in range(5):
+            entries.append(self.make_entry(chat_senders, i))
+            entries = entries[-3:]
+            persistence.save(TEST_SCOPE, entries)
+            assert self.list_length(persistence, TEST_SCOPE) == min(i + 1, 3)
+
+        loaded = persistence.load(TEST_SCOPE)
+        assert [entry.content for entry in loaded] == ["message 2", "message 3", "message 4"]
+        assert loaded[0].sender == chat_senders[0]
+        assert loaded[0].timestamp == TEST_TIMESTAMP_1
+        ttl = persistence._run(persistence.redis.ttl(persistence._get_key(TEST_SCOPE)))
+        assert 0 < ttl <= 60
+
+        # 清空记忆时删除列表
+        persistence.save(TEST_SCOPE, [])
+        assert persistence.load(TEST_SCOPE) == []
+
+    def test_save_batch_only_pushes_new_entries(self, redis_list_persistence, chat_senders):
+        persistence = redis_list_persistence
+        first = [self.make_entry(chat_senders, 0)]
+        second = [self.make_entry(chat_senders, 1)]
+        persistence.save_batch([("scope1", first), ("scope2", second)])
+
+        first.append(self.make_entry(chat_senders, 2))
+        persistence.save_batch([("scope1", first), ("scope2", second)])
+
+        assert [entry.content for entry in persistence.load("scope1")] == ["message 0", "message 2"]
+        assert [entry.content for entry in persistence.load("scope2")] == ["message 1"]
+
+    def test_load_legacy_blob(self, redis_list_persistence, test_entries):
+        import json
+
+        from kirara_ai.memory.persistences.codecs import MemoryJSONEncoder
+
+        persistence = redis_list_persistence
+        serialized = [
+            {"sender": entry.sender, "content": entry.content, "timestamp": entry.timestamp, "metadata": entry.metadata}
+            for entry in test_entries
+        ]
+        persistence._run(persistence.redis.set(TEST_SCOPE, json.dumps(serialized, cls=MemoryJSONEncoder)))
+
+        entries = persistence.load(TEST_SCOPE)
+        assert [entry.content for entry in entries] == [TEST_CONTENT_1, TEST_CONTENT_2]
+        assert entries[1].sender == test_entries[1].sender
+
+        persistence.save(TEST_SCOPE, entries)
+        assert self.list_length(persistence, TEST_SCOPE) == 2
+        # 重写为列表后删除旧版的键，清空记忆后不会重新加载旧数据
+        assert not persistence._run(persistence.redis.exists(TEST_SCOPE))
+        persistence.save(TEST_SCOPE, [])
+        assert persistence.load(TEST_SCOPE) == []
+
+    def test_clear_after_restart_removes_legacy_key(self, chat_senders, test_entries):
+        fakeredis = pytest.importorskip("fakeredis")
+        from kirara_ai.memory.persistences.codecs import encode_entry
+
+        server = fakeredis.FakeServer()
+        first = RedisListMemoryPersistence(client=fakeredis.FakeAsyncRedis(server=server), max_entries=3)
+        first._run(first.redis.set(TEST_SCOPE, "[" + encode_entry(self.make_entry(chat_senders, 0)) + "]"))
+        first.close()
+
+        # 重启后没有加载过该作用域就清空记忆
+        second = RedisListMemoryPersistence(client=fakeredis.FakeAsyncRedis(server=server), max_entries=3)
+        second.save(TEST_SCOPE, [])
+        second.close()
+
+        third = RedisListMemoryPersistence(client=fakeredis.FakeAsyncRedis(server=server), max_entries=3)
+        try:
+            assert third.load(TEST_SCOPE) == []
+        finally:
+            third.close()
+
+    def test_slow_write_does_not_block_other_scopes(self, redis_list_persistence, chat_senders):
+        persistence = redis_list_persistence
+        persistence.save("other_scope", [self.make_entry(chat_senders, 0)])
+        write = persistence._write
+        started = threading.Event()
+        release = threading.Event()
+
+        async def slow_write(writes):
+            started.set()
+            while not release.is_set():
+                await asyncio.sleep(0.01)
+            await write(writes)
+
+        loaded = []
+        with patch.object(persistence, "_write", slow_write):
+            writer = threading.Thread(target=persistence.save, args=(TEST_SCOPE, [self.make_entry(chat_senders, 1)]))
+            writer.start()
+            assert started.wait(1)
+            # 写入还没有完成时，其他作用域的加载不需要等待
+            reader = threading.Thread(target=lambda: loaded.extend(persistence.load("other_scope")))
+            reader.start()
+            reader.join(1)
+            finished = not reader.is_alive()
+            release.set()
+            writer.join(1)
+            reader.join(1)
+
+        assert finished
+        assert [entry.content for entry in loaded] == ["message 0"]
+        assert [entry.content for entry in persistence.load(TEST_SCOPE)] == ["message 1"]
+
+    def test_load_legacy_blob_trims_to_max_entries(self, redis_list_persistence, chat_senders):
+        from kirara_ai.memory.persistences.codecs import encode_entry
+
+        persistence = redis_list_persistence
+        serialized = "[" + ",".join(encode_entry(self.make_entry(chat_senders, i)) for i in range(5)) + "]"
+        persistence._run(persistence.redis.set(TEST_SCOPE, serialized))
+
+        entries = persistence.load(TEST_SCOPE)
+        assert [entry.content for entry in entries] == ["message 2", "message 3", "message 4"]
+
+    def test_load_skips_non_object_records(self, redis_list_persistence, chat_senders):
+        persistence = redis_list_persistence
+        persistence.save(TEST_SCOPE, [self.make_entry(chat_senders, 0)])
+        persistence._run(persistence.redis.rpush(persistence._get_key(TEST_SCOPE), "[]", "1"))
+
+        assert [entry.content for entry in persistence.load(TEST_SCOPE)] == ["message 0"]
+
+    def test_new_scope_does_not_read_legacy_key(self, redis_list_persistence):
+        persistence = redis_list_persistence
+        with patch.object(persistence.redis, "get", wraps=persistence.redis.get) as get:
+            assert persistence.load("new_scope") == []
+        get.assert_not_called()
+
+    def test_timed_out_write_is_not_duplicated(self, redis_list_persistence, chat_senders):
+        persistence = redis_list_persistence
+        entries = [self.make_entry(chat_senders, 0)]
+        persistence.save(TEST_SCOPE, entries)
+
+        write = persistence._write
+        cancelled = threading.Event()
+
+        async def slow_write(writes):
+            # 事务已经提交，但在超时之前没有返回
+            await write(writes)
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        entries.append(self.make_entry(chat_senders, 1))
+        persistence.timeout = 0.1
+        with patch.object(persistence, "_write", slow_write):
+            with pytest.raises(concurrent.futures.TimeoutError):
+                persistence.save(TEST_SCOPE, entries)
+
+        # AsyncMemoryPersistence 会用同样的记忆重试
+        persistence.timeout = 10
+        persistence.save(TEST_SCOPE, entries)
+        assert [entry.content for entry in persistence.load(TEST_SCOPE)] == ["message 0", "message 1"]
+        # 超时的命令已被取消
+        assert cancelled.wait(1)
+
+
+class RecordingPersistence(MemoryPersistence):
+    """记录每次写入的持久化实现"""
+
+    def __init__(self):
+        self.saves = []
+        self.flushed = False
+        self.closed = False
+
+    def save(self, scope_key, entries):
+        self.saves.append((scope_key, list(entries)))
+
+    def load(self, scope_key):
+        return []
+
+    def flush(self):
+        self.flushed = True
+
+    def close(self):
+        # 关闭时所有修改都已写入
+        assert self.flushed
+        self.closed = True
+
+
+class TestAsyncMemoryPersistence:
+    def test_load_reads_pending_writes(self, test_entries):
+        inner = MagicMock()
+        inner.load.return_value = []
+        persistence = AsyncMemoryPersistence(inner, flush_interval=60)
+
+        persistence.save(TEST_SCOPE, test_entries)
+        loaded = persistence.load(TEST_SCOPE)
+        # 返回的是快照的副本
+        assert loaded == test_entries and loaded is not test_entries
+        inner.load.assert_not_called()
+        assert persistence.load("other_scope") == []
+
+        persistence.stop()
+
+    def test_coalesces_and_drains_on_stop(self, test_entries):
+        inner = RecordingPersistence()
+        persistence = AsyncMemoryPersistence(inner, flush_interval=60)
+
+        entries = []
+        for entry in test_entries:
+            entries.append(entry)
+            persistence.save(TEST_SCOPE, entries)
+        persistence.save("other_scope", [])
+        # 保存之后修改列表不影响已提交的快照
+        entries.clear()
+
+        stats = persistence.stats()
+        assert stats["dirty_scopes"] == 2
+        assert stats["coalesced"] == 1
+        assert stats["lag"] > 0
+
+        persistence.stop(timeout=5)
+        assert not persistence.worker.is_alive()
+        assert inner.saves == [(TEST_SCOPE, test_entries), ("other_scope", [])]
+        assert inner.flushed
+        assert inner.closed
+        assert persistence.stats()["dirty_scopes"] == 0
+
+    def test_failed_write_retried_once_on_stop(self, test_entries):
+        class FlakyPersistence(RecordingPersistence):
+            def __init__(self, failures):
+                super().__init__()
+                self.failures = failures
+
+            def save(self, scope_key, entries):
+                if self.failures > 0:
+                    self.failures -= 1
+                    raise ConnectionError("down")
+                super().save(scope_key, entries)
+
+        # 停止时写入失败，立即重试一次
+        inner = FlakyPersistence(failures=1)
+        persistence = AsyncMemoryPersistence(inner, flush_interval=60)
+        persistence.save(TEST_SCOPE, test_entries)
+        persistence.stop(timeout=5)
+        assert inner.saves == [(TEST_SCOPE, test_entries)]
+
+        # 重试仍然失败时丢弃，不会一直重试
+        inner = FlakyPersistence(failures=10)
+        persistence = AsyncMemoryPersistence(inner, flush_interval=60)
+        persistence.save(TEST_SCOPE, test_entries)
+        persistence.stop(timeout=5)
+        assert not persistence.worker.is_alive()
+        assert inner.failures == 8
+        assert persistence.stats()["dirty_scopes"] == 0
+
+    def test_stop_timeout_does_not_close_during_write(self, test_entries):
+        release = threading.Event()
+
+        class BlockingPersistence(RecordingPersistence):
+            def save(self, scope_key, entries):
+                release.wait(5)
+                super().save(scope_key, entries)
+
+        inner = BlockingPersistence()
+        persistence = AsyncMemoryPersistence(inner, flush_interval=60)
+        persistence.save(TEST_SCOPE, test_entries)
+        persistence.stop(timeout=0.05)
+
+        # 后台线程仍在写入，不关闭持久化层
+        assert persistence.worker.is_alive()
+        assert not inner.closed
+        release.set()
+        persistence.worker.join(5)
+        assert inner.saves == [(TEST_SCOPE, test_entries)]
+
+    def test_flushes_when_batch_is_full(self, test_entries):
+        inner = RecordingPersistence()
+        persistence = AsyncMemoryPersistence(inner, flush_interval=60, batch_size=2)
+        persistence.save("scope1", test_entries)
+        persistence.save("scope2", test_entries)
+
+        for _ in range(100):
+            if len(inner.saves) == 2:
+                break
+            time.sleep(0.01)
+        assert len(inner.saves) == 2
+        assert persistence.stats()["saved"] == 2
+        persistence.stop()
+
+    def test_failed_writes_back_off(self, test_entries):
+        class FailingPersistence(RecordingPersistence):
+            def save(self, scope_key, entries):
+                self.saves.append((scope_key, list(entries)))
+                raise ConnectionError("down")
+
+        class FakeClock:
+            def __init__(self):
+                self.now = 1000.0
+
+            def __call__(self):
+                return self.now
+
+        # 时钟不前进时后台线程不会写入，由测试逐次触发写入
+        clock = FakeClock()
+        inner = FailingPersistence()
+        persistence = AsyncMemoryPersistence(inner, flush_interval=0.5, clock=clock)
+        persistence.save(TEST_SCOPE, test_entries)
+        assert not persistence._is_due()
+
+        delays = []
+        for _ in range(6):
+            with persistence._cond:
+                batch = persistence._take_batch()
+            persistence._write_batch(batch)
+            delays.append(persistence._retry_delay)
+            assert persistence._retry_at == clock.now + persistence._retry_delay
+            # 退避期间不会重试，退避结束后才允许再次写入
+            assert not persistence._is_due()
+            clock.now = persistence._retry_at - 0.01
+            assert not persistence._is_due()
+            clock.now = persistence._retry_at
+
+        # 从 flush_interval 开始按指数退避，最长 MAX_RETRY_DELAY 秒
+        assert delays == [0.5, 1.0, 2.0, 4.0, 5.0, 5.0]
+        assert len(inner.saves) == 6
+        stats = persistence.stats()
+        assert stats["errors"] == 6
+        assert stats["dirty_scopes"] == 1
+        # 保留最早标记为脏的时间
+        assert stats["lag"] == pytest.approx(sum(delays))
+        persistence.stop(timeout=5)
+
+
+def test_star_import():
+    namespace = {}
+    exec("from kirara_ai.memory.persistences import *", namespace)
+    assert "codecs" in namespace and "RedisListMemoryPersistence" in namespace
@@ -80,20 +80,20 @@ async def test_send_im_message_async():
     block.container = container
     
     # 执行块
-    result = block.execute(msg=send_message)
+    result = await block.execute(msg=send_message)
     
     # 验证结果 - 应该返回空字典
-    assert result == None
+    assert result == {}
     
     # 创建块 - 指定适配器
     block = SendIMMessage(im_name="telegram")
     block.container = container
     
     # 执行块
-    result = block.execute(msg=send_message, target="specific_user")
+    result = await block.execute(msg=send_message, target="specific_user")
     
     # 验证结果
-    assert result == None
+    assert result == {}
 
 
 def test_get_im_message(container):
@@ -32,7 +32,7 @@ async def test_toggle_edit_state_async():
     block.container = container
     
     # 执行块 - 传入发送者
-    result = block.execute(sender=sender)
+    result = await block.execute(sender=sender)
     
     # 验证结果 - 异步方法应该返回空字典
     assert result == {}
\ No newline at end of file
@@ -0,0 +1,187 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from kirara_ai.events.event_bus import EventBus
+from kirara_ai.ioc.container import DependencyContainer
+from kirara_ai.workflow.core.block import Block, BlockRegistry, Input, Output
+from kirara_ai.workflow.core.execution.executor import WorkflowExecutor
+from kirara_ai.workflow.core.workflow import Workflow
+from kirara_ai.workflow.implementations.blocks.system.map import MapBlock
+
+
+class UpperBlock(Block):
+    """在线程池中执行的同步 block"""
+
+    name = "upper"
+    inputs = {"text": Input("text", "文本", str, "文本")}
+    outputs = {"text": Output("text", "文本", str, "文本")}
+
+    def __init__(self, suffix: str = ""):
+        self.suffix = suffix
+
+    def execute(self, text: str):
+        if text == "boom":
+            raise ValueError("cannot process boom")
+        return {"text": text.upper() + self.suffix}
+
+
+class SlowEchoBlock(Block):
+    """记录最大并发数的异步 block"""
+
+    name = "slow_echo"
+    inputs = {"value": Input("value", "值", int, "值")}
+    outputs = {"value": Output("value", "值", int, "值")}
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    async def execute(self, value: int):
+        with SlowEchoBlock.lock:
+            SlowEchoBlock.running += 1
+            SlowEchoBlock.peak = max(SlowEchoBlock.peak, SlowEchoBlock.running)
+        # 越靠前的元素越晚完成，用于验证输出顺序
+        await asyncio.sleep(0.01 * (5 - value))
+        with SlowEchoBlock.lock:
+            SlowEchoBlock.running -= 1
+        return {"value": value * 10}
+
+
+class SleepyBlock(Block):
+    """在线程中执行、配合取消标记退出的慢 block"""
+
+    name = "sleepy"
+    inputs = {"value": Input("value", "值", int, "值")}
+    outputs = {"value": Output("value", "值", int, "值")}
+    started = []
+
+    def execute(self, value: int):
+        SleepyBlock.started.append(value)
+        for _ in range(10):
+            if self.cancelled:
+                break
+            time.sleep(0.01)
+        return {"value": value}
+
+
+class HangingBlock(Block):
+    """超过自身超时时间的异步 block"""
+
+    name = "hanging"
+    inputs = {"value": Input("value", "值", int, "值")}
+    outputs = {"value": Output("value", "值", int, "值")}
+    timeout = 0.05
+
+    async def execute(self, value: int):
+        await asyncio.sleep(10)
+        return {"value": value}
+
+
+class ContainerBlock(Block):
+    """构造函数需要容器的 block"""
+
+    name = "container_block"
+    inputs = {"value": Input("value", "值", int, "值")}
+    outputs = {"value": Output("value", "值", str, "值")}
+
+    def __init__(self, container: DependencyContainer, prefix: str = ""):
+        self.injected = container
+        self.prefix = prefix
+
+    def execute(self, value: int):
+        return {"value": f"{self.prefix}{value}:{type(self.injected.resolve(BlockRegistry)).__name__}"}
+
+
+@pytest.fixture
+def container():
+    container = DependencyContainer()
+    registry = BlockRegistry()
+    registry.register("upper", "test", UpperBlock)
+    registry.register("slow_echo", "test", SlowEchoBlock)
+    registry.register("sleepy", "test", SleepyBlock)
+    registry.register("hanging", "test", HangingBlock)
+    registry.register("container_block", "test", ContainerBlock)
+    container.register(BlockRegistry, registry)
+    container.register(DependencyContainer, container)
+    container.register(EventBus, EventBus())
+    container.register(Workflow, Workflow(name="map_test", blocks=[], wires=[]))
+    container.register(WorkflowExecutor, WorkflowExecutor(container))
+    return container
+
+
+@pytest.mark.asyncio
+async def test_map_block_preserves_order_and_limits_concurrency(container):
+    """测试输出顺序与输入一致，并发数不超过限制"""
+    SlowEchoBlock.peak = 0
+    block = MapBlock(block_type="test:slow_echo", max_concurrency=2)
+    block.container = container
+
+    result = await block.execute(items=[0, 1, 2, 3, 4])
+
+    assert result["results"] == [0, 10, 20, 30, 40]
+    assert result["errors"] == []
+    assert SlowEchoBlock.peak == 2
+
+
+@pytest.mark.asyncio
+async def test_map_block_collects_errors(container):
+    """测试单个元素失败时不影响其他元素"""
+    block = MapBlock(block_type="test:upper", params={"suffix": "!"})
+    block.container = container
+
+    result = await block.execute(items=["a", "boom", "c"])
+
+    assert result["results"] == ["A!", None, "C!"]
+    assert result["errors"] == [{"index": 1, "error": "cannot process boom"}]
+
+
+@pytest.mark.asyncio
+async def test_map_block_unknown_block_type(container):
+    """测试未注册的 block 类型"""
+    block = MapBlock(block_type="test:missing")
+    block.container = container
+
+    with pytest.raises(ValueError, match="not found"):
+        await block.execute(items=[1])
+
+
+@pytest.mark.asyncio
+async def test_map_block_applies_inner_timeout(container):
+    """测试元素遵循内部 block 的超时设置"""
+    block = MapBlock(block_type="test:hanging")
+    block.container = container
+
+    result = await asyncio.wait_for(block.execute(items=[1, 2]), timeout=1)
+
+    assert result["results"] == [None, None]
+    assert [error["index"] for error in result["errors"]] == [0, 1]
+    assert "timed out" in result["errors"][0]["error"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_map_block_stops_pending_items(container):
+    """测试 map block 被取消后不再启动等待中的元素，正在执行的元素收到取消标记"""
+    SleepyBlock.started = []
+    block = MapBlock(block_type="test:sleepy", max_concurrency=1)
+    block.container = container
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(block.execute(items=list(range(10))), timeout=0.05)
+    await asyncio.sleep(0.2)
+
+    assert SleepyBlock.started == [0]
+    assert container.resolve(WorkflowExecutor).abandoned_blocks == ["map_block[0]"]
+
+
+@pytest.mark.asyncio
+async def test_map_block_injects_container(container):
+    """测试为构造函数需要容器的 block 注入容器"""
+    block = MapBlock(block_type="test:container_block", params={"prefix": "#"})
+    block.container = container
+
+    result = await block.execute(items=[1, 2])
+
+    assert result["results"] == ["#1:BlockRegistry", "#2:BlockRegistry"]
+    assert result["errors"] == []
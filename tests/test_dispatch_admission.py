@@ -0,0 +1,100 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from kirara_ai.config.global_config import DispatchConfig, GlobalConfig
+from kirara_ai.im.message import IMMessage, TextMessage
+from kirara_ai.im.sender import ChatSender
+from kirara_ai.ioc.container import DependencyContainer
+from kirara_ai.workflow.core.dispatch import DispatchRuleRegistry, WorkflowDispatcher
+from kirara_ai.workflow.core.dispatch.admission import AdmissionController
+from kirara_ai.workflow.core.workflow import WorkflowRegistry
+
+
+@pytest.mark.asyncio
+async def test_admission_limits_and_priority():
+    """测试超出全局限制的请求排队，并按优先级放行"""
+    admission = AdmissionController(max_running=1, queue_size=2)
+    order = []
+
+    assert await admission.acquire("chat", priority=1)
+
+    async def wait(name: str, priority: int):
+        await admission.acquire("chat", priority)
+        order.append(name)
+
+    group = asyncio.create_task(wait("group", 1))
+    await asyncio.sleep(0)
+    private = asyncio.create_task(wait("private", 0))
+    await asyncio.sleep(0)
+    assert admission.stats()["queue_depth"] == 2
+
+    # 队列已满
+    assert not await admission.acquire("chat")
+
+    admission.release("chat")
+    await asyncio.sleep(0)
+    admission.release("chat")
+    await asyncio.gather(group, private)
+
+    assert order == ["private", "group"]
+    stats = admission.stats()
+    assert stats["running"] == 1
+    assert stats["admitted"] == 3
+    assert stats["queued"] == 2
+    assert stats["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_workflow_limit_does_not_block_other_workflows():
+    """测试单个工作流达到限制时不影响其他工作流"""
+    admission = AdmissionController(workflow_limits={"chat:normal": 1})
+
+    assert await admission.acquire("chat:normal")
+    waiting = asyncio.create_task(admission.acquire("chat:normal"))
+    await asyncio.sleep(0)
+    assert not waiting.done()
+
+    assert await asyncio.wait_for(admission.acquire("game:dice"), timeout=1)
+
+    admission.release("chat:normal")
+    assert await asyncio.wait_for(waiting, timeout=1)
+    assert admission.stats()["running_by_workflow"] == {"chat:normal": 1, "game:dice": 1}
+
+
+def create_dispatcher(**config) -> WorkflowDispatcher:
+    container = DependencyContainer()
+    global_config = GlobalConfig()
+    global_config.dispatch = DispatchConfig(max_running_workflows=1, admission_queue_size=0, **config)
+    container.register(GlobalConfig, global_config)
+    container.register(WorkflowRegistry, MagicMock(spec=WorkflowRegistry))
+    container.register(DispatchRuleRegistry, DispatchRuleRegistry(container))
+    return WorkflowDispatcher(container)
+
+
+def create_message() -> IMMessage:
+    return IMMessage(
+        sender=ChatSender.from_group_chat(user_id="user", group_id="group", display_name="User"),
+        message_elements=[TextMessage("hello")],
+    )
+
+
+@pytest.mark.asyncio
+async def test_overflow_policies():
+    """测试等待队列已满时的处理策略"""
+    source = MagicMock()
+    source.send_message = AsyncMock()
+
+    dispatcher = create_dispatcher(overflow_policy="busy", busy_reply="忙")
+    assert (await dispatcher._admit(source, create_message(), "chat:normal")).admitted
+    assert await dispatcher._admit(source, create_message(), "chat:normal") is None
+    reply = source.send_message.call_args[0][0]
+    assert reply.content == "忙"
+
+    dispatcher = create_dispatcher(overflow_policy="degrade", degrade_model="cheap-model")
+    await dispatcher._admit(source, create_message(), "chat:normal")
+    ticket = await dispatcher._admit(source, create_message(), "chat:normal")
+    assert not ticket.admitted
+    assert ticket.degraded_model == "cheap-model"
+    assert dispatcher.admission.stats()["degraded"] == 1
@@ -0,0 +1,209 @@
+import asyncio
+import os
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+from kirara_ai.config.global_config import DispatchConfig, GlobalConfig
+from kirara_ai.im.message import IMMessage, TextMessage
+from kirara_ai.im.sender import ChatSender
+from kirara_ai.ioc.container import DependencyContainer
+from kirara_ai.memory.registry import ScopeRegistry
+from kirara_ai.memory.scopes.builtin_scopes import GroupScope, MemberScope
+from kirara_ai.workflow.core.dispatch import DispatchRuleRegistry, WorkflowDispatcher
+from kirara_ai.workflow.core.dispatch.coalesce import MessageCoalescer
+from kirara_ai.workflow.core.dispatch.lanes import ConversationLanes
+from kirara_ai.workflow.core.workflow import WorkflowRegistry
+
+
+@pytest.mark.asyncio
+async def test_lane_runs_jobs_in_order():
+    """测试同一会话内的任务按提交顺序依次执行"""
+    lanes = ConversationLanes()
+    events = []
+
+    def make_job(i: int, delay: float):
+        async def job():
+            events.append(("start", i))
+            await asyncio.sleep(delay)
+            events.append(("end", i))
+            return i
+
+        return job
+
+    # 前面的任务更慢，后面的任务仍然要等待前面的任务完成
+    results = await asyncio.gather(*(lanes.submit("c2c:user", make_job(i, 0.01 * (3 - i))) for i in range(3)))
+
+    assert results == [0, 1, 2]
+    assert events == [("start", 0), ("end", 0), ("start", 1), ("end", 1), ("start", 2), ("end", 2)]
+    # 队列清空后自动回收
+    assert len(lanes) == 0
+
+
+@pytest.mark.asyncio
+async def test_lanes_run_concurrently_across_conversations():
+    """测试不同会话的任务并发执行"""
+    lanes = ConversationLanes()
+    running = 0
+    peak = 0
+
+    async def job():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+
+    await asyncio.gather(*(lanes.submit(f"group:{i}", job) for i in range(4)))
+
+    assert peak == 4
+
+
+@pytest.mark.asyncio
+async def test_lane_queue_is_bounded():
+    """测试会话队列已满时拒绝新任务，异常会传递给等待方"""
+    lanes = ConversationLanes(max_queue_size=1)
+    release = asyncio.Event()
+
+    async def blocked():
+        await release.wait()
+        return "done"
+
+    async def failing():
+        raise ValueError("boom")
+
+    first = asyncio.create_task(lanes.submit("group:1", blocked))
+    await asyncio.sleep(0)
+    # 第一个任务正在执行，第二个任务在队列中等待
+    second = asyncio.create_task(lanes.submit("group:1", failing))
+    await asyncio.sleep(0)
+    assert lanes.stats() == {"lanes": 1, "running": 1, "pending": 1, "dropped": 0}
+
+    with pytest.raises(asyncio.QueueFull):
+        await lanes.submit("group:1", blocked)
+    assert lanes.stats()["dropped"] == 1
+    # 其他会话不受影响
+    release.set()
+    assert await lanes.submit("group:2", blocked) == "done"
+
+    assert await first == "done"
+    with pytest.raises(ValueError, match="boom"):
+        await second
+
+
+def create_message(text: str, user_id: str = "user") -> IMMessage:
+    return IMMessage(
+        sender=ChatSender.from_group_chat(user_id=user_id, group_id="group", display_name=user_id),
+        message_elements=[TextMessage(text)],
+    )
+
+
+@pytest.mark.asyncio
+async def test_coalescer_merges_burst():
+    """测试同一用户在等待时间内连续发送的消息合并为一条处理"""
+    handled = []
+
+    async def handler(source, message):
+        handled.append(message.content)
+        return len(handled)
+
+    coalescer = MessageCoalescer(0.05, handler)
+    source = object()
+
+    async def send(text: str, user_id: str, delay: float):
+        await asyncio.sleep(delay)
+        return await coalescer.submit(user_id, source, create_message(text, user_id))
+
+    results = await asyncio.gather(
+        send("你好", "alice", 0),
+        send("在吗", "alice", 0.01),
+        send("帮我看看", "alice", 0.02),
+        send("hi", "bob", 0.01),
+    )
+
+    assert sorted(handled) == ["hi", "你好\n在吗\n帮我看看"]
+    # 同一批次的调用方得到相同的结果
+    assert results[0] == results[1] == results[2]
+    assert results[3] != results[0]
+    assert len(coalescer) == 0
+
+
+@pytest.mark.asyncio
+async def test_coalescer_flushes_at_max_messages():
+    """测试攒够最大消息数量时立即处理"""
+    handled = []
+
+    async def handler(source, message):
+        handled.append(message.content)
+
+    coalescer = MessageCoalescer(10, handler, max_messages=2)
+    await asyncio.wait_for(
+        asyncio.gather(
+            coalescer.submit("alice", None, create_message("a")),
+            coalescer.submit("alice", None, create_message("b")),
+        ),
+        timeout=1,
+    )
+
+    assert handled == ["a\nb"]
+
+
+def create_dispatcher(**config) -> WorkflowDispatcher:
+    container = DependencyContainer()
+    global_config = GlobalConfig()
+    global_config.dispatch = DispatchConfig(**config)
+    container.register(GlobalConfig, global_config)
+    container.register(WorkflowRegistry, MagicMock(spec=WorkflowRegistry))
+    container.register(DispatchRuleRegistry, DispatchRuleRegistry(container))
+    scope_registry = ScopeRegistry()
+    scope_registry.register("member", MemberScope)
+    scope_registry.register("group", GroupScope)
+    container.register(ScopeRegistry, scope_registry)
+    return WorkflowDispatcher(container)
+
+
+def test_lane_scope_defaults_to_memory_scope():
+    """测试未配置会话作用域时与记忆的默认作用域一致，同一群的不同成员不共用队列"""
+    alice, bob = create_message("hi", "alice"), create_message("hi", "bob")
+
+    dispatcher = create_dispatcher()
+    assert dispatcher.get_lane_key(alice) == "member:group:alice"
+    assert dispatcher.get_lane_key(alice) != dispatcher.get_lane_key(bob)
+
+    dispatcher = create_dispatcher(lane_scope="group")
+    assert dispatcher.get_lane_key(alice) == dispatcher.get_lane_key(bob) == "group:group"
+
+
+@pytest.mark.asyncio
+async def test_adapter_dispatches_conversations_concurrently():
+    """测试适配器不等待工作流运行结束，同一适配器上不同会话的消息同时处理"""
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "kirara_ai", "plugins"))
+    from im_telegram_adapter.adapter import TelegramAdapter, TelegramConfig
+
+    adapter = TelegramAdapter(TelegramConfig(token="123456:test-token"))
+    messages = {"alice": create_message("hi", "alice"), "bob": create_message("hi", "bob")}
+    adapter.convert_to_message = lambda update: messages[update]
+
+    running = set()
+    both_running = asyncio.Event()
+    release = asyncio.Event()
+
+    async def dispatch(source, message):
+        running.add(message.sender.user_id)
+        if len(running) == 2:
+            both_running.set()
+        await release.wait()
+
+    adapter.dispatcher = MagicMock(spec=WorkflowDispatcher)
+    adapter.dispatcher.dispatch = dispatch
+
+    # 消息处理器立即返回，第一个会话的工作流仍在运行时第二个会话的工作流也已开始
+    await asyncio.wait_for(adapter.handle_message("alice", None), timeout=1)
+    await asyncio.wait_for(adapter.handle_message("bob", None), timeout=1)
+    await asyncio.wait_for(both_running.wait(), timeout=1)
+    # 适配器保留运行中任务的引用，任务结束后移除
+    assert len(adapter._dispatch_tasks) == 2
+    release.set()
+    await asyncio.wait_for(asyncio.gather(*adapter._dispatch_tasks), timeout=1)
+    assert not adapter._dispatch_tasks
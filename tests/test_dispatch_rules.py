@@ -0,0 +1,258 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from kirara_ai.im.message import IMMessage, TextMessage
+from kirara_ai.im.sender import ChatSender
+from kirara_ai.ioc.container import DependencyContainer
+from kirara_ai.workflow.core.dispatch import (CombinedDispatchRule, DispatchRuleRegistry, RuleGroup, SimpleDispatchRule,
+                                              WorkflowDispatcher)
+from kirara_ai.workflow.core.dispatch.benchmark import BenchmarkConfig, run_benchmark
+from kirara_ai.workflow.core.dispatch.rules.message_rules import RegexMatchRule
+from kirara_ai.workflow.core.workflow import WorkflowRegistry
+
+
+def create_message(text: str) -> IMMessage:
+    return IMMessage(
+        sender=ChatSender.from_c2c_chat(user_id="test_user", display_name="Test User"),
+        message_elements=[TextMessage(text)],
+    )
+
+
+def create_rule(rule_id: str, rule_groups: list, priority: int = 5) -> CombinedDispatchRule:
+    return CombinedDispatchRule(
+        rule_id=rule_id,
+        name=rule_id,
+        workflow_id="test:workflow",
+        priority=priority,
+        rule_groups=rule_groups,
+    )
+
+
+@pytest.fixture
+def registry():
+    container = DependencyContainer()
+    workflow_registry = MagicMock(spec=WorkflowRegistry)
+    container.register(WorkflowRegistry, workflow_registry)
+    registry = DispatchRuleRegistry(container)
+    container.register(DispatchRuleRegistry, registry)
+    return registry
+
+
+def test_rule_matchers_are_built_once(registry):
+    """测试规则实例在注册时创建，匹配时不再重复创建"""
+    rule = create_rule(
+        "regex",
+        [RuleGroup(operator="or", rules=[SimpleDispatchRule(type="regex", config={"pattern": "^/draw"})])],
+    )
+    with patch.object(RegexMatchRule, "from_config", wraps=RegexMatchRule.from_config) as from_config:
+        registry.register(rule)
+        assert from_config.call_count == 1
+
+        assert rule.match(create_message("/draw a cat"), registry.workflow_registry)
+        assert not rule.match(create_message("hello"), registry.workflow_registry)
+        assert from_config.call_count == 1
+
+        # 修改规则内容后重新创建规则实例
+        rule.rule_groups = [
+            RuleGroup(operator="or", rules=[SimpleDispatchRule(type="regex", config={"pattern": "^hello"})])
+        ]
+        assert rule.match(create_message("hello"), registry.workflow_registry)
+        assert from_config.call_count == 2
+
+
+def test_invalid_rule_is_skipped(registry):
+    """测试无法创建的规则被跳过，不影响同组的其他规则"""
+    rule = create_rule(
+        "mixed",
+        [
+            RuleGroup(
+                operator="or",
+                rules=[
+                    SimpleDispatchRule(type="unknown", config={}),
+                    SimpleDispatchRule(type="prefix", config={"prefix": "/help"}),
+                ],
+            )
+        ],
+    )
+    registry.register(rule)
+
+    assert rule.match(create_message("/help"), registry.workflow_registry)
+    assert not rule.match(create_message("help"), registry.workflow_registry)
+
+    only_invalid = create_rule(
+        "invalid", [RuleGroup(operator="or", rules=[SimpleDispatchRule(type="unknown", config={})])]
+    )
+    registry.register(only_invalid)
+    assert not only_invalid.match(create_message("/help"), registry.workflow_registry)
+
+
+def test_candidate_rules_filtered_by_index(registry):
+    """测试关键词和前缀规则通过索引筛选，其他规则总是候选规则"""
+    registry.register(
+        create_rule("draw", [RuleGroup(operator="or", rules=[SimpleDispatchRule(type="prefix", config={"prefix": "/draw"})])], 10)
+    )
+    registry.register(
+        create_rule(
+            "weather",
+            [
+                RuleGroup(operator="or", rules=[SimpleDispatchRule(type="keyword", config={"keywords": ["天气", "weather"]})]),
+                RuleGroup(operator="and", rules=[SimpleDispatchRule(type="chat_type", config={"chat_type": "私聊"})]),
+            ],
+            8,
+        )
+    )
+    registry.register(
+        create_rule("regex", [RuleGroup(operator="or", rules=[SimpleDispatchRule(type="regex", config={"pattern": "^hi"})])], 6)
+    )
+    registry.register(create_rule("fallback", [RuleGroup(operator="or", rules=[SimpleDispatchRule(type="fallback", config={})])], 1))
+
+    def candidates(text: str) -> list:
+        return [rule.rule_id for rule in registry.get_candidate_rules(create_message(text))]
+
+    assert candidates("/draw a cat") == ["draw", "regex", "fallback"]
+    assert candidates("今天天气怎么样") == ["weather", "regex", "fallback"]
+    assert candidates("hello") == ["regex", "fallback"]
+
+    # 候选规则与逐条匹配的结果一致
+    for text in ["/draw a cat", "今天天气怎么样", "hi there", "hello"]:
+        message = create_message(text)
+        expected = [rule.rule_id for rule in registry.get_active_rules() if rule.match(message, registry.workflow_registry)]
+        matched = [
+            rule.rule_id for rule in registry.get_candidate_rules(message) if rule.match(message, registry.workflow_registry)
+        ]
+        assert matched == expected
+
+    # 直接修改规则内容后，该规则不再通过索引筛选
+    registry.get_rule("draw").rule_groups = [
+        RuleGroup(operator="or", rules=[SimpleDispatchRule(type="prefix", config={"prefix": "/paint"})])
+    ]
+    assert "draw" in candidates("hello")
+
+    registry.delete_rule("weather")
+    assert candidates("今天天气怎么样") == ["draw", "regex", "fallback"]
+
+
+def test_active_rules_snapshot_and_version(registry):
+    """测试已启用规则快照只在规则变化时重新计算"""
+    fallback = [RuleGroup(operator="or", rules=[SimpleDispatchRule(type="fallback", config={})])]
+    registry.register(create_rule("low", fallback, 1))
+    registry.register(create_rule("high", fallback, 10))
+    version = registry.version
+
+    active_rules = registry.get_active_rules()
+    assert [rule.rule_id for rule in active_rules] == ["high", "low"]
+    assert registry.get_active_rules() is active_rules
+    assert registry.version == version
+
+    registry.disable_rule("high")
+    assert registry.version > version
+    assert [rule.rule_id for rule in registry.get_active_rules()] == ["low"]
+
+    registry.enable_rule("high")
+    registry.update_rule("low", create_rule("low", fallback, 20))
+    assert [rule.rule_id for rule in registry.get_active_rules()] == ["low", "high"]
+
+    registry.delete_rule("low")
+    assert [rule.rule_id for rule in registry.get_active_rules()] == ["high"]
+
+
+def test_rule_group_short_circuits_by_cost(registry):
+    """测试规则组按代价排序，结果确定后不再执行剩余规则"""
+    rule = create_rule(
+        "group_draw",
+        [
+            RuleGroup(
+                operator="and",
+                rules=[
+                    SimpleDispatchRule(type="regex", config={"pattern": "draw"}),
+                    SimpleDispatchRule(type="chat_type", config={"chat_type": "群聊"}),
+                ],
+            )
+        ],
+    )
+    registry.register(rule)
+
+    with patch.object(RegexMatchRule, "match", autospec=True, return_value=True) as regex_match:
+        # 私聊消息在代价更低的 chat_type 规则处就已确定不匹配
+        assert not rule.match(create_message("draw"), registry.workflow_registry)
+        assert regex_match.call_count == 0
+
+
+def test_rule_group_reorders_by_selectivity(registry):
+    """测试规则组根据实际命中率调整执行顺序"""
+    rule = create_rule(
+        "either",
+        [
+            RuleGroup(
+                operator="or",
+                rules=[
+                    SimpleDispatchRule(type="prefix", config={"prefix": "/never"}),
+                    SimpleDispatchRule(type="keyword", config={"keywords": ["hello"]}),
+                ],
+            )
+        ],
+    )
+    registry.register(rule)
+    group = rule._matchers[0]
+    assert group.order == [0, 1]
+
+    for _ in range(group.REORDER_INTERVAL):
+        assert rule.match(create_message("hello"), registry.workflow_registry)
+
+    # 总是命中的关键词规则被移到前面
+    assert group.order == [1, 0]
+    assert rule.match(create_message("/never"), registry.workflow_registry)
+    assert not rule.match(create_message("bye"), registry.workflow_registry)
+
+
+def test_dispatcher_match_rule(registry):
+    """测试调度器只匹配规则，不执行工作流"""
+    registry.register(
+        create_rule("draw", [RuleGroup(operator="or", rules=[SimpleDispatchRule(type="prefix", config={"prefix": "/draw"})])], 10)
+    )
+    registry.register(create_rule("fallback", [RuleGroup(operator="or", rules=[SimpleDispatchRule(type="fallback", config={})])], 1))
+    dispatcher = WorkflowDispatcher(registry.container)
+
+    assert dispatcher.match_rule(create_message("/draw a cat")).rule_id == "draw"
+    assert [rule.rule_id for rule in dispatcher.match_rules(create_message("/draw a cat"))] == ["draw", "fallback"]
+    assert dispatcher.match_rule(create_message("hello")).rule_id == "fallback"
+
+    registry.disable_rule("fallback")
+    assert dispatcher.match_rule(create_message("hello")) is None
+
+
+def test_dispatch_benchmark():
+    """测试调度性能测试可以正常运行"""
+    result = run_benchmark(BenchmarkConfig(rules=30, messages=200, warmup=0))
+
+    assert result["rules"] == 31
+    assert result["messages"] == 200
+    assert result["matched"] + result["fallback"] == 200
+    assert result["latency"]["count"] == 200
+    assert result["throughput"] > 0
+
+
+def test_dispatcher_records_rule_metrics(registry):
+    """测试调度器记录每条规则的匹配次数、命中次数和耗时"""
+    draw_groups = [RuleGroup(operator="or", rules=[SimpleDispatchRule(type="regex", config={"pattern": "^/draw"})])]
+    registry.register(create_rule("draw", draw_groups, 10))
+    registry.register(create_rule("fallback", [RuleGroup(operator="or", rules=[SimpleDispatchRule(type="fallback", config={})])], 1))
+    dispatcher = WorkflowDispatcher(registry.container)
+
+    for text in ["/draw a cat", "hello", "hi"]:
+        dispatcher.match_rule(create_message(text))
+
+    stats = registry.metrics.snapshot()
+    assert stats["draw"]["evaluations"] == 3
+    assert stats["draw"]["matches"] == 1
+    assert stats["draw"]["match_ratio"] == pytest.approx(1 / 3)
+    assert stats["draw"]["total_time"] >= stats["draw"]["max_time"] > 0
+    assert stats["fallback"]["evaluations"] == 2
+    assert stats["fallback"]["matches"] == 2
+
+    # 更新规则后重新统计
+    registry.update_rule("draw", create_rule("draw", draw_groups, 10))
+    assert registry.metrics.get("draw") is None
+    registry.delete_rule("fallback")
+    assert "fallback" not in registry.metrics.snapshot()
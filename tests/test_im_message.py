@@ -0,0 +1,61 @@
+import copy
+
+from kirara_ai.im.message import IMMessage, ImageMessage, MentionElement, TextMessage
+from kirara_ai.im.sender import ChatSender
+
+
+def create_message(*elements) -> IMMessage:
+    return IMMessage(
+        sender=ChatSender.from_c2c_chat(user_id="test_user", display_name="Test User"),
+        message_elements=list(elements),
+    )
+
+
+def test_content_is_cached():
+    """测试消息内容只在第一次访问时计算"""
+    text = TextMessage("hello")
+    message = create_message(text)
+
+    assert message.content == "hello"
+    # 直接修改元素对象不会使缓存失效
+    text.text = "changed"
+    assert message.content == "hello"
+
+
+def test_cache_invalidated_when_elements_change():
+    """测试消息元素列表被修改时缓存失效"""
+    bot = ChatSender.get_bot_sender()
+    message = create_message(TextMessage("hello"))
+    assert message.content == "hello"
+    assert message.images == []
+    assert not message.is_mentioned(bot)
+
+    message.message_elements.append(MentionElement(bot))
+    assert message.content == "hello\n@bot"
+    assert message.mentions == [bot]
+    assert message.is_mentioned(bot)
+
+    message.message_elements[0] = TextMessage("hi")
+    assert message.content == "hi\n@bot"
+
+    message.message_elements += [ImageMessage(url="https://example.com/image.jpg")]
+    assert len(message.images) == 1
+
+    message.message_elements.pop()
+    assert message.images == []
+
+    message.message_elements = [TextMessage("new")]
+    assert message.content == "new"
+    assert not message.is_mentioned(bot)
+
+
+def test_copied_message_tracks_its_own_elements():
+    """测试复制后的消息修改元素时只影响自身的缓存"""
+    message = create_message(TextMessage("hello"), TextMessage("world"))
+    assert message.content == "hello\nworld"
+
+    copied = copy.deepcopy(message)
+    copied.message_elements.pop()
+
+    assert copied.content == "hello"
+    assert message.content == "hello\nworld"
@@ -5,10 +5,11 @@ from typing import Any, Dict
 import pytest
 
 from kirara_ai.ioc.container import DependencyContainer
-from kirara_ai.workflow.core.block import Block
+from kirara_ai.workflow.core.block import Block, LoopBlock, LoopEndBlock
 from kirara_ai.workflow.core.block.input_output import Input, Output
 from kirara_ai.workflow.core.block.registry import BlockRegistry
 from kirara_ai.workflow.core.workflow.builder import WorkflowBuilder
+from kirara_ai.workflow.core.workflow.registry import WorkflowRegistry
 
 
 # 测试用的 Block 类
@@ -42,6 +43,17 @@ class SimpleProcessBlock(Block):
         return {"out1": in1 * self.multiplier}
 
 
+class IntProcessBlock(Block):
+    """输入为整数的处理块"""
+
+    name: str = "int_process"
+    inputs: Dict[str, Input] = {"in1": Input("in1", "输入1", int, "Input 1")}
+    outputs: Dict[str, Output] = {"out1": Output("out1", "输出1", int, "Output 1")}
+
+    def execute(self, in1: int) -> Dict[str, Any]:
+        return {"out1": in1 + 1}
+
+
 def setup_module(module):
     """测试模块开始前的设置"""
     registry = BlockRegistry()
@@ -89,6 +101,90 @@ class TestWorkflowBuilder:
         assert workflow.blocks[0].name == "input1"
         assert workflow.blocks[1].name == "process1"
 
+    def test_build_reuses_wire_index(self, container):
+        """测试连线索引在连线不变时被复用"""
+        builder = (
+            WorkflowBuilder("test_workflow")
+            .use(SimpleInputBlock, name="input1", param1="test")
+            .chain(SimpleProcessBlock, name="process1", multiplier=2)
+        )
+
+        first = builder.build(container)
+        second = builder.build(container)
+        assert first.index is second.index
+        assert first.index.predecessors["process1"] == {"input1"}
+
+        # 修改连线后索引需要重新计算
+        builder.wires = []
+        third = builder.build(container)
+        assert third.index is not first.index
+        assert "process1" not in third.index.predecessors
+
+    def test_registry_instantiates_blocks_per_run(self, container):
+        """测试每次运行获取到独立的 block 实例，编译结果被缓存"""
+        builder = (
+            WorkflowBuilder("test_workflow")
+            .use(SimpleInputBlock, name="input1", param1="test")
+            .chain(SimpleProcessBlock, name="process1", multiplier=2)
+            .loop(lambda ctx: False, name="loop1")
+            .chain(SimpleProcessBlock, name="process2")
+            .end_loop()
+        )
+        registry = WorkflowRegistry(container)
+        registry.register("test", "workflow", builder)
+
+        run_container_a = DependencyContainer(container)
+        run_container_b = DependencyContainer(container)
+        first = registry.get("test:workflow", run_container_a)
+        second = registry.get("test:workflow", run_container_b)
+
+        assert [b.name for b in first.blocks] == [b.name for b in builder.blocks]
+        for block_a, block_b in zip(first.blocks, second.blocks):
+            assert block_a is not block_b
+            assert block_a.container is run_container_a
+            assert block_b.container is run_container_b
+        assert first.get_block("process1").multiplier == 2
+        assert first.get_block("input1").param1 == "test"
+        assert len(first.wires) == len(builder.wires)
+        assert first.index is second.index
+
+        # 控制流 block 的运行状态不会在两次运行之间共享
+        loop_a = next(b for b in first.blocks if isinstance(b, LoopBlock))
+        loop_b = next(b for b in second.blocks if isinstance(b, LoopBlock))
+        loop_a.execute()
+        assert loop_b.iteration_count == 0
+        end_a = next(b for b in first.blocks if isinstance(b, LoopEndBlock))
+        end_b = next(b for b in second.blocks if isinstance(b, LoopEndBlock))
+        end_a.execute(value=1)
+        assert end_b.results == []
+
+        # 构建器变化后重新编译
+        plan = registry.get_plan("test:workflow")
+        assert registry.get_plan("test:workflow") is plan
+        builder.chain(SimpleProcessBlock, name="process3")
+        assert registry.get_plan("test:workflow") is not plan
+
+    def test_registry_rejects_type_mismatch(self, container):
+        """测试注册时检查连线类型，运行时不再重复检查"""
+        registry = WorkflowRegistry(container)
+        builder = (
+            WorkflowBuilder("test_workflow")
+            .use(SimpleInputBlock, name="input1")
+            .chain(IntProcessBlock, name="process1")
+        )
+        builder.force_connect(builder.blocks[0], builder.blocks[1], "out1", "in1")
+        with pytest.raises(TypeError, match="Type mismatch"):
+            registry.register("test", "invalid", builder)
+        assert registry.get("test:invalid") is None
+
+        valid_builder = (
+            WorkflowBuilder("test_workflow")
+            .use(SimpleInputBlock, name="input1")
+            .chain(SimpleProcessBlock, name="process1")
+        )
+        registry.register("test", "valid", valid_builder)
+        assert registry.get("test:valid", DependencyContainer(container)).validated
+
     def test_parallel_construction(self, container):
         """测试并行节点构建"""
         builder = (
@@ -145,6 +241,25 @@ class TestWorkflowBuilder:
         process2 = next(b for b in loaded_workflow.blocks if b.name == "process2")
         assert process2.multiplier == 3
 
+    def test_block_timeout_serialization(self, container, yaml_path):
+        """测试 block 超时时间的保存、加载和按运行实例化"""
+        builder = (
+            WorkflowBuilder("timeout_workflow")
+            .use(SimpleInputBlock, name="input1", param1="test")
+            .chain(SimpleProcessBlock, name="process1")
+            .timeout(30)
+        )
+        assert builder.blocks[1].timeout == 30
+        builder.save_to_yaml(yaml_path, container)
+
+        loaded_builder = WorkflowBuilder.load_from_yaml(yaml_path, container)
+        registry = WorkflowRegistry(container)
+        registry.register("test", "timeout", loaded_builder)
+        workflow = registry.get("test:timeout", DependencyContainer(container))
+
+        assert workflow.get_block("process1").timeout == 30
+        assert workflow.get_block("input1").timeout is None
+
     def test_complex_workflow_serialization(self, container, yaml_path):
         """测试复杂工作流的序列化"""
         # 构建一个包含多种特性的复杂工作流
@@ -0,0 +1,104 @@
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from kirara_ai.config.global_config import GlobalConfig, WebConfig
+from kirara_ai.im.message import IMMessage, TextMessage
+from kirara_ai.im.sender import ChatSender
+from kirara_ai.ioc.container import DependencyContainer
+from kirara_ai.web.app import WebServer
+from kirara_ai.workflow.core.dispatch import (CombinedDispatchRule, DispatchRuleRegistry, RuleGroup, SimpleDispatchRule,
+                                              WorkflowDispatcher)
+from kirara_ai.workflow.core.workflow import WorkflowRegistry
+from tests.utils.auth_test_utils import auth_headers, setup_auth_service  # noqa
+
+# ==================== 常量区 ====================
+TEST_SECRET_KEY = "test-secret-key"
+TEST_RULE_ID = "draw"
+
+
+# ==================== Fixtures ====================
+@pytest.fixture
+def container():
+    """创建注册了调度规则的容器"""
+    container = DependencyContainer()
+
+    config = GlobalConfig()
+    config.web = WebConfig(
+        secret_key=TEST_SECRET_KEY, password_file="test_password.hash"
+    )
+    container.register(GlobalConfig, config)
+
+    # 设置认证服务
+    setup_auth_service(container)
+
+    container.register(WorkflowRegistry, MagicMock(spec=WorkflowRegistry))
+    registry = DispatchRuleRegistry(container)
+    registry.register(
+        CombinedDispatchRule(
+            rule_id=TEST_RULE_ID,
+            name="Draw",
+            workflow_id="test:workflow",
+            priority=10,
+            rule_groups=[
+                RuleGroup(operator="or", rules=[SimpleDispatchRule(type="regex", config={"pattern": "^/draw"})])
+            ],
+        )
+    )
+    container.register(DispatchRuleRegistry, registry)
+    return container
+
+
+@pytest.fixture
+def test_client(container):
+    """创建测试客户端"""
+    web_server = WebServer(container)
+    container.register(WebServer, web_server)
+    return TestClient(web_server.app)
+
+
+def match(container: DependencyContainer, text: str):
+    message = IMMessage(
+        sender=ChatSender.from_c2c_chat(user_id="test_user", display_name="Test User"),
+        message_elements=[TextMessage(text)],
+    )
+    return WorkflowDispatcher(container).match_rule(message)
+
+
+# ==================== 测试用例 ====================
+class TestDispatchRules:
+    @pytest.mark.asyncio
+    async def test_list_rules_stats(self, test_client, container, auth_headers):
+        """测试规则列表包含每条规则的匹配统计，匹配后计数增加"""
+        response = test_client.get("/backend-api/api/dispatch/rules", headers=auth_headers)
+        data = response.json()
+        assert [rule["rule_id"] for rule in data["rules"]] == [TEST_RULE_ID]
+        assert data["stats"][TEST_RULE_ID]["evaluations"] == 0
+        assert data["stats"][TEST_RULE_ID]["matches"] == 0
+
+        assert match(container, "/draw a cat").rule_id == TEST_RULE_ID
+        assert match(container, "hello") is None
+
+        response = test_client.get("/backend-api/api/dispatch/rules", headers=auth_headers)
+        stats = response.json()["stats"][TEST_RULE_ID]
+        assert stats["evaluations"] == 2
+        assert stats["matches"] == 1
+        assert stats["match_ratio"] == pytest.approx(0.5)
+        assert stats["total_time"] >= stats["max_time"] > 0
+
+    @pytest.mark.asyncio
+    async def test_get_rule_stats(self, test_client, container, auth_headers):
+        """测试单条规则的响应包含匹配统计"""
+        response = test_client.get(f"/backend-api/api/dispatch/rules/{TEST_RULE_ID}", headers=auth_headers)
+        data = response.json()
+        assert data["rule"]["rule_id"] == TEST_RULE_ID
+        assert data["stats"]["evaluations"] == 0
+
+        match(container, "/draw a dog")
+
+        response = test_client.get(f"/backend-api/api/dispatch/rules/{TEST_RULE_ID}", headers=auth_headers)
+        stats = response.json()["stats"]
+        assert stats["evaluations"] == 1
+        assert stats["matches"] == 1
+        assert stats["match_ratio"] == 1.0
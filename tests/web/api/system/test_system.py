@@ -4,11 +4,13 @@ import pytest
 from fastapi.testclient import TestClient
 
 from kirara_ai.config.global_config import GlobalConfig, WebConfig
+from kirara_ai.events.workflow import BlockExecutionSpan
 from kirara_ai.im.manager import IMManager
 from kirara_ai.ioc.container import DependencyContainer
 from kirara_ai.llm.llm_manager import LLMManager
 from kirara_ai.plugin_manager.plugin_loader import PluginLoader
 from kirara_ai.web.app import WebServer
+from kirara_ai.workflow.core.execution.metrics import BlockExecutionMetrics
 from kirara_ai.workflow.core.workflow import WorkflowRegistry
 from tests.utils.auth_test_utils import auth_headers, setup_auth_service  # noqa
 
@@ -53,6 +55,21 @@ def app():
     workflow_registry._workflows = {"workflow1": MagicMock(), "workflow2": MagicMock()}
     container.register(WorkflowRegistry, workflow_registry)
 
+    block_metrics = BlockExecutionMetrics()
+    for duration in (0.1, 0.2, 0.3):
+        block_metrics.record(
+            BlockExecutionSpan(
+                workflow_id="chat:normal",
+                block_name="llm",
+                block_type="ChatCompletion",
+                queue_wait=0.01,
+                duration=duration,
+                on_loop=False,
+                output_size=128,
+            )
+        )
+    container.register(BlockExecutionMetrics, block_metrics)
+
     web_server = WebServer(container)
     container.register(WebServer, web_server)
     return web_server.app
@@ -106,6 +123,26 @@ class TestSystemStatus:
             assert status["memory_usage"]["percent"] == 2.5
             assert status["cpu_usage"] == 1.2
 
+    @pytest.mark.asyncio
+    async def test_get_system_metrics(self, test_client, auth_headers):
+        """测试获取工作流执行指标"""
+        response = test_client.get(
+            "/backend-api/api/system/metrics", headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["blocks"]) == 1
+        metrics = data["blocks"][0]
+        assert metrics["workflow_id"] == "chat:normal"
+        assert metrics["block_type"] == "ChatCompletion"
+        assert metrics["total"] == 3
+        assert metrics["in_thread"] == 3
+        assert metrics["duration"]["count"] == 3
+        assert metrics["duration"]["p50"] == 0.2
+        assert metrics["duration"]["max"] == 0.3
+        assert metrics["output_size"]["mean"] == 128
+
     @pytest.mark.asyncio
     async def test_get_system_status_unauthorized(self, test_client):
         """测试未认证时获取系统状态"""
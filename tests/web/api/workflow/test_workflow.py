@@ -1,3 +1,5 @@
+import os
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -16,6 +18,7 @@ TEST_SECRET_KEY = "test-secret-key"
 TEST_GROUP_ID = "test-group"
 TEST_WORKFLOW_ID = "test-workflow"
 TEST_WORKFLOW_ID_NEW = "test-workflow-new"
+TEST_WORKFLOW_ID_INVALID = "test-workflow-invalid"
 TEST_WORKFLOW_NAME = "Test Workflow"
 TEST_WORKFLOW_NAME_NEW = "Test Workflow New"
 TEST_WORKFLOW_DESC = "A test workflow"
@@ -51,6 +54,19 @@ class LLMBlock(Block):
         return {"output": f"Response to: {input}"}
 
 
+class NumberBlock(Block):
+    name = "number_block"
+    inputs = {"input": Input("input", "输入", int, "Input number")}
+    outputs = {}
+    container: DependencyContainer
+
+    def __init__(self):
+        self.position = {"x": 400, "y": 0}
+
+    def execute(self, input: int) -> dict:
+        return {}
+
+
 # ==================== Fixtures ====================
 @pytest.fixture
 def app():
@@ -71,6 +87,7 @@ def app():
     block_registry = BlockRegistry()
     block_registry.register("message", "test", MessageBlock)
     block_registry.register("llm", "test", LLMBlock)
+    block_registry.register("number", "test", NumberBlock)
     container.register(BlockRegistry, block_registry)
 
     # 创建工作流
@@ -163,6 +180,52 @@ class TestWorkflow:
         assert data["name"] == TEST_WORKFLOW_NAME
         assert len(data["blocks"]) == 1
 
+    @pytest.mark.asyncio
+    async def test_create_workflow_with_type_mismatch(self, test_client, auth_headers):
+        """测试创建连线类型不兼容的工作流时在保存前返回错误"""
+        workflow_data = {
+            "workflow_id": TEST_WORKFLOW_ID_INVALID,
+            "group_id": TEST_GROUP_ID,
+            "name": TEST_WORKFLOW_NAME,
+            "description": TEST_WORKFLOW_DESC,
+            "blocks": [
+                {
+                    "block_id": "node1",
+                    "type_name": "test:message",
+                    "name": "Message Node",
+                    "config": {"text": "Hello"},
+                    "position": {"x": 0, "y": 0},
+                },
+                {
+                    "block_id": "node2",
+                    "type_name": "test:number",
+                    "name": "Number Node",
+                    "config": {},
+                    "position": {"x": 200, "y": 0},
+                },
+            ],
+            "wires": [
+                {
+                    "source_block": "Message Node",
+                    "source_output": "output",
+                    "target_block": "Number Node",
+                    "target_input": "input",
+                }
+            ],
+        }
+
+        response = test_client.post(
+            f"/backend-api/api/workflow/{TEST_GROUP_ID}/{TEST_WORKFLOW_ID_INVALID}",
+            headers=auth_headers,
+            json=workflow_data,
+        )
+
+        assert response.status_code == 400
+        assert "Type mismatch" in response.json()["error"]
+        assert not os.path.exists(
+            WorkflowRegistry.get_workflow_path(TEST_GROUP_ID, TEST_WORKFLOW_ID_INVALID)
+        )
+
     @pytest.mark.asyncio
     async def test_update_workflow(self, test_client, auth_headers):
         """测试更新工作流"""
@@ -1,6 +1,11 @@
+import asyncio
+import threading
+
 import pytest
 
+from kirara_ai.config.global_config import GlobalConfig, WorkflowConfig
 from kirara_ai.events.event_bus import EventBus
+from kirara_ai.events.workflow import BlockExecutionSpan
 from kirara_ai.ioc.container import DependencyContainer
 from kirara_ai.workflow.core.block import Block, Input, Output
 from kirara_ai.workflow.core.block.registry import BlockRegistry
@@ -122,6 +127,19 @@ async def test_executor_run():
     executor = WorkflowExecutor(container)
     result = await executor.run()
 
+    # 中间结果在下游读取后被释放，只保留最终输出
+    assert "input1" not in result
+    assert "process1" not in result
+    assert result["output1"]["result"] == "TEST_INPUT"
+    assert executor.completed == {"input1", "process1", "output1"}
+
+
+@pytest.mark.asyncio
+async def test_executor_retains_outputs_when_configured():
+    """Test that retain_block_outputs keeps every intermediate output."""
+    executor = create_executor(workflow, WorkflowConfig(retain_block_outputs=True))
+    result = await executor.run()
+
     assert result["input1"]["output1"] == "test_input"
     assert result["process1"]["output1"] == "TEST_INPUT"
     assert result["output1"]["result"] == "TEST_INPUT"
@@ -200,3 +218,270 @@ async def test_executor_with_multiple_outputs():
     executor = WorkflowExecutor(container)
     result = await executor.run()
     assert "MultiOutputBlock" in result
+
+
+class BarrierBlock(Block):
+    """两个实例必须同时执行才能通过屏障"""
+
+    name = "BarrierBlock"
+    inputs = {
+        "input1": Input(
+            name="input1", label="输入1", data_type=str, description="Test input"
+        )
+    }
+    outputs = {
+        "output1": Output(
+            name="output1", label="输出1", data_type=str, description="Test output"
+        )
+    }
+
+    def __init__(self, barrier: threading.Barrier, name: str):
+        super().__init__(name=name)
+        self.barrier = barrier
+
+    def execute(self, input1: str, **kwargs):
+        self.barrier.wait()
+        return {"output1": input1}
+
+
+def create_parallel_workflow(barrier: threading.Barrier) -> Workflow:
+    source = InputBlock(name="source")
+    branch_a = BarrierBlock(barrier, name="branch_a")
+    branch_b = BarrierBlock(barrier, name="branch_b")
+    return Workflow(
+        name="parallel_workflow",
+        blocks=[source, branch_a, branch_b],
+        wires=[
+            Wire(source, "output1", branch_a, "input1"),
+            Wire(source, "output1", branch_b, "input1"),
+        ],
+    )
+
+
+@pytest.mark.asyncio
+async def test_executor_runs_independent_blocks_concurrently():
+    """Test that independent branches overlap instead of running one by one."""
+    container = DependencyContainer()
+    container.register(DependencyContainer, container)
+    container.register(EventBus, EventBus())
+    container.register(BlockRegistry, test_registry)
+    container.register(Workflow, create_parallel_workflow(threading.Barrier(2, timeout=5)))
+    executor = WorkflowExecutor(container)
+    result = await executor.run()
+
+    assert result["branch_a"]["output1"] == "test_input"
+    assert result["branch_b"]["output1"] == "test_input"
+
+
+@pytest.mark.asyncio
+async def test_executor_respects_max_parallelism():
+    """Test that max_parallelism caps how many blocks run at once."""
+    container = DependencyContainer()
+    container.register(DependencyContainer, container)
+    container.register(EventBus, EventBus())
+    container.register(BlockRegistry, test_registry)
+    container.register(Workflow, create_parallel_workflow(threading.Barrier(2, timeout=0.2)))
+    executor = WorkflowExecutor(container)
+    executor.max_parallelism = 1
+
+    with pytest.raises(RuntimeError, match="execution failed"):
+        await executor.run()
+
+
+class AsyncProcessBlock(Block):
+    """异步实现的 block，应当在事件循环线程中执行"""
+
+    name = "AsyncProcessBlock"
+    inputs = {
+        "input1": Input(
+            name="input1", label="输入1", data_type=str, description="Test input"
+        )
+    }
+    outputs = {
+        "output1": Output(
+            name="output1", label="输出1", data_type=str, description="Test output"
+        ),
+        "thread": Output(
+            name="thread", label="线程", data_type=str, description="Executing thread"
+        ),
+    }
+
+    async def execute(self, input1: str, **kwargs):
+        await asyncio.sleep(0)
+        return {"output1": input1.upper(), "thread": threading.current_thread().name}
+
+
+class InlineOutputBlock(OutputBlock):
+    """非阻塞的同步 block，应当直接在事件循环线程中调用"""
+
+    blocking = False
+
+    def execute(self, input1: str, **kwargs):
+        return {"result": input1, "thread": threading.current_thread().name}
+
+
+@pytest.mark.asyncio
+async def test_executor_runs_async_and_non_blocking_blocks_on_loop():
+    """Test that async and non-blocking blocks bypass the thread pool."""
+    source = InputBlock(name="source")
+    async_block = AsyncProcessBlock(name="async1")
+    inline_block = InlineOutputBlock(name="inline1")
+    async_workflow = Workflow(
+        name="async_workflow",
+        blocks=[source, async_block, inline_block],
+        wires=[
+            Wire(source, "output1", async_block, "input1"),
+            Wire(async_block, "output1", inline_block, "input1"),
+        ],
+    )
+
+    executor = create_executor(async_workflow, WorkflowConfig(retain_block_outputs=True))
+    result = await executor.run()
+
+    loop_thread = threading.current_thread().name
+    assert result["async1"]["output1"] == "TEST_INPUT"
+    assert result["async1"]["thread"] == loop_thread
+    assert result["inline1"]["result"] == "TEST_INPUT"
+    assert result["inline1"]["thread"] == loop_thread
+
+
+@pytest.mark.asyncio
+async def test_executor_posts_block_execution_spans():
+    """Test that every executed block posts a span with timing information."""
+    event_bus = EventBus()
+    spans = []
+    event_bus.register(BlockExecutionSpan, spans.append)
+    container = DependencyContainer()
+    container.register(DependencyContainer, container)
+    container.register(EventBus, event_bus)
+    container.register(BlockRegistry, test_registry)
+    container.register(Workflow, workflow)
+    executor = WorkflowExecutor(container)
+    await executor.run()
+
+    assert [span.block_name for span in spans] == ["input1", "process1", "output1"]
+    for span in spans:
+        assert span.workflow_id == "test_workflow"
+        assert span.success
+        assert not span.on_loop
+        assert span.duration >= 0
+        assert span.queue_wait >= 0
+    assert spans[1].block_type == "ProcessBlock"
+    assert spans[1].output_size == len("TEST_INPUT")
+
+    spans.clear()
+    container.register(Workflow, failing_workflow)
+    executor = WorkflowExecutor(container)
+    with pytest.raises(RuntimeError):
+        await executor.run()
+    assert spans[-1].block_name == "failing1"
+    assert not spans[-1].success
+
+
+class SlowAsyncBlock(Block):
+    """永远不会主动结束的异步 block"""
+
+    name = "SlowAsyncBlock"
+    timeout = 0.05
+    inputs = {
+        "input1": Input(
+            name="input1", label="输入1", data_type=str, description="Test input"
+        )
+    }
+    outputs = {
+        "output1": Output(
+            name="output1", label="输出1", data_type=str, description="Test output"
+        )
+    }
+
+    def __init__(self, name: str):
+        super().__init__(name=name)
+        self.was_cancelled = False
+
+    async def execute(self, input1: str, **kwargs):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            self.was_cancelled = True
+            raise
+        return {"output1": input1}
+
+
+class SlowSyncBlock(ProcessBlock):
+    """在线程中运行，直到被通知取消才退出的 block"""
+
+    name = "SlowSyncBlock"
+    timeout = 0.05
+
+    def execute(self, input1: str, **kwargs):
+        while not self.cancelled:
+            threading.Event().wait(0.01)
+        return {"output1": "late"}
+
+    def on_timeout(self, input1: str, **kwargs):
+        return {"output1": "fallback"}
+
+
+def create_executor(test_workflow: Workflow, config: WorkflowConfig = None) -> WorkflowExecutor:
+    container = DependencyContainer()
+    container.register(DependencyContainer, container)
+    container.register(EventBus, EventBus())
+    container.register(BlockRegistry, test_registry)
+    container.register(Workflow, test_workflow)
+    if config is not None:
+        container.register(GlobalConfig, GlobalConfig(workflow=config))
+    return WorkflowExecutor(container)
+
+
+@pytest.mark.asyncio
+async def test_executor_cancels_async_block_on_timeout():
+    """Test that an async block exceeding its timeout is cancelled."""
+    source = InputBlock(name="source")
+    slow = SlowAsyncBlock(name="slow1")
+    executor = create_executor(
+        Workflow(name="timeout_workflow", blocks=[source, slow], wires=[Wire(source, "output1", slow, "input1")])
+    )
+
+    with pytest.raises(RuntimeError, match="slow1 timed out"):
+        await executor.run()
+    assert slow.was_cancelled
+    assert slow.cancelled
+
+
+@pytest.mark.asyncio
+async def test_executor_uses_fallback_output_for_abandoned_sync_block():
+    """Test that a timed out thread block is abandoned and its fallback output is used."""
+    source = InputBlock(name="source")
+    slow = SlowSyncBlock(name="slow1")
+    output = OutputBlock(name="output1")
+    executor = create_executor(
+        Workflow(
+            name="fallback_workflow",
+            blocks=[source, slow, output],
+            wires=[
+                Wire(source, "output1", slow, "input1"),
+                Wire(slow, "output1", output, "input1"),
+            ],
+        )
+    )
+    result = await executor.run()
+
+    assert result["output1"]["result"] == "fallback"
+    assert executor.abandoned_blocks == ["slow1"]
+    assert slow.cancelled
+
+
+@pytest.mark.asyncio
+async def test_executor_enforces_run_timeout():
+    """Test that the run deadline cancels blocks without their own timeout."""
+    source = InputBlock(name="source")
+    slow = SlowAsyncBlock(name="slow1")
+    slow.timeout = 0
+    executor = create_executor(
+        Workflow(name="deadline_workflow", blocks=[source, slow], wires=[Wire(source, "output1", slow, "input1")]),
+        WorkflowConfig(run_timeout=0.05),
+    )
+
+    with pytest.raises(TimeoutError, match="deadline_workflow execution timed out"):
+        await executor.run()
+    assert slow.was_cancelled
@@ -0,0 +1,91 @@
+import threading
+
+import pytest
+
+from kirara_ai.events.event_bus import EventBus
+from kirara_ai.ioc.container import DependencyContainer
+from kirara_ai.workflow.core.block import Block, Output
+from kirara_ai.workflow.core.block.registry import BlockRegistry
+from kirara_ai.workflow.core.execution.executor import WorkflowExecutor
+from kirara_ai.workflow.core.execution.pool import BlockExecutorPool
+from kirara_ai.workflow.core.workflow import Workflow
+from tests.utils.test_block_registry import create_test_block_registry
+
+
+class ThreadNameBlock(Block):
+    name = "ThreadNameBlock"
+    outputs = {
+        "thread": Output(name="thread", label="线程", data_type=str, description="Thread name")
+    }
+
+    def execute(self, **kwargs):
+        return {"thread": threading.current_thread().name}
+
+
+def test_pool_stats():
+    """Test queue depth and active worker gauges."""
+    pool = BlockExecutorPool(max_workers=1)
+    try:
+        release = threading.Event()
+        started = threading.Event()
+
+        def blocking_task():
+            started.set()
+            release.wait(5)
+            return "done"
+
+        first = pool.submit(blocking_task)
+        second = pool.submit(lambda: "queued")
+        assert started.wait(5)
+
+        stats = pool.get_stats()
+        assert stats["max_workers"] == 1
+        assert stats["active_workers"] == 1
+        assert stats["queue_depth"] == 1
+
+        release.set()
+        assert first.result(5) == "done"
+        assert second.result(5) == "queued"
+        assert pool.active_workers == 0
+        assert pool.queue_depth == 0
+    finally:
+        pool.shutdown()
+
+
+def test_pool_cancelled_task_leaves_queue():
+    """Test cancelled queued tasks are removed from the queue depth."""
+    pool = BlockExecutorPool(max_workers=1)
+    try:
+        release = threading.Event()
+        started = threading.Event()
+        pool.submit(lambda: started.set() or release.wait(5))
+        queued = pool.submit(lambda: None)
+        assert started.wait(5)
+        assert queued.cancel()
+        assert pool.queue_depth == 0
+        release.set()
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_executor_uses_container_pool():
+    """Test the executor runs blocks on the pool registered in the container."""
+    pool = BlockExecutorPool(max_workers=2)
+    try:
+        container = DependencyContainer()
+        container.register(DependencyContainer, container)
+        container.register(EventBus, EventBus())
+        container.register(BlockRegistry, create_test_block_registry())
+        container.register(BlockExecutorPool, pool)
+        container.register(
+            Workflow,
+            Workflow(name="pool_workflow", blocks=[ThreadNameBlock(name="block1")], wires=[]),
+        )
+        executor = WorkflowExecutor(container)
+        result = await executor.run()
+
+        assert executor.block_pool is pool
+        assert result["block1"]["thread"].startswith("block-worker")
+    finally:
+        pool.shutdown()
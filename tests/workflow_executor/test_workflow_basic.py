@@ -1,6 +1,6 @@
 
 from kirara_ai.workflow.core.block import Block, Input, Output
-from kirara_ai.workflow.core.workflow import Wire, Workflow
+from kirara_ai.workflow.core.workflow import Wire, Workflow, WorkflowIndex
 
 # Define test blocks
 input_block = Block(
@@ -53,3 +53,15 @@ def test_workflow_creation():
     assert len(workflow.wires) == 1
     assert workflow.wires[0].source_block == input_block
     assert workflow.wires[0].target_block == process_block
+
+
+def test_workflow_index():
+    """Test wire index is precomputed per block."""
+    workflow = Workflow(
+        name="test_workflow", blocks=[input_block, process_block], wires=[wire]
+    )
+    assert isinstance(workflow.index, WorkflowIndex)
+    assert workflow.index.predecessors["ProcessBlock"] == {"InputBlock"}
+    assert workflow.index.input_sources["ProcessBlock"]["input1"] == ("InputBlock", "output1")
+    assert workflow.get_successors(input_block) == [process_block]
+    assert workflow.get_successors(process_block) == []